@@ -6,7 +6,12 @@ from __future__ import annotations
 
 import logging
 
-from luxtronik.common import get_host_lock
+from luxtronik.common import (
+    LUXTRONIK_LOCK_PRIORITY_READ,
+    LUXTRONIK_LOCK_PRIORITY_WRITE,
+    get_host_lock,
+)
+from luxtronik.instrumentation import timed_lock
 from luxtronik.discover import discover  # noqa: F401
 
 from luxtronik.cfi import (
@@ -93,7 +98,8 @@ class LuxtronikInterface(LuxtronikSocketInterface, LuxtronikSmartHomeInterface):
         self,
         host,
         port_config=LUXTRONIK_DEFAULT_PORT,
-        port_shi=LUXTRONIK_DEFAULT_MODBUS_PORT
+        port_shi=LUXTRONIK_DEFAULT_MODBUS_PORT,
+        instrumentation=None
     ):
         """
         Initialize the "combined" luxtronik interface.
@@ -104,19 +110,47 @@ class LuxtronikInterface(LuxtronikSocketInterface, LuxtronikSmartHomeInterface):
                   (default: LUXTRONIK_DEFAULT_PORT).
             port_shi (int): TCP port for the smart home interface (via modbusTCP)
                   (default: LUXTRONIK_DEFAULT_MODBUS_PORT).
+            instrumentation (Instrumentation | None): Optional receiver
+                of the timing of each phase of both interfaces.
         """
         self._lock = get_host_lock(host)
 
         self._host = host
-        LuxtronikSocketInterface.__init__(self, host, port_config)
-        modbus_interface = LuxtronikModbusTcpInterface(host, port_shi)
+        LuxtronikSocketInterface.__init__(self, host, port_config, instrumentation)
+        modbus_interface = self._create_modbus_interface(host, port_shi)
+        if instrumentation is not None:
+            modbus_interface.instrumentation = instrumentation
         resolved_version = resolve_version(modbus_interface)
-        LuxtronikSmartHomeInterface.__init__(self, modbus_interface, resolved_version)
+        LuxtronikSmartHomeInterface.__init__(self, modbus_interface, resolved_version, instrumentation)
 
     @property
     def lock(self):
         return self._lock
 
+    @property
+    def instrumentation(self):
+        return self._instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation):
+        """Attach an `Instrumentation` to both interfaces. Pass None to disable it."""
+        self._instrumentation = instrumentation
+        self._interface.instrumentation = instrumentation
+
+    def _timed_lock(self, priority=LUXTRONIK_LOCK_PRIORITY_READ):
+        """Acquire the host lock and measure the wait time if instrumented."""
+        return timed_lock(self._lock, self._instrumentation, "luxtronik.lock", self._host, priority)
+
+    def _create_modbus_interface(self, host, port):
+        """
+        Create the underlying modbus interface of the smart home interface.
+        Override this method to use another transport, e.g. for recording.
+
+        Returns:
+            LuxtronikModbusTcpInterface: The created interface.
+        """
+        return LuxtronikModbusTcpInterface(host, port)
+
     def create_all_data(self, safe=True):
         """
         Create a data vector collection only with fields that match the stored version.
@@ -145,7 +179,7 @@ class LuxtronikInterface(LuxtronikSocketInterface, LuxtronikSmartHomeInterface):
         if not isinstance(data, LuxtronikAllData):
             data = self.create_all_data(True)
 
-        with self.lock:
+        with self._timed_lock():
             LuxtronikSocketInterface.read(self, data)
             LuxtronikSmartHomeInterface.read(self, data)
         return data
@@ -171,22 +205,22 @@ class LuxtronikInterface(LuxtronikSocketInterface, LuxtronikSmartHomeInterface):
             bool: True if no errors occurred, otherwise False.
         """
         if isinstance(data, Parameters):
-            with self.lock:
+            with self._timed_lock(LUXTRONIK_LOCK_PRIORITY_WRITE):
                 LuxtronikSocketInterface.write(self, data)
                 shi_result = True
         elif isinstance(data, Holdings):
-            with self.lock:
+            with self._timed_lock(LUXTRONIK_LOCK_PRIORITY_WRITE):
                 shi_result = LuxtronikSmartHomeInterface.write_holdings(self, data)
         # Because of LuxtronikAllData(LuxtronikSmartHomeData) we must use type(..)
         elif type(data) is LuxtronikSmartHomeData:
-            with self.lock:
+            with self._timed_lock(LUXTRONIK_LOCK_PRIORITY_WRITE):
                 shi_result = LuxtronikSmartHomeInterface.write(self, data)
         elif type(data) is LuxtronikData:
-            with self.lock:
+            with self._timed_lock(LUXTRONIK_LOCK_PRIORITY_WRITE):
                 LuxtronikSocketInterface.write(self, data.parameters)
                 shi_result = True
         elif isinstance(data, LuxtronikAllData):
-            with self.lock:
+            with self._timed_lock(LUXTRONIK_LOCK_PRIORITY_WRITE):
                 LuxtronikSocketInterface.write(self, data.parameters)
                 shi_result = LuxtronikSmartHomeInterface.write(self, data)
         else:
@@ -216,7 +250,7 @@ class LuxtronikInterface(LuxtronikSocketInterface, LuxtronikSmartHomeInterface):
         Returns:
             LuxtronikAllData: The passed / created data vector collection for the read data.
         """
-        with self.lock:
+        with self._timed_lock(LUXTRONIK_LOCK_PRIORITY_WRITE):
             self.write_all(write_data)
             data = self.read_all(read_data)
         return data
@@ -15,6 +15,15 @@ from luxtronik.scripts.watch_cfi import (
 from luxtronik.scripts.watch_shi import (
     watch_shi,
 )  # pylint: disable=unused-import # noqa: F401
+from luxtronik.scripts.bench import (
+    bench,
+)  # pylint: disable=unused-import # noqa: F401
+from luxtronik.scripts.performance_cpu import (
+    performance_cpu,
+)  # pylint: disable=unused-import # noqa: F401
+from luxtronik.scripts.simulate import (
+    simulate,
+)  # pylint: disable=unused-import # noqa: F401
 
 
 def discover():
@@ -38,6 +47,9 @@ def main() -> int:
         watch-cfi  Watch all config interface value changes of the Luxtronik controller
         watch-shi  Watch all smart home interface value changes of the Luxtronik controller
         discover   Discover Luxtronik controllers on the network (via magic packet) and output results
+        bench      Benchmark both interfaces of the Luxtronik controller or of the simulator
+        bench-cpu  Benchmark the CPU-bound data handling (no controller required)
+        simulate   Run a simulated Luxtronik controller on the local machine
         """,
     )
     parser.add_argument("command", help="Subcommand to run")
@@ -52,6 +64,9 @@ def main() -> int:
         "watch-cfi": watch_cfi,
         "watch-shi": watch_shi,
         "discover": discover,
+        "simulate": simulate,
+        "bench": bench,
+        "bench-cpu": performance_cpu,
     }
     if args.command not in commands:
         print("Unrecognized command")
@@ -59,8 +74,8 @@ def main() -> int:
         sys.exit(1)
     # pop command, otherwise the argparser within the called script will fail
     sys.argv.pop(1)
-    # call the corresponding command
-    commands[args.command]()
+    # call the corresponding command and forward its exit code
+    return commands[args.command]() or 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
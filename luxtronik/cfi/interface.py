@@ -6,7 +6,12 @@ import struct
 import time
 
 from luxtronik.collections import integrate_data
-from luxtronik.common import get_host_lock
+from luxtronik.common import (
+    LUXTRONIK_LOCK_PRIORITY_READ,
+    LUXTRONIK_LOCK_PRIORITY_WRITE,
+    get_host_lock,
+)
+from luxtronik.instrumentation import create_span, timed_lock
 from luxtronik.cfi.constants import (
     LUXTRONIK_DEFAULT_PORT,
     LUXTRONIK_PARAMETERS_WRITE,
@@ -50,19 +55,44 @@ class LuxtronikData:
 class LuxtronikSocketInterface:
     """Luxtronik read/write interface via socket."""
 
-    def __init__(self, host, port=LUXTRONIK_DEFAULT_PORT):
+    def __init__(self, host, port=LUXTRONIK_DEFAULT_PORT, instrumentation=None):
         # Acquire a lock object for this host to ensure thread safety
         self._lock = get_host_lock(host)
 
         self._host = host
         self._port = port
         self._socket = None
+        self._instrumentation = instrumentation
+        # Changes detected while parsing, dispatched after the lock has been released
+        self._pending_changes = []
 
     @property
     def lock(self):
         return self._lock
 
-    def _with_lock_and_connect(self, func, *args, **kwargs):
+    @property
+    def instrumentation(self):
+        return self._instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation):
+        """Attach an `Instrumentation` to time the phases. Pass None to disable it."""
+        self._instrumentation = instrumentation
+
+    def _span(self, name, **attributes):
+        return create_span(self._instrumentation, name, self._host, **attributes)
+
+    def _create_connection(self):
+        """
+        Open the socket connection to the heat pump.
+        Override this method to use another transport, e.g. for recording.
+
+        Returns:
+            socket.socket: The connected socket.
+        """
+        return socket.create_connection((self._host, self._port))
+
+    def _with_lock_and_connect(self, func, *args, priority=LUXTRONIK_LOCK_PRIORITY_READ, **kwargs):
         """
         Decorator around various read/write functions to connect first.
 
@@ -70,11 +100,17 @@ class LuxtronikSocketInterface:
         Locking is being used to ensure that only a single socket operation is
         performed at any point in time. This helps to avoid issues with the
         Luxtronik controller, which seems unstable otherwise.
+        Writes pass a higher `priority` to be served before waiting reads.
+        Detected changes are dispatched to the observers after the connection
+        has been closed and the lock has been released.
         """
-        with self.lock:
+        with timed_lock(self.lock, self._instrumentation, "cfi.lock", self._host, priority):
+            self._pending_changes = []
             try:
                 ret_val = None
-                with socket.create_connection((self._host, self._port)) as sock:
+                with self._span("cfi.connect"):
+                    sock = self._create_connection()
+                with sock:
                     self._socket = sock
                     LOGGER.info("Connected to Luxtronik heat pump %s:%s", self._host, self._port)
                     ret_val = func(*args, **kwargs)
@@ -93,9 +129,23 @@ class LuxtronikSocketInterface:
             except Exception as e:
                 LOGGER.error("Failed to connect to Luxtronik heat pump %s:%s. %s.",
                     self._host, self._port, f"Unknown exception: {e}")
+            pending_changes = self._pending_changes
+            self._pending_changes = []
         self._socket = None
+        self._notify_changes(pending_changes)
         return ret_val
 
+    def _notify_changes(self, pending_changes):
+        """
+        Dispatch the changes detected while parsing to the observers of the data vectors.
+
+        Args:
+            pending_changes (list[tuple[DataVector, list]]): Data vector and
+                its `(definition, field, old_raw)` tuples, in the order of parsing.
+        """
+        for data_vector, changes in pending_changes:
+            data_vector.notify_changes(changes)
+
     def read(self, data=None):
         """
         All available data will be read from the heat pump
@@ -140,7 +190,8 @@ class LuxtronikSocketInterface:
                           to the heatpump before reading all available data
                           from the heat pump.
         """
-        self._with_lock_and_connect(self._write, parameters)
+        self._with_lock_and_connect(self._write, parameters,
+            priority=LUXTRONIK_LOCK_PRIORITY_WRITE)
 
     def write_and_read(self, parameters, data=None):
         """
@@ -150,7 +201,8 @@ class LuxtronikSocketInterface:
         """
         if data is None:
             data = LuxtronikData()
-        return self._with_lock_and_connect(self._write_and_read, parameters, data)
+        return self._with_lock_and_connect(self._write_and_read, parameters, data,
+            priority=LUXTRONIK_LOCK_PRIORITY_WRITE)
 
     def _read(self, data):
         self._read_parameters(data.parameters)
@@ -179,60 +231,77 @@ class LuxtronikSocketInterface:
                     )
                     continue
                 LOGGER.info("%s: Parameter '%d' set to '%s'", self._host, definition.index, value)
-                self._send_ints(LUXTRONIK_PARAMETERS_WRITE, definition.index, value)
-                cmd = self._read_int()
-                LOGGER.debug("%s: Command %s", self._host, cmd)
-                val = self._read_int()
-                LOGGER.debug("%s: Value %s", self._host, val)
+                with self._span("cfi.write_parameter", command=LUXTRONIK_PARAMETERS_WRITE,
+                        index=definition.index):
+                    self._send_ints(LUXTRONIK_PARAMETERS_WRITE, definition.index, value)
+                    with self._span("cfi.receive") as span:
+                        cmd = self._read_int()
+                        LOGGER.debug("%s: Command %s", self._host, cmd)
+                        val = self._read_int()
+                        LOGGER.debug("%s: Value %s", self._host, val)
+                        span.count("bytes", 2 * LUXTRONIK_SOCKET_READ_SIZE_INTEGER)
         # Give the heatpump a short time to handle the value changes/calculations:
-        time.sleep(WAIT_TIME_AFTER_PARAMETER_WRITE)
+        with self._span("cfi.write_wait"):
+            time.sleep(WAIT_TIME_AFTER_PARAMETER_WRITE)
 
     def _read_parameters(self, parameters):
         data = []
-        self._send_ints(LUXTRONIK_PARAMETERS_READ, 0)
-        cmd = self._read_int()
-        LOGGER.debug("%s: Command %s", self._host, cmd)
-        length = self._read_int()
-        LOGGER.debug("%s: Length %s", self._host, length)
-        for _ in range(0, length):
-            data.append(self._read_int())
-        LOGGER.info("%s: Read %d parameters", self._host, length)
-        self._parse(parameters, data)
+        with self._span("cfi.read_parameters", command=LUXTRONIK_PARAMETERS_READ):
+            self._send_ints(LUXTRONIK_PARAMETERS_READ, 0)
+            with self._span("cfi.receive") as span:
+                cmd = self._read_int()
+                LOGGER.debug("%s: Command %s", self._host, cmd)
+                length = self._read_int()
+                LOGGER.debug("%s: Length %s", self._host, length)
+                for _ in range(0, length):
+                    data.append(self._read_int())
+                span.count("bytes", (2 + length) * LUXTRONIK_SOCKET_READ_SIZE_INTEGER)
+            LOGGER.info("%s: Read %d parameters", self._host, length)
+            self._parse(parameters, data)
         return parameters
 
     def _read_calculations(self, calculations):
         data = []
-        self._send_ints(LUXTRONIK_CALCULATIONS_READ, 0)
-        cmd = self._read_int()
-        LOGGER.debug("%s: Command %s", self._host, cmd)
-        stat = self._read_int()
-        LOGGER.debug("%s: Stat %s", self._host, stat)
-        length = self._read_int()
-        LOGGER.debug("%s: Length %s", self._host, length)
-        for _ in range(0, length):
-            data.append(self._read_int())
-        LOGGER.info("%s: Read %d calculations", self._host, length)
-        self._parse(calculations, data)
+        with self._span("cfi.read_calculations", command=LUXTRONIK_CALCULATIONS_READ):
+            self._send_ints(LUXTRONIK_CALCULATIONS_READ, 0)
+            with self._span("cfi.receive") as span:
+                cmd = self._read_int()
+                LOGGER.debug("%s: Command %s", self._host, cmd)
+                stat = self._read_int()
+                LOGGER.debug("%s: Stat %s", self._host, stat)
+                length = self._read_int()
+                LOGGER.debug("%s: Length %s", self._host, length)
+                for _ in range(0, length):
+                    data.append(self._read_int())
+                span.count("bytes", (3 + length) * LUXTRONIK_SOCKET_READ_SIZE_INTEGER)
+            LOGGER.info("%s: Read %d calculations", self._host, length)
+            self._parse(calculations, data)
         return calculations
 
     def _read_visibilities(self, visibilities):
         data = []
-        self._send_ints(LUXTRONIK_VISIBILITIES_READ, 0)
-        cmd = self._read_int()
-        LOGGER.debug("%s: Command %s", self._host, cmd)
-        length = self._read_int()
-        LOGGER.debug("%s: Length %s", self._host, length)
-        for _ in range(0, length):
-            data.append(self._read_char())
-        LOGGER.info("%s: Read %d visibilities", self._host, length)
-        self._parse(visibilities, data)
+        with self._span("cfi.read_visibilities", command=LUXTRONIK_VISIBILITIES_READ):
+            self._send_ints(LUXTRONIK_VISIBILITIES_READ, 0)
+            with self._span("cfi.receive") as span:
+                cmd = self._read_int()
+                LOGGER.debug("%s: Command %s", self._host, cmd)
+                length = self._read_int()
+                LOGGER.debug("%s: Length %s", self._host, length)
+                for _ in range(0, length):
+                    data.append(self._read_char())
+                span.count("bytes", 2 * LUXTRONIK_SOCKET_READ_SIZE_INTEGER
+                    + length * LUXTRONIK_SOCKET_READ_SIZE_CHAR)
+            LOGGER.info("%s: Read %d visibilities", self._host, length)
+            self._parse(visibilities, data)
         return visibilities
 
     def _send_ints(self, *ints):
         "Low-level helper to send a tuple of ints"
         data = struct.pack(">" + "i" * len(ints), *ints)
         LOGGER.debug("%s: sending %s", self._host, data)
-        self._socket.sendall(data)
+        with self._span("cfi.send") as span:
+            self._socket.sendall(data)
+            span.count("bytes", len(data))
 
     def _read_bytes(self, count):
         "Low-level helper to receive a precise number of bytes"
@@ -274,30 +343,48 @@ class LuxtronikSocketInterface:
             raw_data (list[int]): List of raw register values.
                 The raw data must start at register index 0.
         """
+        with self._span("cfi.parse") as span:
+            self._parse_data(data_vector, raw_data)
+            span.count("registers", len(raw_data))
+
+    def _parse_data(self, data_vector, raw_data):
         raw_len = len(raw_data)
-        # Prepare a list of undefined indices
-        undefined = {i for i in range(0, raw_len)}
+        fields = data_vector.data
+        columns = fields.columns
+        # Mask of all indices used by the fields
+        used = columns.covered(raw_len)
+        # Changed fields are only tracked if someone is interested in
+        changes = [] if data_vector.observed else None
 
         # integrate the data into the fields
-        for pair in data_vector.data.items():
-            definition, field = pair
+        for pair, index, count in zip(fields.pairs, columns.index, columns.count):
+            field = pair.field
+            if changes is not None:
+                old_raw = field.raw
             # skip this field if there are not enough data
-            next_idx = definition.index + definition.count
+            next_idx = index + count
             if next_idx > raw_len:
                 # not enough registers
                 field.clear()
-                continue
-            # remove all used indices from the list of undefined indices
-            for index in range(definition.index, next_idx):
-                undefined.discard(index)
-            # integrate_data() also resets the write_pending flag,
-            # intentionally only for read fields
-            pair.integrate_data(raw_data, LUXTRONIK_CFI_REGISTER_BIT_SIZE)
+            else:
+                # integrate_data() also resets the write_pending flag,
+                # intentionally only for read fields
+                pair.integrate_data(raw_data, LUXTRONIK_CFI_REGISTER_BIT_SIZE)
+            if changes is not None and field.raw != old_raw:
+                changes.append((pair.definition, field, old_raw))
 
         # create an unknown field for additional data
-        for index in undefined:
+        unknown = []
+        index = used.find(0)
+        while index >= 0:
             # LOGGER.warning(f"Entry '%d' not in list of {self.name}", index)
             definition = data_vector.definitions.create_unknown_definition(index)
             field = definition.create_field()
             integrate_data(definition, field, raw_data, LUXTRONIK_CFI_REGISTER_BIT_SIZE, index)
-            data_vector.data.add_sorted(definition, field)
+            unknown.append((definition, field))
+            index = used.find(0, index + 1)
+        if unknown:
+            fields.extend_sorted(unknown)
+        if changes:
+            # Dispatched by `_with_lock_and_connect` once the lock has been released
+            self._pending_changes.append((data_vector, changes))
@@ -31,6 +31,8 @@ class DataVectorConfig(DataVector):
         # Add all available fields
         for d in self.definitions:
             self._data.add(d, d.create_field())
+        # The fields follow the definitions one by one, so the columns can be shared
+        self._data.share_columns(self.definitions.columns)
 
     @classmethod
     def empty(cls, safe=True):
@@ -79,4 +81,19 @@ class DataVectorConfig(DataVector):
         if field is None:
             field = definition.create_field()
         self._data.add_sorted(definition, field)
-        return field
\ No newline at end of file
+        return field
+
+    def add_many(self, defs_fields_names_or_idxs):
+        """
+        Adds multiple additional fields to this data vector at once.
+        Behaves like `add`, but the fields are sorted only once.
+
+        Args:
+            defs_fields_names_or_idxs (Iterable[LuxtronikDefinition | Base | str | int]):
+                Fields to add. Either by definition, name or index, or the fields itself.
+
+        Returns:
+            list[Base | None]: For each entry the added field object or the
+                existing field, otherwise None.
+        """
+        return self._add_many(defs_fields_names_or_idxs, lambda definition: True)
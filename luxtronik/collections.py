@@ -1,9 +1,16 @@
 """Common used collection objects."""
 
 import logging
+import struct
+
+from functools import lru_cache
 
 from luxtronik.datatypes import Base
-from luxtronik.definitions import LuxtronikDefinition, LuxtronikDefinitionsDictionary
+from luxtronik.definitions import (
+    LuxtronikDefinition,
+    LuxtronikDefinitionsColumns,
+    LuxtronikDefinitionsDictionary,
+)
 
 
 LOGGER = logging.getLogger(__name__)
@@ -13,6 +20,40 @@ LOGGER = logging.getLogger(__name__)
 # Common methods
 ###############################################################################
 
+# struct format characters of the byte-aligned chunk sizes
+_CHUNK_FORMATS = {8: "B", 16: "H", 32: "I", 64: "Q"}
+
+# Below these numbers of chunks, plain integer operations are faster
+# than the detour via `struct` and `int.from_bytes` / `int.to_bytes`
+_PACK_STRUCT_MIN_COUNT = 9
+_UNPACK_STRUCT_MIN_COUNT = 3
+
+@lru_cache(maxsize=None)
+def _get_chunk_struct(count, num_bits, reverse):
+    """
+    Return a `struct.Struct` for `count` chunks of `num_bits` bits each,
+    or None if the chunk size is not byte-aligned.
+    """
+    fmt = _CHUNK_FORMATS.get(num_bits)
+    if fmt is None:
+        return None
+    return struct.Struct(f"{'>' if reverse else '<'}{count}{fmt}")
+
+def _unpack_values_loop(packed, count, num_bits, reverse):
+    """Implementation of `unpack_values` for any chunk size."""
+    values = []
+    mask = (1 << num_bits) - 1
+
+    for idx in range(count):
+        # normal: idx = 0..n-1
+        # reversed: highest chunk first
+        bit_index = (count - 1 - idx) if reverse else idx
+
+        chunk = (packed >> (num_bits * bit_index)) & mask
+        values.append(chunk)
+
+    return values
+
 def pack_values(values, num_bits, reverse=True):
     """
     Packs a list of data chunks into one integer.
@@ -29,17 +70,18 @@ def pack_values(values, num_bits, reverse=True):
     Note:
         The smart home interface uses a chunk size of 16 bits.
     """
-    count = len(values)
     mask = (1 << num_bits) - 1
+    count = len(values)
+    chunk_struct = _get_chunk_struct(count, num_bits, reverse) \
+        if count >= _PACK_STRUCT_MIN_COUNT else None
+    if chunk_struct is not None:
+        data = chunk_struct.pack(*[value & mask for value in values])
+        return int.from_bytes(data, "big" if reverse else "little")
 
+    # Shift in the chunks, starting with the highest one
     result = 0
-    for idx, value in enumerate(values):
-        # normal: idx = 0..n-1
-        # reversed index: highest chunk first
-        bit_index = (count - 1 - idx) if reverse else idx
-
-        result |= (value & mask) << (num_bits * bit_index)
-
+    for value in (values if reverse else reversed(values)):
+        result = (result << num_bits) | (value & mask)
     return result
 
 def unpack_values(packed, count, num_bits, reverse=True):
@@ -59,18 +101,41 @@ def unpack_values(packed, count, num_bits, reverse=True):
     Note:
         The smart home interface uses a chunk size of 16 bits.
     """
-    values = []
-    mask = (1 << num_bits) - 1
-
-    for idx in range(count):
-        # normal: idx = 0..n-1
-        # reversed: highest chunk first
-        bit_index = (count - 1 - idx) if reverse else idx
+    chunk_struct = _get_chunk_struct(count, num_bits, reverse) \
+        if count >= _UNPACK_STRUCT_MIN_COUNT else None
+    if chunk_struct is None:
+        return _unpack_values_loop(packed, count, num_bits, reverse)
+    packed &= (1 << (num_bits * count)) - 1
+    data = packed.to_bytes(chunk_struct.size, "big" if reverse else "little")
+    return list(chunk_struct.unpack(data))
+
+def pack_all_values(values, chunks, num_bits, reverse=True):
+    """
+    Packs several ranges of data chunks into one integer each, in a single pass.
 
-        chunk = (packed >> (num_bits * bit_index)) & mask
-        values.append(chunk)
+    Args:
+        values (list[int]): raw data of multiple registers (e.g. of a whole block).
+        chunks (list[tuple[int, int]]): (offset, count) of each range within `values`.
+        num_bits (int): Number of bits per chunk.
+        reverse (bool): Use big-endian/MSB-first if true,
+            otherwise use little-endian/LSB-first order.
 
-    return values
+    Returns:
+        list[int]: Packed raw data for each range, in the order of `chunks`.
+            The results are equal to `pack_values` applied to each range.
+    """
+    chunk_struct = _get_chunk_struct(len(values), num_bits, reverse)
+    if chunk_struct is None:
+        return [pack_values(values[offset:offset + count], num_bits, reverse)
+            for offset, count in chunks]
+    mask = (1 << num_bits) - 1
+    # Every chunk is converted to bytes only once
+    data = chunk_struct.pack(*[value & mask for value in values])
+    size = num_bits // 8
+    order = "big" if reverse else "little"
+    from_bytes = int.from_bytes
+    return [from_bytes(data[offset * size:(offset + count) * size], order)
+        for offset, count in chunks]
 
 def get_data_arr(definition, field, num_bits):
     """
@@ -101,6 +166,22 @@ def get_data_arr(definition, field, num_bits):
         data = [data]
     return data if len(data) == definition.count else None
 
+def integrate_raw(definition, field, raw):
+    """
+    Integrate an already extracted (and packed) raw value into the field.
+
+    Args:
+        definition (LuxtronikDefinition): Meta-data of the field.
+        field (Base): Field object where to integrate the data.
+        raw (int | list[int] | None): Raw value of the field's registers.
+    """
+    raw = raw if definition.check_raw_not_none(raw) else None
+    # Perform bit shift operations
+    use_bit_offset = definition.bit_offset and definition.num_bits
+    if use_bit_offset and isinstance(raw, int):
+        raw = (raw >> definition.bit_offset) & ((1 << definition.num_bits) - 1)
+    field.raw = raw
+
 def integrate_data(definition, field, raw_data, num_bits, data_offset=-1):
     """
     Integrate the related parts of the `raw_data` into the field.
@@ -115,7 +196,6 @@ def integrate_data(definition, field, raw_data, num_bits, data_offset=-1):
     # Use data_offset if provided, otherwise the index
     data_offset = data_offset if data_offset >= 0 else definition.index
     # Use the information of the definition to extract the raw-value
-    use_bit_offset = definition.bit_offset and definition.num_bits
     if (data_offset + definition.count - 1) >= len(raw_data):
         raw = None
     elif definition.count == 1:
@@ -127,12 +207,7 @@ def integrate_data(definition, field, raw_data, num_bits, data_offset=-1):
         if should_pack and raw is not None :
             # Usually big-endian (reverse=True) is used
             raw = pack_values(raw, num_bits)
-
-    raw = raw if definition.check_raw_not_none(raw) else None
-    # Perform bit shift operations
-    if use_bit_offset and isinstance(raw, int):
-        raw = (raw >> definition.bit_offset) & ((1 << definition.num_bits) - 1)
-    field.raw = raw
+    integrate_raw(definition, field, raw)
 
 ###############################################################################
 # Definition / field pair
@@ -214,9 +289,14 @@ class LuxtronikFieldsDictionary:
         # into a name/index-to-definition-lookup and a definition-to-field-lookup
         self._def_lookup = LuxtronikDefinitionsDictionary()
         self._field_lookup = {}
+        # Identity index of all fields within the definition-to-field-lookup:
+        # id(field) -> number of definitions referring to it
+        self._field_refs = {}
         # Furthermore stores the definition-to-field-lookup separate from the
         # field-definition pairs to keep the index-sorted order when adding new entries
         self._pairs = [] # list of LuxtronikDefFieldPair
+        # Columnar view of the pair definitions, created on demand
+        self._columns = None
 
     def __getitem__(self, def_field_name_or_idx):
         """
@@ -252,10 +332,9 @@ class LuxtronikFieldsDictionary:
             True if the searched element was found, otherwise False.
         """
         if isinstance(def_field_name_or_idx, Base):
-            return any(def_field_name_or_idx is field for field in self._field_lookup.values())
+            return id(def_field_name_or_idx) in self._field_refs
         elif isinstance(def_field_name_or_idx, LuxtronikDefinition):
-            # speed-up the look-up by search only the name-dict
-            return def_field_name_or_idx.name in self._def_lookup._name_dict
+            return def_field_name_or_idx in self._field_lookup
         else:
             return def_field_name_or_idx in self._def_lookup
 
@@ -272,6 +351,17 @@ class LuxtronikFieldsDictionary:
         """Return all definition-field-pairs contained herein."""
         return self._pairs
 
+    @property
+    def columns(self):
+        """
+        Return the columnar store (`LuxtronikDefinitionsColumns`) of all definitions
+        related to the added fields, in the same order as the pairs.
+        It is created on first use and re-created after fields have been added.
+        """
+        if self._columns is None:
+            self._columns = LuxtronikDefinitionsColumns(pair.definition for pair in self._pairs)
+        return self._columns
+
     @property
     def def_dict(self):
         """
@@ -288,6 +378,60 @@ class LuxtronikFieldsDictionary:
         """
         return self._field_lookup
 
+    def share_columns(self, columns):
+        """
+        Use an existing columnar store (e.g. `LuxtronikDefinitionsList.columns`)
+        instead of creating a new one. Only applied if it describes exactly
+        the definitions of the added fields in the same order.
+
+        Args:
+            columns (LuxtronikDefinitionsColumns): Columns to share.
+        """
+        definitions = columns.definitions
+        if len(definitions) == len(self._pairs) \
+                and all(d is pair.definition for d, pair in zip(definitions, self._pairs)):
+            self._columns = columns
+
+    def _register(self, definition, field):
+        """
+        Add a definition-field-pair to the internal lookup dictionaries
+        without creating a pair object.
+
+        Args:
+            definition (LuxtronikDefinition): Definition related to the field.
+            field (Base): Field to add.
+        """
+        self._def_lookup.add(definition)
+        previous = self._field_lookup.get(definition)
+        if previous is not None:
+            key = id(previous)
+            self._field_refs[key] -= 1
+            if self._field_refs[key] == 0:
+                del self._field_refs[key]
+        self._field_lookup[definition] = field
+        self._field_refs[id(field)] = self._field_refs.get(id(field), 0) + 1
+
+    def _insert_position(self, index):
+        """
+        Determine the position behind all pairs with a lower or equal index
+        via binary search (like `bisect.bisect_right`).
+
+        Args:
+            index (int): Register index of the pair to insert.
+
+        Returns:
+            int: Position within `_pairs`.
+        """
+        pairs = self._pairs
+        lo, hi = 0, len(pairs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if index < pairs[mid].definition.index:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
     def add(self, definition, field):
         """
         Add a definition-field-pair to the internal dictionaries.
@@ -299,22 +443,61 @@ class LuxtronikFieldsDictionary:
         Note: Only use this method if the definitions order is already correct.
         """
         if definition.valid:
-            self._def_lookup.add(definition)
-            self._field_lookup[definition] = field
+            self._register(definition, field)
             self._pairs.append(LuxtronikDefFieldPair(definition, field))
+            self._columns = None
 
     def add_sorted(self, definition, field):
         """
-        Behaves like the normal `add` but then sorts the pairs.
+        Behaves like the normal `add` but inserts the pair at the correct position.
+        Pairs with the same index keep their order of addition.
 
         Args:
             definition (LuxtronikDefinition): Definition related to the field.
             field (Base): Field to add.
         """
         if definition.valid:
-            self.add(definition, field)
-            # sort _pairs by definition.index
-            self._pairs.sort(key=lambda pair: pair.definition.index)
+            self._register(definition, field)
+            pos = self._insert_position(definition.index)
+            self._pairs.insert(pos, LuxtronikDefFieldPair(definition, field))
+            self._columns = None
+
+    def add_many(self, pairs):
+        """
+        Behaves like the normal `add` for multiple definition-field-pairs.
+
+        Args:
+            pairs (Iterable[tuple[LuxtronikDefinition, Base]]):
+                Definition-field-pairs to add.
+
+        Note: Only use this method if the definitions order is already correct.
+        """
+        for definition, field in pairs:
+            if definition.valid:
+                self._register(definition, field)
+                self._pairs.append(LuxtronikDefFieldPair(definition, field))
+        self._columns = None
+
+    def extend_sorted(self, pairs):
+        """
+        Behaves like `add_sorted` for multiple definition-field-pairs,
+        but sorts the pairs only once afterwards (if necessary at all).
+        Pairs with the same index keep their order of addition.
+
+        Args:
+            pairs (Iterable[tuple[LuxtronikDefinition, Base]]):
+                Definition-field-pairs to add.
+        """
+        start = len(self._pairs)
+        self.add_many(pairs)
+        last_index = self._pairs[start - 1].definition.index if start > 0 else None
+        for pair in self._pairs[start:]:
+            index = pair.definition.index
+            if last_index is not None and index < last_index:
+                # The sort is stable, so equal indices keep their order
+                self._pairs.sort(key=lambda pair: pair.definition.index)
+                break
+            last_index = index
 
     def get(self, def_field_name_or_idx, default=None):
         """
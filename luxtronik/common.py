@@ -1,18 +1,215 @@
 
-from threading import RLock
+import heapq
+import itertools
+import threading
+import time
+from threading import Condition, RLock
+from weakref import WeakValueDictionary
+
+from luxtronik.instrumentation import Histogram
 
 ###############################################################################
 # Multi-threading lock mechanism
 ###############################################################################
 
+# Priorities of the host lock. Waiting writes are served before waiting reads,
+# so a busy poller cannot delay a write for several read cycles.
+LUXTRONIK_LOCK_PRIORITY_READ = 0
+LUXTRONIK_LOCK_PRIORITY_WRITE = 1
+
+
+class HostLock:
+    """
+    Reentrant lock with fair queuing and contention statistics.
+    Drop-in replacement for `threading.RLock`.
+
+    Waiting threads are served in FIFO order within the same priority,
+    higher priorities first. The lock is handed over directly to the next
+    waiter on release, so a thread that releases and immediately re-acquires
+    the lock (e.g. a poller) cannot overtake the waiting threads.
+    """
+
+    def __init__(self, host=None):
+        """
+        Initialize the unlocked lock.
+
+        Args:
+            host (str | None): Host protected by this lock, only informative.
+        """
+        self.host = host
+        self._mutex = threading.Lock()
+        self._owner = None
+        self._count = 0
+        self._acquired_at = 0.0
+        # Heap of waiting threads: (-priority, sequence, thread id, condition, start time)
+        self._waiters = []
+        self._sequence = itertools.count()
+        self.wait_histogram = Histogram()
+        self.hold_histogram = Histogram()
+        self.acquisitions = 0
+        self.contentions = 0
+        self.timeouts = 0
+        self.max_waiters = 0
+
+    def __repr__(self):
+        return f"HostLock({self.host}, owner={self._owner}, count={self._count}, " \
+            + f"waiters={len(self._waiters)})"
+
+    @property
+    def waiters(self):
+        """Number of threads waiting for the lock."""
+        return len(self._waiters)
+
+    def _take(self, thread_id, start):
+        """Take over the lock. Must be called with the mutex held."""
+        now = time.perf_counter()
+        self._owner = thread_id
+        self._count = 1
+        self._acquired_at = now
+        self.acquisitions += 1
+        self.wait_histogram.record(now - start)
+
+    def acquire(self, blocking=True, timeout=-1, priority=LUXTRONIK_LOCK_PRIORITY_READ):
+        """
+        Acquire the lock. The owning thread can acquire it again,
+        without waiting and regardless of the priority.
+
+        Args:
+            blocking (bool): If false, return immediately if the lock is taken.
+            timeout (float): Maximum wait time in seconds, -1 waits forever.
+            priority (int): Waiters with a higher priority are served first.
+
+        Returns:
+            bool: True if the lock was acquired, otherwise False.
+        """
+        thread_id = threading.get_ident()
+        start = time.perf_counter()
+        with self._mutex:
+            if self._owner == thread_id:
+                self._count += 1
+                return True
+            if self._owner is None and not self._waiters:
+                self._take(thread_id, start)
+                return True
+            if not blocking:
+                return False
+
+            self.contentions += 1
+            condition = Condition(self._mutex)
+            waiter = (-priority, next(self._sequence), thread_id, condition, start)
+            heapq.heappush(self._waiters, waiter)
+            self.max_waiters = max(self.max_waiters, len(self._waiters))
+            deadline = start + timeout if timeout >= 0 else None
+            try:
+                while self._owner != thread_id:
+                    remaining = None if deadline is None else deadline - time.perf_counter()
+                    if remaining is not None and remaining <= 0:
+                        self._waiters.remove(waiter)
+                        heapq.heapify(self._waiters)
+                        self.timeouts += 1
+                        return False
+                    condition.wait(remaining)
+            except BaseException:
+                # E.g. KeyboardInterrupt: Leave the queue, otherwise the lock
+                # would be handed over to a thread that no longer waits for it.
+                if self._owner == thread_id:
+                    self._hand_over()
+                else:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                raise
+            return True
+
+    def release(self):
+        """
+        Release the lock once. Hand it over to the next waiter
+        if the owner released all acquisitions.
+        """
+        with self._mutex:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("cannot release un-acquired lock")
+            self._count -= 1
+            if self._count > 0:
+                return
+            self._hand_over()
+
+    def _hand_over(self):
+        """Release the lock to the next waiter. Must be called with the mutex held."""
+        self.hold_histogram.record(time.perf_counter() - self._acquired_at)
+        self._owner = None
+        self._count = 0
+        if self._waiters:
+            _, _, thread_id, condition, start = heapq.heappop(self._waiters)
+            self._take(thread_id, start)
+            condition.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+    # Used by `threading.Condition`
+
+    def _is_owned(self):
+        """Return True if the current thread owns the lock."""
+        return self._owner == threading.get_ident()
+
+    def _release_save(self):
+        """
+        Release the lock completely, regardless of how often it was acquired.
+
+        Returns:
+            int: Number of acquisitions, to be restored via `_acquire_restore`.
+        """
+        with self._mutex:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("cannot release un-acquired lock")
+            count = self._count
+            self._hand_over()
+        return count
+
+    def _acquire_restore(self, count):
+        """Re-acquire the lock and restore the number of acquisitions saved by `_release_save`."""
+        self.acquire()
+        with self._mutex:
+            self._count = count
+
+    def reset_stats(self):
+        with self._mutex:
+            self.wait_histogram = Histogram()
+            self.hold_histogram = Histogram()
+            self.acquisitions = 0
+            self.contentions = 0
+            self.timeouts = 0
+            self.max_waiters = len(self._waiters)
+
+    def to_dict(self):
+        """Return a JSON compatible summary of the contention statistics."""
+        with self._mutex:
+            return {
+                "acquisitions": self.acquisitions,
+                "contentions": self.contentions,
+                "timeouts": self.timeouts,
+                "waiters": len(self._waiters),
+                "max_waiters": self.max_waiters,
+                "wait": self.wait_histogram.to_dict(),
+                "hold": self.hold_histogram.to_dict(),
+            }
+
+
 # Global lock to synchronize access to the hosts_locks dictionary
 _management_lock = RLock()
-_hosts_locks = {}
+# The locks are only kept as long as they are in use (e.g. by an interface).
+# This way the dictionary does not grow with every host ever used.
+_hosts_locks = WeakValueDictionary()
 
 def get_host_lock(host):
     """
     Retrieve the unique lock object associated with a given host.
-    The same thread can acquire a RLock as often as desired.
+    The same thread can acquire the lock as often as desired.
 
     If no lock exists for the host, a new one is created in a thread-safe manner.
 
@@ -20,13 +217,26 @@ def get_host_lock(host):
         host (str): Hostname or IP address.
 
     Returns:
-        RLock: The lock object dedicated to the given host.
+        HostLock: The lock object dedicated to the given host.
     """
     # Ensure a dedicated lock is created for each IP.
     with _management_lock:
-        if host not in _hosts_locks:
-            _hosts_locks[host] = RLock()
-        return _hosts_locks[host]
+        lock = _hosts_locks.get(host)
+        if lock is None:
+            lock = HostLock(host)
+            _hosts_locks[host] = lock
+        return lock
+
+def get_host_lock_stats():
+    """
+    Return the contention statistics of all host locks in use.
+
+    Returns:
+        dict[str, dict]: Summary per host, see `HostLock.to_dict()`.
+    """
+    with _management_lock:
+        locks = list(_hosts_locks.items())
+    return {str(host): lock.to_dict() for host, lock in locks}
 
 ###############################################################################
 # Class property
@@ -4,12 +4,162 @@ import logging
 
 from luxtronik.collections import LuxtronikFieldsDictionary
 from luxtronik.datatypes import Base, Unknown
+from luxtronik.decoding import decode_all, to_numpy
 from luxtronik.definitions import LuxtronikDefinition
 
 
 LOGGER = logging.getLogger(__name__)
 
 
+###############################################################################
+# Resolved field handles
+###############################################################################
+
+class FieldHandle:
+    """
+    Resolved reference to a field of a data vector type.
+
+    The name or index is resolved only once on creation (see `DataVector.handle`).
+    Afterwards, the field of any data vector instance of this type can be accessed
+    via the definition object, without any further name or index look-up.
+    """
+
+    __slots__ = ("_definition", "_vector_type")
+
+    def __init__(self, definition, vector_type):
+        """
+        Initialize a field handle.
+
+        Args:
+            definition (LuxtronikDefinition): The resolved definition.
+            vector_type (type[DataVector]): Data vector type the definition belongs to.
+        """
+        self._definition = definition
+        self._vector_type = vector_type
+
+    def __repr__(self):
+        return f"FieldHandle({self._vector_type.name}, {self._definition.name})"
+
+    @property
+    def definition(self):
+        return self._definition
+
+    @property
+    def vector_type(self):
+        return self._vector_type
+
+    @property
+    def name(self):
+        return self._definition.name
+
+    def field(self, data_vector):
+        """
+        Return the field of the data vector related to this handle.
+
+        Args:
+            data_vector (DataVector): Data vector of type `vector_type`.
+
+        Returns:
+            Base | None: The related field or None if the data vector does not contain it.
+        """
+        return data_vector._data._field_lookup.get(self._definition)
+
+    def raw(self, data_vector):
+        """
+        Return the raw value of the field related to this handle.
+
+        Args:
+            data_vector (DataVector): Data vector of type `vector_type`.
+
+        Returns:
+            int | list[int] | None: The raw value or None if the field is not contained.
+        """
+        field = data_vector._data._field_lookup.get(self._definition)
+        return None if field is None else field.raw
+
+    def value(self, data_vector):
+        """
+        Return the value of the field related to this handle.
+
+        Args:
+            data_vector (DataVector): Data vector of type `vector_type`.
+
+        Returns:
+            Any: The value or None if the field is not contained.
+        """
+        field = data_vector._data._field_lookup.get(self._definition)
+        return None if field is None else field.value
+
+
+class FieldHandleGroup:
+    """
+    Batch of resolved field handles of the same data vector type.
+
+    All fields are read in one go. Names that could not be resolved
+    are kept as placeholders, which always yield None.
+    """
+
+    __slots__ = ("_handles", "_definitions")
+
+    def __init__(self, handles):
+        """
+        Initialize a group of field handles.
+
+        Args:
+            handles (list[FieldHandle | None]): Handles to combine.
+        """
+        self._handles = list(handles)
+        self._definitions = [None if h is None else h.definition for h in self._handles]
+
+    def __len__(self):
+        return len(self._handles)
+
+    def __iter__(self):
+        return iter(self._handles)
+
+    def __getitem__(self, index):
+        return self._handles[index]
+
+    def fields(self, data_vector):
+        """
+        Return the fields related to all handles.
+
+        Args:
+            data_vector (DataVector): Data vector of the handles' type.
+
+        Returns:
+            list[Base | None]: The related fields in the order of the handles.
+        """
+        lookup = data_vector._data._field_lookup
+        return [lookup.get(d) for d in self._definitions]
+
+    def raws(self, data_vector):
+        """
+        Return the raw values of the fields related to all handles.
+
+        Args:
+            data_vector (DataVector): Data vector of the handles' type.
+
+        Returns:
+            list[int | list[int] | None]: The raw values in the order of the handles.
+        """
+        lookup = data_vector._data._field_lookup
+        return [None if f is None else f.raw for f in map(lookup.get, self._definitions)]
+
+    def values(self, data_vector):
+        """
+        Return the values of the fields related to all handles.
+
+        Args:
+            data_vector (DataVector): Data vector of the handles' type.
+
+        Returns:
+            list[Any]: The values in the order of the handles.
+        """
+        lookup = data_vector._data._field_lookup
+        return [None if f is None else f.value for f in map(lookup.get, self._definitions)]
+
+
 ###############################################################################
 # Base class for all luxtronik data vectors
 ###############################################################################
@@ -98,6 +248,47 @@ class DataVector:
         return None
 
 
+    @classmethod
+    def handle(cls, def_name_or_idx):
+        """
+        Resolve a definition once and return a handle for fast repeated access
+        to the related field of any data vector instance of this type.
+        Triggers a key error when we try to resolve obsolete fields.
+
+        Args:
+            def_name_or_idx (LuxtronikDefinition | str | int): Definitions object,
+                field name or register index.
+
+        Returns:
+            FieldHandle | None: The created handle, or None if not found or not valid.
+        """
+        obsolete_entry = cls._obsolete.get(def_name_or_idx, None)
+        if obsolete_entry:
+            raise KeyError(f"The name '{def_name_or_idx}' is obsolete! Use '{obsolete_entry}' instead.")
+        if isinstance(def_name_or_idx, LuxtronikDefinition):
+            definition = def_name_or_idx
+        else:
+            definition = cls.definitions.get(def_name_or_idx)
+        if definition is None or not definition.valid:
+            LOGGER.warning(f"entry '{def_name_or_idx}' not found")
+            return None
+        return FieldHandle(definition, cls)
+
+    @classmethod
+    def handles(cls, defs_names_or_idxs):
+        """
+        Resolve multiple definitions at once. See `handle` for details.
+
+        Args:
+            defs_names_or_idxs (Iterable[LuxtronikDefinition | str | int]):
+                Definitions objects, field names or register indices.
+
+        Returns:
+            FieldHandleGroup: The created group. Entries that could not be resolved yield None.
+        """
+        return FieldHandleGroup(cls.handle(item) for item in defs_names_or_idxs)
+
+
 # constructor, magic methods and iterators ####################################
 
     def _init_instance(self, safe):
@@ -107,6 +298,11 @@ class DataVector:
         # Dictionary that holds all fields
         self._data = LuxtronikFieldsDictionary()
 
+        # Change observers: definition -> list of callbacks,
+        # and callbacks for changes of any field
+        self._subscriptions = {}
+        self._change_callbacks = []
+
     def __init__(self):
         """Initialize DataVector class."""
         self._init_instance(True)
@@ -168,6 +364,121 @@ class DataVector:
         """
         return iter(self._data.items())
 
+    def decode_all(self, use_numpy=True):
+        """
+        Forward the `luxtronik.decoding.decode_all` method.
+        Please check its documentation.
+        """
+        return decode_all(self, use_numpy)
+
+    def to_numpy(self):
+        """
+        Forward the `luxtronik.decoding.to_numpy` method.
+        Please check its documentation.
+        """
+        return to_numpy(self)
+
+
+# Change observers ############################################################
+
+    @property
+    def observed(self):
+        """Return True if any callback is registered for changes."""
+        return bool(self._subscriptions or self._change_callbacks)
+
+    def subscribe(self, def_name_or_handle, callback):
+        """
+        Register a callback for changes of a single field.
+
+        Changes are detected while the read data is integrated into the fields
+        (old and new raw value differ). The callbacks are called after each read.
+
+        Args:
+            def_name_or_handle (LuxtronikDefinition | FieldHandle | str | int):
+                Definition, handle, name or register index of the field.
+            callback (callable): Function `callback(definition, field, old_raw)`.
+
+        Returns:
+            bool: True if the callback was registered, False if the field was not found.
+        """
+        if isinstance(def_name_or_handle, FieldHandle):
+            def_name_or_handle = def_name_or_handle.definition
+        definition, _ = self._get_definition(def_name_or_handle, True)
+        if definition is None:
+            LOGGER.warning(f"entry '{def_name_or_handle}' not found")
+            return False
+        self._subscriptions.setdefault(definition, []).append(callback)
+        return True
+
+    def on_any_change(self, callback):
+        """
+        Register a callback for changes of any field.
+        The callback is called once per read with all changes of this read.
+
+        Args:
+            callback (callable): Function `callback(changes)`, where changes is a
+                list of `(definition, field, old_raw)` tuples.
+        """
+        self._change_callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        Remove all registrations of a callback.
+
+        Args:
+            callback (callable): Callback previously passed
+                to `subscribe` or `on_any_change`.
+
+        Returns:
+            bool: True if at least one registration was removed.
+        """
+        removed = False
+        for definition, callbacks in list(self._subscriptions.items()):
+            if callback in callbacks:
+                callbacks[:] = [c for c in callbacks if c != callback]
+                removed = True
+                if not callbacks:
+                    del self._subscriptions[definition]
+        if callback in self._change_callbacks:
+            self._change_callbacks[:] = [c for c in self._change_callbacks if c != callback]
+            removed = True
+        return removed
+
+    def share_observers(self, data_vector):
+        """
+        Use the change observers of another data vector of the same type,
+        e.g. for partial vectors that contain fields of the other one.
+
+        Args:
+            data_vector (DataVector): Data vector that holds the observers.
+        """
+        self._subscriptions = data_vector._subscriptions
+        self._change_callbacks = data_vector._change_callbacks
+
+    def notify_changes(self, changes):
+        """
+        Dispatch detected changes to the registered callbacks.
+        Called by the interfaces after the read data has been integrated.
+
+        Args:
+            changes (list[tuple[LuxtronikDefinition, Base, Any]]):
+                `(definition, field, old_raw)` tuple for each changed field.
+        """
+        if not changes:
+            return
+        if self._subscriptions:
+            for change in changes:
+                for callback in self._subscriptions.get(change[0], ()):
+                    try:
+                        callback(*change)
+                    except Exception as e:
+                        LOGGER.error(f"Change callback failed for '{change[0].name}': {e}")
+        for callback in list(self._change_callbacks):
+            try:
+                callback(changes)
+            except Exception as e:
+                LOGGER.error(f"Change callback failed: {e}")
+
 
 # Get and set methods #########################################################
 
@@ -209,6 +520,53 @@ class DataVector:
                 definition = self._data.def_dict.get(definition)
         return definition, field
 
+    def _add_many(self, defs_fields_names_or_idxs, accept):
+        """
+        Re-usable method to add multiple fields at once.
+        The fields are sorted only once afterwards. Existing fields will not be overwritten.
+
+        Args:
+            defs_fields_names_or_idxs (Iterable[LuxtronikDefinition | Base | str | int]):
+                Fields to add. Either by definition, name or index, or the fields itself.
+            accept (Callable[[LuxtronikDefinition], bool]):
+                Callback to decide whether a field of this definition may be added.
+
+        Returns:
+            list[Base | None]: For each entry the added field object or the existing field,
+                otherwise None.
+        """
+        fields = []
+        new_pairs = []
+        pending = {}
+        for def_field_name_or_idx in defs_fields_names_or_idxs:
+            # Look-up the related definition
+            definition, field = self._get_definition(def_field_name_or_idx, True)
+            if definition is None:
+                fields.append(None)
+                continue
+
+            # Check if the field already exists
+            existing_field = self._data.get(definition, None)
+            if existing_field is None:
+                existing_field = pending.get(definition, None)
+            if existing_field is not None:
+                fields.append(existing_field)
+                continue
+
+            # Collect a (new) field
+            if not accept(definition):
+                fields.append(None)
+                continue
+            if field is None:
+                field = definition.create_field()
+            pending[definition] = field
+            new_pairs.append((definition, field))
+            fields.append(field)
+
+        if new_pairs:
+            self._data.extend_sorted(new_pairs)
+        return fields
+
     def get(self, def_field_name_or_idx, default=None):
         """
         Retrieve an added field by definition, field, name or register index.
@@ -231,6 +589,9 @@ class DataVector:
             If multiple fields added for the same index/name,
             the last added takes precedence.
         """
+        # resolved handles do not need any look-up
+        if isinstance(def_field_name_or_idx, FieldHandle):
+            return def_field_name_or_idx.field(self)
         # check for obsolete
         obsolete_entry = self._obsolete.get(def_field_name_or_idx, None)
         if obsolete_entry:
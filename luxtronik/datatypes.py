@@ -13,6 +13,9 @@ from functools import total_ordering
 
 LOGGER = logging.getLogger(__name__)
 
+# Marker for "no decoded value available"
+_NOT_DECODED = object()
+
 
 @total_ordering
 class Base:
@@ -32,6 +35,9 @@ class Base:
         # save the raw value only since the user value
         # could be build at any time
         self._raw = None
+        # the last decoded value together with the raw value it belongs to
+        self._decoded_raw = _NOT_DECODED
+        self._decoded_value = None
         if isinstance(names, list):
             self._names = names
         else:
@@ -67,13 +73,25 @@ class Base:
 
     @property
     def value(self):
-        """Return the stored value converted from heatpump units."""
-        return self.from_heatpump(self._raw)
+        """
+        Return the stored value converted from heatpump units.
+        The converted value is cached until the raw value changes.
+        """
+        raw = self._raw
+        if raw is self._decoded_raw:
+            return self._decoded_value
+        value = self.from_heatpump(raw)
+        # Lists could be modified in-place, therefore they are not cached
+        if not isinstance(raw, list):
+            self._decoded_raw = raw
+            self._decoded_value = value
+        return value
 
     @value.setter
     def value(self, value):
         """Converts the value into heatpump units and store it."""
         self._raw = self.to_heatpump(value)
+        self._decoded_raw = _NOT_DECODED
         if self._raw is None:
             LOGGER.warning(f"Value '{value}' not valid for field '{self.name}'")
         self.write_pending = True
@@ -92,6 +110,7 @@ class Base:
         self.clear(True)
         if not (LUXTRONIK_PRESERVE_LAST_VALUE and raw is None):
             self._raw = raw
+            self._decoded_raw = _NOT_DECODED
 
     def __repr__(self):
         """Returns a printable representation of the datatype object"""
@@ -145,6 +164,7 @@ class Base:
         self.write_pending = False
         if not preserve_raw_value:
             self._raw = None
+            self._decoded_raw = _NOT_DECODED
 
 
     def check_for_write(self, safe=True):
@@ -181,10 +201,29 @@ class SelectionBase(Base):
     unknown_delimiter = "_"
     codes = {}
 
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls._build_tables()
+
+    @classmethod
+    def _build_tables(cls):
+        """
+        Build the list of options and the reverse table
+        "sanitized option -> code" once per class.
+        Must be called again if `codes` is changed at runtime.
+        """
+        lookup = {}
+        for index, code in cls.codes.items():
+            code, _ = cls.sanitize_option(code)
+            # If several codes share the same option, the first one wins
+            lookup.setdefault(code, index)
+        cls._options = tuple(cls.codes.values())
+        cls._code_lookup = lookup
+
     @classmethod
     def options(cls):
         """Return list of all available options."""
-        return [value for _, value in cls.codes.items()]
+        return list(cls._options)
 
     @classmethod
     def sanitize_option(cls, option):
@@ -197,24 +236,28 @@ class SelectionBase(Base):
     def from_heatpump(cls, value):
         if not isinstance(value, int):
             return None
-        if value in cls.codes:
-            return cls.codes.get(value)
+        code = cls.codes.get(value)
+        if code is not None:
+            return code
         return f"{cls.unknown_prefix}{cls.unknown_delimiter}{value}"
 
     @classmethod
     def to_heatpump(cls, value):
         value, value_is_str = cls.sanitize_option(value)
-        for index, code in cls.codes.items():
-            code, _ = cls.sanitize_option(code)
-            if code == value:
+        if value_is_str:
+            index = cls._code_lookup.get(value)
+            if index is not None:
                 return index
-        if value_is_str and value.startswith(cls.unknown_prefix.lower()):
-            return int(value.split(cls.unknown_delimiter.lower())[1])
+            if value.startswith(cls.unknown_prefix.lower()):
+                return int(value.split(cls.unknown_delimiter.lower())[1])
         if isinstance(value, (int, float)) or (value_is_str and value.isdigit()):
             return int(value)
         return None
 
 
+SelectionBase._build_tables()
+
+
 class BitMaskBase(Base):
 
     datatype_class = "bitmask"
@@ -227,6 +270,28 @@ class BitMaskBase(Base):
     value_delim = ", "
     values_postfix = ""
 
+    # We support up to 32 bits
+    num_bits = 32
+    # Maximum number of decoded values kept per subclass
+    decode_cache_size = 256
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls._build_tables()
+
+    @classmethod
+    def _build_tables(cls):
+        """
+        Build the forward table "bit-index -> bit value" and
+        the reverse table "bit value -> bit-mask" once per class.
+        """
+        cls._bit_names = tuple(cls._get_bit_value(bit_index) for bit_index in range(cls.num_bits))
+        lookup = {}
+        for bit_index, bit_value in enumerate(cls._bit_names):
+            lookup[bit_value] = lookup.get(bit_value, 0) | (1 << bit_index)
+        cls._bit_lookup = lookup
+        cls._decode_cache = {}
+
     @classmethod
     def bits(cls):
         """Return list of all available bits."""
@@ -250,15 +315,21 @@ class BitMaskBase(Base):
         # Check for zero
         if value == 0:
             return cls.value_zero
-        # We support up to 32 bits
-        result = []
-        for bit_index in range(0, 32):
-            if value & (1 << bit_index):
-                bit_value = cls._get_bit_value(bit_index)
-                result.append(bit_value)
-        result = cls.value_delim.join(result)
+        result = cls._decode_cache.get(value)
+        if result is not None:
+            return result
+        names = cls._bit_names
+        bits = value & ((1 << cls.num_bits) - 1)
+        parts = []
+        while bits:
+            lowest = bits & -bits
+            parts.append(names[lowest.bit_length() - 1])
+            bits ^= lowest
         # Add postfix
-        return result + cls.values_postfix
+        result = cls.value_delim.join(parts) + cls.values_postfix
+        if len(cls._decode_cache) < cls.decode_cache_size:
+            cls._decode_cache[value] = result
+        return result
 
     @classmethod
     def to_heatpump(cls, value):
@@ -270,20 +341,22 @@ class BitMaskBase(Base):
         # Check for zero
         if value == cls.value_zero:
             return 0
-        # We support up to 32 bits
         values = value.split(cls.value_delim)
-        raw = 0
-        count = 0
-        for bit_index in range(0, 32):
-            bit_value = cls._get_bit_value(bit_index)
-            if bit_value in values:
-                raw += 1 << bit_index
-                count += 1
-        if count != len(values):
+        if len(set(values)) != len(values):
             return None
+        raw = 0
+        for bit_value in values:
+            mask = cls._bit_lookup.get(bit_value)
+            if mask is None or mask & (mask - 1):
+                # Unknown value or ambiguous value (assigned to multiple bits)
+                return None
+            raw |= mask
         return raw
 
 
+BitMaskBase._build_tables()
+
+
 class ScalingBase(Base):
     """Scaling base datatype, converts via a scaling factor."""
 
@@ -0,0 +1,257 @@
+"""
+Decode all fields of a data vector at once.
+
+If NumPy is installed, the fields are grouped by their datatype
+(scaling, boolean and plain integer values) and each group is decoded
+with a few vectorized operations. NumPy is an optional dependency:
+Without it, `decode_all` falls back to the per-field conversion
+and `to_numpy` is not available.
+"""
+
+import logging
+import weakref
+
+from luxtronik.datatypes import Base, Bool, ScalingBase
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+LOGGER = logging.getLogger(__name__)
+
+GROUP_PLAIN = "plain"
+GROUP_BOOL = "bool"
+GROUP_SCALING = "scaling"
+
+# Cache of the decode group per datatype class
+_groups = {}
+
+
+###############################################################################
+# Grouping
+###############################################################################
+
+def _inherits_from_heatpump(field_type, base):
+    """Return True if `field_type` uses the unmodified `from_heatpump` of `base`."""
+    return field_type.from_heatpump.__func__ is base.from_heatpump.__func__
+
+def get_decode_group(field_type):
+    """
+    Determine the group of fields which can be decoded together.
+
+    Args:
+        field_type (type[Base]): Datatype class of the field.
+
+    Returns:
+        tuple | None: Hashable group key, or None if the datatype
+            can not be decoded vectorized.
+    """
+    group = _groups.get(field_type, False)
+    if group is not False:
+        return group
+
+    group = None
+    if issubclass(field_type, ScalingBase):
+        if _inherits_from_heatpump(field_type, ScalingBase):
+            group = (
+                GROUP_SCALING,
+                field_type.scaling_factor,
+                field_type.precision,
+                field_type.data_width,
+                field_type.data_type == "signed",
+            )
+    elif issubclass(field_type, Bool):
+        if _inherits_from_heatpump(field_type, Bool):
+            group = (GROUP_BOOL,)
+    elif issubclass(field_type, Base):
+        if _inherits_from_heatpump(field_type, Base):
+            group = (GROUP_PLAIN,)
+
+    _groups[field_type] = group
+    return group
+
+class _DecodePlan:
+    """
+    Grouping of the fields of one data vector, re-used
+    until fields are added to the data vector.
+    """
+
+    def __init__(self, fields_dict):
+        self.columns = fields_dict.columns
+        self.names = []
+        # group -> ([positions], [fields])
+        self.groups = {}
+        # [(position, field)] of fields which can not be decoded vectorized
+        self.remaining = []
+        # numeric columns for `to_numpy`: name -> position
+        self.numeric = {}
+        # Resolve the group only once per field type
+        columns = self.columns
+        field_types = columns.field_types
+        type_groups = [get_decode_group(t) for t in field_types]
+        for pos, (definition, field) in enumerate(fields_dict.pairs):
+            self.names.append(definition.name)
+            field_type = type(field)
+            type_id = columns.type_id[pos]
+            if field_type is field_types[type_id]:
+                group = type_groups[type_id]
+            else:
+                # e.g. a field which does not match its definition
+                group = get_decode_group(field_type)
+            if group is None:
+                self.remaining.append((pos, field))
+                continue
+            positions, fields = self.groups.setdefault(group, ([], []))
+            positions.append(pos)
+            fields.append(field)
+            self.numeric.setdefault(definition.name, pos)
+        self._dtype = None
+
+    @property
+    def dtype(self):
+        """Structured dtype with one float64 column per numeric field."""
+        if self._dtype is None:
+            self._dtype = np.dtype([(name, np.float64) for name in self.numeric])
+        return self._dtype
+
+# Decode plans by fields dictionary
+_plans = weakref.WeakKeyDictionary()
+
+def _get_plan(data_vector):
+    """Return the (cached) decode plan of a data vector."""
+    fields_dict = data_vector.data
+    plan = _plans.get(fields_dict)
+    if plan is None or plan.columns is not fields_dict.columns:
+        plan = _DecodePlan(fields_dict)
+        _plans[fields_dict] = plan
+    return plan
+
+def _to_int_array(fields):
+    """
+    Collect the raw values of the fields into an integer array.
+
+    Returns:
+        tuple[numpy.ndarray, list[int] | None]: The raw values and the
+            offsets of all fields with a valid raw value, or None if all are valid.
+    """
+    raws = [field.raw for field in fields]
+    try:
+        arr = np.array(raws)
+        if arr.ndim == 1 and arr.dtype.kind == "i":
+            return arr.astype(np.int64, copy=False), None
+    except ValueError:
+        # e.g. lists of different lengths
+        pass
+    valid = [i for i, raw in enumerate(raws) if isinstance(raw, int)]
+    raws = [raws[i] for i in valid]
+    try:
+        return np.array(raws, dtype=np.int64), valid
+    except OverflowError:
+        return np.array(raws, dtype=np.float64), valid
+
+def _decode_group(group, raws):
+    """
+    Decode the raw values of one group vectorized.
+
+    Args:
+        group (tuple): Group key as returned by `get_decode_group`.
+        raws (numpy.ndarray): Integer raw values.
+
+    Returns:
+        numpy.ndarray: The decoded values.
+    """
+    if group[0] == GROUP_BOOL:
+        return raws != 0
+    if group[0] == GROUP_SCALING:
+        _, factor, precision, data_width, signed = group
+        if signed:
+            # correction for negative numbers, see `ScalingBase.from_heatpump`
+            num_values = 1 << data_width
+            max_value = (1 << (data_width - 1)) - 1
+            above = raws > max_value
+            raws = raws - above * (((raws - max_value - 1) // num_values + 1) * num_values)
+        if isinstance(factor, int):
+            return raws * factor
+        return np.round(raws * factor, precision)
+    return raws
+
+
+###############################################################################
+# Decode methods
+###############################################################################
+
+def decode_all(data_vector, use_numpy=True):
+    """
+    Decode the values of all fields contained in a data vector.
+
+    Args:
+        data_vector (DataVector): Data vector to decode.
+        use_numpy (bool, Default: True): Use vectorized decoding,
+            if NumPy is installed.
+
+    Returns:
+        dict[str, Any]: The decoded values by definition name,
+            in the order of the data vector. The values are
+            equal to the `value` of each field.
+    """
+    if np is None or not use_numpy:
+        return {definition.name: field.value for definition, field in data_vector.data.pairs}
+
+    plan = _get_plan(data_vector)
+    values = [None] * len(plan.names)
+    for group, (positions, fields) in plan.groups.items():
+        raws, valid = _to_int_array(fields)
+        if raws.dtype != np.int64:
+            # too large for vectorized decoding
+            valid = []
+        decoded = _decode_group(group, raws).tolist()
+        if valid is None:
+            for pos, value in zip(positions, decoded):
+                values[pos] = value
+        else:
+            for offset, field in enumerate(fields):
+                values[positions[offset]] = field.value
+            if valid:
+                for offset, value in zip(valid, decoded):
+                    values[positions[offset]] = value
+    for pos, field in plan.remaining:
+        values[pos] = field.value
+    return dict(zip(plan.names, values))
+
+def to_numpy(data_vector):
+    """
+    Decode all numeric fields of a data vector into a NumPy structured array.
+
+    Only fields of scaling, boolean or plain integer datatypes are included.
+    Each of them becomes a float64 column named like its definition.
+    Missing or invalid raw values are represented by NaN.
+    The array has shape (1,), so multiple polls can be concatenated
+    to a time series via `numpy.concatenate`.
+
+    Args:
+        data_vector (DataVector): Data vector to decode.
+
+    Returns:
+        numpy.ndarray | None: The structured array,
+            or None if NumPy is not installed.
+    """
+    if np is None:
+        LOGGER.error("NumPy is required to convert data vectors into arrays.")
+        return None
+
+    plan = _get_plan(data_vector)
+    dtype = plan.dtype
+    if not plan.numeric:
+        return np.zeros(1, dtype=dtype)
+
+    values = np.full(len(plan.names), np.nan, dtype=np.float64)
+    for group, (positions, fields) in plan.groups.items():
+        raws, valid = _to_int_array(fields)
+        if valid is not None:
+            positions = [positions[offset] for offset in valid]
+        values[positions] = _decode_group(group, raws)
+
+    columns = list(plan.numeric.values())
+    return np.ascontiguousarray(values[columns]).view(dtype)
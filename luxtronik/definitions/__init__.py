@@ -8,6 +8,7 @@ but can be expanded by the user.
 """
 
 import logging
+from array import array
 
 from luxtronik.constants import (
     LUXTRONIK_16BIT_FUNCTION_NOT_AVAILABLE,
@@ -22,6 +23,14 @@ from luxtronik.datatypes import Unknown
 
 LOGGER = logging.getLogger(__name__)
 
+# Raw values which represent "not available" by data type
+NOT_AVAILABLE_RAW = {
+    "INT16": LUXTRONIK_16BIT_FUNCTION_NOT_AVAILABLE,
+    "UINT16": LUXTRONIK_16BIT_FUNCTION_NOT_AVAILABLE,
+    "INT32": LUXTRONIK_32BIT_FUNCTION_NOT_AVAILABLE,
+    "UINT32": LUXTRONIK_32BIT_FUNCTION_NOT_AVAILABLE,
+}
+
 ###############################################################################
 # LuxtronikDefinition
 ###############################################################################
@@ -222,6 +231,15 @@ class LuxtronikDefinition:
         """
         return self.field_type(self.names, self.writeable) if self.valid else None
 
+    @property
+    def not_available_raw(self):
+        """
+        Return the raw value which represents 'not available' for this definition,
+        or None if there is no such value.
+        """
+        # TODO: Check if there are other magic values
+        return NOT_AVAILABLE_RAW.get(self._data_type)
+
     def check_raw_not_none(self, raw):
         """
         Check if the related raw value to this definition represents not 'not available'.
@@ -229,12 +247,10 @@ class LuxtronikDefinition:
         Args:
             raw (int): Raw-value to check.
         """
-        # TODO: Check if there are other magic values
         if isinstance(raw, int):
-            if self._data_type in ['INT16', 'UINT16']:
-                return raw != LUXTRONIK_16BIT_FUNCTION_NOT_AVAILABLE
-            if self._data_type in ['INT32', 'UINT32']:
-                return raw != LUXTRONIK_32BIT_FUNCTION_NOT_AVAILABLE
+            not_available = NOT_AVAILABLE_RAW.get(self._data_type)
+            if not_available is not None:
+                return raw != not_available
         return True
 
 
@@ -249,20 +265,43 @@ class LuxtronikDefinitionsDictionary:
     This class is intended to speed up the lookup of definitions.
     Dictionaries are used instead of searching through a list of definitions
     one by one to find the one you are looking for.
+
+    All supported keys (indices, indices as string, names and lower-case names)
+    are precompiled into a single lookup table, so that a lookup usually
+    consists of only one hash access.
     """
 
     def __init__(self):
         self._index_dict = {}
         self._name_dict = {}
+        # Precompiled lookup table: key -> (definition, key is an outdated name)
+        self._lookup = {}
+        # Identity index: definition -> number of name keys referring to it
+        self._refs = {}
 
     def __getitem__(self, name_or_idx):
         return self.get(name_or_idx)
 
     def __contains__(self, def_name_or_idx):
         if isinstance(def_name_or_idx, LuxtronikDefinition):
-            return any(def_name_or_idx is d for d in self._name_dict.values())
+            return def_name_or_idx in self._refs
         return self._get(def_name_or_idx) is not None
 
+    def _set_key(self, key, definition, outdated=False, track=False):
+        """
+        Store a lookup key. For name keys (`track` is True)
+        the identity index is kept up to date as well.
+        """
+        if track:
+            entry = self._lookup.get(key)
+            if entry is not None:
+                previous = entry[0]
+                self._refs[previous] -= 1
+                if self._refs[previous] == 0:
+                    del self._refs[previous]
+            self._refs[definition] = self._refs.get(definition, 0) + 1
+        self._lookup[key] = (definition, outdated)
+
     def add(self, definition):
         """
         Add a definition to internal lookup tables.
@@ -272,12 +311,25 @@ class LuxtronikDefinitionsDictionary:
             definition (LuxtronikDefinition): Definition to add.
         """
         # Add to indices-dictionary
-        self._index_dict[definition.index] = definition
+        index = definition.index
+        self._index_dict[index] = definition
+        self._set_key(index, definition)
+        self._set_key(str(index), definition)
 
         # Add to name-dictionary
         # Unique names has already been ensured by the pytest
+        primary = definition.name.lower()
         for name in definition.names:
-            self._name_dict[name.lower()] = definition
+            lower = name.lower()
+            self._name_dict[lower] = definition
+            # Numbers are not allowed as names, they are always treated as index
+            if _parse_index(name) is not None:
+                continue
+            # Outdated names are determined only once
+            outdated = definition.valid and lower != primary
+            self._set_key(lower, definition, outdated, True)
+            if name != lower:
+                self._set_key(name, definition, outdated, True)
 
     def get(self, name_or_idx, default=None):
         """
@@ -295,15 +347,16 @@ class LuxtronikDefinitionsDictionary:
         """
         d = self._get(name_or_idx)
         if d is None:
-            LOGGER.debug(f"Definition for '{name_or_idx}' not found")
-        else:
-            # The successor is returned only once for each definition,
-            # not to generate a lot of warnings
+            if LOGGER.isEnabledFor(logging.DEBUG):
+                LOGGER.debug(f"Definition for '{name_or_idx}' not found")
+            return default
+        # The successor is returned only once for each definition,
+        # not to generate a lot of warnings
+        if d._successor is not None:
             successor = d.successor
-            if successor is not None:
-                LOGGER.warning(f"Definition for '{name_or_idx}' is outdated and will " \
-                    + f"be removed soon! Please use '{successor}' instead.")
-        return d if d is not None else default
+            LOGGER.warning(f"Definition for '{name_or_idx}' is outdated and will " \
+                + f"be removed soon! Please use '{successor}' instead.")
+        return d
 
     def _get(self, name_or_idx):
         """
@@ -318,49 +371,196 @@ class LuxtronikDefinitionsDictionary:
         Note:
             If multiple definitions added for the same index/name, the last added takes precedence.
         """
-        d = None
-        if isinstance(name_or_idx, int):
-            d = self._get_definition_by_idx(name_or_idx)
-        if isinstance(name_or_idx, str):
-            try:
-                # Numbers are not allowed as names, so it could be an index as string
-                d = self._get_definition_by_idx(int(name_or_idx))
-            except ValueError:
-                d = self._get_definition_by_name(name_or_idx)
-        return d
+        entry = self._lookup_entry(name_or_idx)
+        if entry is None:
+            return None
+        definition, outdated = entry
+        if outdated:
+            LOGGER.warning(f"'{name_or_idx}' is outdated! Use '{definition.name}' instead.")
+        return definition
 
-    def _get_definition_by_idx(self, idx):
+    def _lookup_entry(self, name_or_idx):
         """
-        Retrieve a definition by its index.
+        Look-up the precompiled entry for the given name or index.
 
         Args:
-            idx (int): Register index.
+            name_or_idx (str | int): Definition name or register index.
 
         Returns:
-            LuxtronikDefinition | None: The matching definition, or None if not found.
+            tuple[LuxtronikDefinition, bool] | None: The matching entry, or None if not found.
+        """
+        if isinstance(name_or_idx, str):
+            entry = self._lookup.get(name_or_idx)
+            if entry is not None:
+                return entry
+            # Numbers are not allowed as names, so it could be an index as string
+            index = _parse_index(name_or_idx)
+            if index is not None:
+                return self._lookup.get(index)
+            return self._lookup.get(name_or_idx.lower())
+        if isinstance(name_or_idx, int):
+            return self._lookup.get(name_or_idx)
+        return None
 
-        Note:
-            If multiple definitions added for the same index, the last added takes precedence.
+
+def _parse_index(text):
+    """
+    Convert an index given as string into an integer without raising exceptions.
+
+    Args:
+        text (str): Text to convert.
+
+    Returns:
+        int | None: The parsed index or None if the text does not represent an integer.
+    """
+    digits = text.strip()
+    if digits[:1] in ("+", "-"):
+        sign, digits = digits[0], digits[1:]
+    else:
+        sign = ""
+    if digits.isdecimal() and digits.isascii():
+        return int(sign + digits)
+    return None
+
+
+###############################################################################
+# LuxtronikDefinitionsColumns
+###############################################################################
+
+class LuxtronikDefinitionsColumns:
+    """
+    Columnar (struct-of-arrays) companion store for a sequence of definitions.
+
+    The most frequently used metadata of the definitions is stored in parallel
+    integer arrays. Position `i` of every column belongs to the `i`-th definition.
+    This allows planners and parsers to work on plain integers instead of
+    calling the properties of each definition over and over again.
+
+    Additionally a dense address-to-definition table is provided.
+    """
+
+    # Placeholder for a missing `bit_offset` within the `bit_offset` column
+    NO_BIT_OFFSET = -1
+
+    def __init__(self, definitions):
+        """
+        Build the columns out of the given definitions.
+
+        Args:
+            definitions (Iterable[LuxtronikDefinition]): Definitions in the desired order.
         """
-        return self._index_dict.get(idx, None)
+        self._definitions = list(definitions)
+        self._field_types = []
+        type_ids = {}
+
+        self._index = array("l")
+        self._count = array("l")
+        self._addr = array("l")
+        self._bit_offset = array("l")
+        self._num_bits = array("l")
+        self._type_id = array("l")
+
+        for d in self._definitions:
+            self._index.append(d.index)
+            self._count.append(d.count)
+            self._addr.append(d.addr)
+            bit_offset = d.bit_offset
+            self._bit_offset.append(self.NO_BIT_OFFSET if bit_offset is None else bit_offset)
+            self._num_bits.append(d.num_bits)
+            type_id = type_ids.get(d.field_type)
+            if type_id is None:
+                type_id = len(self._field_types)
+                type_ids[d.field_type] = type_id
+                self._field_types.append(d.field_type)
+            self._type_id.append(type_id)
+
+        # Dense address-to-definition table. If multiple definitions
+        # start at the same address, the last one takes precedence.
+        self._addr_base = min(self._addr) if self._addr else 0
+        size = max(self._addr) - self._addr_base + 1 if self._addr else 0
+        self._by_addr = [None] * size
+        for addr, d in zip(self._addr, self._definitions):
+            self._by_addr[addr - self._addr_base] = d
+
+        # Last result of `covered`: (length, mask)
+        self._covered = None
 
-    def _get_definition_by_name(self, name):
+    def __len__(self):
+        return len(self._definitions)
+
+    @property
+    def definitions(self):
+        "Returns the definitions in column order."
+        return self._definitions
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def addr(self):
+        return self._addr
+
+    @property
+    def bit_offset(self):
+        "Returns the bit offsets. A missing `bit_offset` is stored as `NO_BIT_OFFSET`."
+        return self._bit_offset
+
+    @property
+    def num_bits(self):
+        return self._num_bits
+
+    @property
+    def type_id(self):
+        "Returns the position of the field type within `field_types`."
+        return self._type_id
+
+    @property
+    def field_types(self):
+        "Returns all used field types, ordered by first occurrence."
+        return self._field_types
+
+    def get_by_addr(self, addr):
         """
-        Retrieve a definition by its name (case-insensitive).
+        Retrieve the definition that starts at the given address.
 
         Args:
-            name (str): Definition name.
+            addr (int): Register address.
 
         Returns:
             LuxtronikDefinition | None: The matching definition, or None if not found.
+        """
+        pos = addr - self._addr_base
+        if 0 <= pos < len(self._by_addr):
+            return self._by_addr[pos]
+        return None
 
-        Note:
-            If multiple definitions added for the same name, the last added takes precedence.
+    def covered(self, length):
         """
-        definition = self._name_dict.get(name.lower(), None)
-        if definition is not None and definition.valid and name.lower() != definition.name.lower():
-            LOGGER.warning(f"'{name}' is outdated! Use '{definition.name}' instead.")
-        return definition
+        Mark all register indices within `[0..length)` which are used by definitions
+        that fit completely into `length` registers. The mask of the last
+        requested length is cached, as parsers usually ask for the same length.
+
+        Args:
+            length (int): Number of register indices to consider.
+
+        Returns:
+            bytes: For each register index 1 if it is covered, otherwise 0.
+        """
+        if self._covered is not None and self._covered[0] == length:
+            return self._covered[1]
+        mask = bytearray(length)
+        for index, count in zip(self._index, self._count):
+            end = index + count
+            if end <= length:
+                mask[index:end] = b"\x01" * count
+        mask = bytes(mask)
+        self._covered = (length, mask)
+        return mask
 
 
 ###############################################################################
@@ -383,6 +583,10 @@ class LuxtronikDefinitionsList:
         # sorted list of all definitions
         self._definitions = []
         self._lookup = LuxtronikDefinitionsDictionary()
+        # columnar companion store, created on demand
+        self._columns = None
+        # cache of already created "unknown" definitions, keyed by index
+        self._unknown = {}
 
     def __init__(self, definitions_list, name, offset, default_data_type):
         """
@@ -424,6 +628,8 @@ class LuxtronikDefinitionsList:
         """
         obj = cls.__new__(cls) # this don't call __init__()
         obj._init_instance(definitions.name, definitions.offset, definitions._default_data_type, version)
+        # "unknown" definitions do not depend on the version
+        obj._unknown = definitions._unknown
 
         for d in definitions:
             if d.valid and version_in_range(obj._version, d.since, d.until):
@@ -449,7 +655,8 @@ class LuxtronikDefinitionsList:
 
     def create_unknown_definition(self, index):
         """
-        Create an "unknown" definition.
+        Create an "unknown" definition. Once created, the same definition
+        object is returned for the same index (also by filtered lists).
 
         Args:
             index (int): The register index of the "unknown" definition.
@@ -457,7 +664,11 @@ class LuxtronikDefinitionsList:
         Returns:
             LuxtronikDefinition: A definition marked as unknown.
         """
-        return LuxtronikDefinition.unknown(index, self._name, self._offset, self._default_data_type)
+        definition = self._unknown.get(index)
+        if definition is None:
+            definition = LuxtronikDefinition.unknown(index, self._name, self._offset, self._default_data_type)
+            self._unknown[index] = definition
+        return definition
 
     @property
     def name(self):
@@ -467,6 +678,17 @@ class LuxtronikDefinitionsList:
     def offset(self):
         return self._offset
 
+    @property
+    def columns(self):
+        """
+        Return the columnar companion store (`LuxtronikDefinitionsColumns`)
+        of all contained definitions. It is created on first use
+        and re-created after definitions have been added.
+        """
+        if self._columns is None:
+            self._columns = LuxtronikDefinitionsColumns(self._definitions)
+        return self._columns
+
     def get(self, name_or_idx, default=None):
         """
         Retrieve a definition by name or index.
@@ -491,6 +713,7 @@ class LuxtronikDefinitionsList:
         """
         self._definitions.append(definition)
         self._lookup.add(definition)
+        self._columns = None
 
     def add(self, data_dict):
         """
@@ -510,4 +733,5 @@ class LuxtronikDefinitionsList:
             return None
         self._add(definition)
         self._definitions.sort(key=lambda item: item.index)
+        self._columns = None
         return definition
\ No newline at end of file
@@ -0,0 +1,341 @@
+"""
+TCP proxy that injects faults into the traffic to a luxtronik controller.
+
+The proxy is placed between the client and a controller (or the simulator)
+to reproduce bad network conditions: delays, fragmented responses, stalls,
+connection resets and Modbus exception responses. This allows to measure the
+tail latency and the recovery behaviour of the interfaces.
+"""
+
+import logging
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+
+LOGGER = logging.getLogger(__name__)
+
+LUXTRONIK_FAULT_PROXY_BUFFER_SIZE = 4096
+# Interval in seconds in which the server checks for a shutdown request
+LUXTRONIK_FAULT_PROXY_POLL_INTERVAL = 0.05
+
+# Modbus exception "server device busy"
+MODBUS_EXCEPTION_SERVER_BUSY = 6
+
+_MODBUS_HEADER = struct.Struct(">HHHB")
+
+
+###############################################################################
+# Fault profile
+###############################################################################
+
+class FaultProfile:
+    """
+    Describes which faults are injected and how often.
+    All probabilities are evaluated per forwarded response chunk
+    (Modbus exceptions: per request).
+    """
+
+    def __init__(
+        self,
+        delay=0.0,
+        jitter=0.0,
+        fragment_size=None,
+        fragment_delay=0.0,
+        stall_probability=0.0,
+        stall_duration=1.0,
+        reset_probability=0.0,
+        modbus_exception_probability=0.0,
+        modbus_exception_code=MODBUS_EXCEPTION_SERVER_BUSY,
+        seed=None,
+    ):
+        """
+        Initialize the fault profile.
+
+        Args:
+            delay (float): Delay in seconds added to each response chunk.
+            jitter (float): Additional random delay in seconds between 0 and `jitter`.
+            fragment_size (int | None): If given, responses are split into pieces of this size.
+            fragment_delay (float): Delay in seconds between two pieces.
+            stall_probability (float): Probability to stall before forwarding a response chunk.
+            stall_duration (float): Duration of a stall in seconds.
+            reset_probability (float): Probability to reset the connection instead of
+                forwarding a response chunk.
+            modbus_exception_probability (float): Probability to answer a Modbus request
+                with an exception response instead of forwarding it.
+            modbus_exception_code (int): Exception code of the injected exception responses.
+            seed (int | None): Seed for the random decisions.
+        """
+        if fragment_size is not None and fragment_size < 1:
+            raise ValueError(f"Invalid fragment size {fragment_size}")
+        self.delay = delay
+        self.jitter = jitter
+        self.fragment_size = fragment_size
+        self.fragment_delay = fragment_delay
+        self.stall_probability = stall_probability
+        self.stall_duration = stall_duration
+        self.reset_probability = reset_probability
+        self.modbus_exception_probability = modbus_exception_probability
+        self.modbus_exception_code = modbus_exception_code
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _chance(self, probability):
+        if probability <= 0:
+            return False
+        with self._rng_lock:
+            return self._rng.random() < probability
+
+    def _get_delay(self):
+        if self.jitter <= 0:
+            return self.delay
+        with self._rng_lock:
+            return self.delay + self._rng.uniform(0, self.jitter)
+
+
+###############################################################################
+# Connection handler
+###############################################################################
+
+def _reset(sock):
+    """Close the socket with a TCP reset instead of a regular shutdown."""
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        # Wake up the thread blocking in recv() without sending a FIN
+        sock.shutdown(socket.SHUT_RD)
+    except OSError:
+        pass
+    sock.close()
+
+def _close(sock):
+    """Close the socket and wake up any thread blocking on it."""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    sock.close()
+
+def _recv_exactly(sock, count):
+    data = b""
+    while len(data) < count:
+        chunk = sock.recv(count - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+class _ProxyHandler(socketserver.BaseRequestHandler):
+    """Forwards one client connection to the target and injects the faults."""
+
+    def handle(self):
+        proxy = self.server.proxy
+        try:
+            upstream = socket.create_connection(proxy.target)
+        except OSError as e:
+            LOGGER.warning(f"Fault proxy: cannot connect to {proxy.target}: {e}")
+            return
+        self.upstream = upstream
+        self.closed = False
+        proxy._register(self.request, upstream)
+        proxy._count("connections")
+        forward = self._forward_modbus_requests if proxy.modbus else self._forward_requests
+        thread = threading.Thread(target=forward, daemon=True)
+        thread.start()
+        try:
+            self._forward_responses(proxy)
+        finally:
+            self._close()
+            thread.join()
+            proxy._unregister(self.request, upstream)
+
+    def _close(self):
+        if not self.closed:
+            self.closed = True
+            for sock in (self.request, self.upstream):
+                _close(sock)
+
+    def _forward_requests(self):
+        try:
+            while True:
+                data = self.request.recv(LUXTRONIK_FAULT_PROXY_BUFFER_SIZE)
+                if not data:
+                    break
+                self.upstream.sendall(data)
+        except OSError:
+            pass
+        self._shutdown_upstream()
+
+    def _forward_modbus_requests(self):
+        proxy = self.server.proxy
+        profile = proxy.profile
+        try:
+            while True:
+                header = _recv_exactly(self.request, _MODBUS_HEADER.size)
+                if header is None:
+                    break
+                transaction, protocol, length, unit = _MODBUS_HEADER.unpack(header)
+                pdu = _recv_exactly(self.request, length - 1)
+                if not pdu:
+                    break
+                if profile._chance(profile.modbus_exception_probability):
+                    proxy._count("exceptions")
+                    response = bytes([pdu[0] | 0x80, profile.modbus_exception_code])
+                    self.request.sendall(_MODBUS_HEADER.pack(transaction, protocol, 3, unit) + response)
+                    continue
+                self.upstream.sendall(header + pdu)
+        except OSError:
+            pass
+        self._shutdown_upstream()
+
+    def _shutdown_upstream(self):
+        try:
+            self.upstream.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+    def _forward_responses(self, proxy):
+        profile = proxy.profile
+        while True:
+            try:
+                data = self.upstream.recv(LUXTRONIK_FAULT_PROXY_BUFFER_SIZE)
+            except OSError:
+                return
+            if not data:
+                return
+            if profile._chance(profile.reset_probability):
+                proxy._count("resets")
+                self.closed = True
+                _reset(self.request)
+                _close(self.upstream)
+                return
+            if profile._chance(profile.stall_probability):
+                proxy._count("stalls")
+                time.sleep(profile.stall_duration)
+            delay = profile._get_delay()
+            if delay > 0:
+                time.sleep(delay)
+            # Count before forwarding, the client may check the stats right after receiving
+            proxy._count("bytes", len(data))
+            size = profile.fragment_size or len(data)
+            try:
+                for pos in range(0, len(data), size):
+                    if pos and profile.fragment_delay > 0:
+                        time.sleep(profile.fragment_delay)
+                    self.request.sendall(data[pos:pos + size])
+            except OSError:
+                return
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, proxy):
+        self.proxy = proxy
+        super().__init__(address, _ProxyHandler)
+
+
+###############################################################################
+# Fault proxy
+###############################################################################
+
+class FaultProxy:
+    """
+    TCP proxy between a client and a luxtronik controller that injects faults.
+    """
+
+    def __init__(
+        self,
+        target_host,
+        target_port,
+        profile=None,
+        modbus=False,
+        host="127.0.0.1",
+        port=0,
+    ):
+        """
+        Initialize the proxy.
+
+        Args:
+            target_host (str): Hostname or IP address of the controller (or simulator).
+            target_port (int): Port of the controller.
+            profile (FaultProfile | None): Faults to inject. No faults if None is provided.
+            modbus (bool): Parse the requests as Modbus TCP frames.
+                Required to inject Modbus exception responses.
+            host (str): Address to listen on.
+            port (int): Port to listen on. Use 0 for any free port.
+        """
+        self.target = (target_host, target_port)
+        self.profile = profile if profile is not None else FaultProfile()
+        self.modbus = modbus
+        self._address = (host, port)
+        self._server = None
+        self._thread = None
+        self._sockets = set()
+        self._lock = threading.Lock()
+        self.stats = {"connections": 0, "bytes": 0, "stalls": 0, "resets": 0, "exceptions": 0}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def host(self):
+        return self._address[0]
+
+    @property
+    def port(self):
+        """Return the (bound) port of the proxy."""
+        return self._server.server_address[1] if self._server else self._address[1]
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def _register(self, *sockets):
+        with self._lock:
+            self._sockets.update(sockets)
+
+    def _unregister(self, *sockets):
+        with self._lock:
+            self._sockets.difference_update(sockets)
+
+    def start(self):
+        """
+        Start listening.
+
+        Returns:
+            bool: True if the proxy was started, False if it is already running.
+        """
+        if self._server is not None:
+            LOGGER.warning("The fault proxy is already running.")
+            return False
+        self._server = _Server(self._address, self)
+        self._thread = threading.Thread(target=self._server.serve_forever,
+            args=(LUXTRONIK_FAULT_PROXY_POLL_INTERVAL,),
+            name="luxtronik-fault-proxy", daemon=True)
+        self._thread.start()
+        LOGGER.info(f"Fault proxy listening on {self.host}:{self.port} -> "
+            + f"{self.target[0]}:{self.target[1]}")
+        return True
+
+    def stop(self):
+        """Stop listening and close all open connections."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            sockets = list(self._sockets)
+        for sock in sockets:
+            _close(sock)
+        self._thread.join()
+        self._server = None
+        self._thread = None
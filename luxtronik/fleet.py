@@ -0,0 +1,234 @@
+"""Poll multiple luxtronik controllers concurrently."""
+
+import logging
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from luxtronik import LuxtronikInterface
+from luxtronik.cfi import LUXTRONIK_DEFAULT_PORT
+from luxtronik.shi import LUXTRONIK_DEFAULT_MODBUS_PORT
+
+
+LOGGER = logging.getLogger(__name__)
+
+LUXTRONIK_FLEET_DEFAULT_MAX_WORKERS = 8
+
+
+###############################################################################
+# LuxtronikFleet
+###############################################################################
+
+class LuxtronikFleet:
+    """
+    Polls a list of controllers concurrently with a bounded number of threads.
+
+    For each host one interface (`LuxtronikInterface`) is created on first use
+    and re-used for all following polls. This way the resolved version of the
+    smart home interface is determined only once per host. As all interfaces
+    use the host locks, concurrent polls of different hosts do not block each other.
+
+    The read data (`LuxtronikAllData`) is delivered as soon as a host has been read,
+    either to a callback `callback(host, data)`, to a queue as `(host, data)` tuple,
+    or both.
+
+    Hosts are identified by their entry within `hosts`: The hostname for hosts
+    given as string, otherwise the `(host, port_config, port_shi)` tuple.
+    So several controllers behind the same address but with different ports
+    (e.g. port forwarding or simulators) can be polled side by side.
+    """
+
+    def __init__(
+        self,
+        hosts,
+        max_workers=LUXTRONIK_FLEET_DEFAULT_MAX_WORKERS,
+        callback=None,
+        queue=None,
+        interface_factory=LuxtronikInterface,
+    ):
+        """
+        Initialize the fleet.
+
+        Args:
+            hosts (list[str | tuple[str, int, int]]): Hosts to poll. Either the
+                hostname / IP address, or a tuple of hostname, config port and smart home port.
+                Each combination of hostname and ports must be unique.
+            max_workers (int): Maximum number of hosts polled at the same time.
+            callback (callable | None): Optional function `callback(host, data)`
+                called for every successfully read host.
+            queue (queue.Queue | None): Optional queue, that receives
+                a `(host, data)` tuple for every successfully read host.
+            interface_factory (callable): Function `factory(host, port_config, port_shi)`
+                to create the interface of a host. Defaults to `LuxtronikInterface`.
+
+        Raises:
+            ValueError: If a combination of hostname and ports is listed more than once.
+        """
+        # key -> (host, port_config, port_shi)
+        self._hosts = {}
+        targets = set()
+        for host in hosts:
+            key = self._key(host)
+            target = (host, LUXTRONIK_DEFAULT_PORT, LUXTRONIK_DEFAULT_MODBUS_PORT) \
+                if isinstance(host, str) else key
+            if target in targets:
+                raise ValueError(f"Host '{target[0]}' with the ports {target[1]} and " \
+                    + f"{target[2]} is listed more than once.")
+            targets.add(target)
+            self._hosts[key] = target
+        self._max_workers = max(1, int(max_workers))
+        self._callback = callback
+        self._queue = queue
+        self._interface_factory = interface_factory
+        self._interfaces = {}
+        self._interfaces_lock = threading.Lock()
+        self._executor = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _key(host):
+        return host if isinstance(host, str) else tuple(host)
+
+    @property
+    def hosts(self):
+        """Return the keys of all hosts of the fleet, see `LuxtronikFleet`."""
+        return list(self._hosts.keys())
+
+    @property
+    def running(self):
+        """Return True if the background polling is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_interface(self, host):
+        """
+        Return the (cached) interface of a host. It is created on first use.
+
+        Args:
+            host (str | tuple[str, int, int]): Key of the host, see `LuxtronikFleet`.
+
+        Returns:
+            LuxtronikInterface | None: The interface, or None if the host
+                is not part of the fleet or the interface could not be created.
+        """
+        host = self._key(host)
+        host_data = self._hosts.get(host)
+        if host_data is None:
+            LOGGER.warning(f"Host '{host}' is not part of the fleet.")
+            return None
+        with self._interfaces_lock:
+            interface = self._interfaces.get(host)
+        if interface is not None:
+            return interface
+        try:
+            interface = self._interface_factory(*host_data)
+        except Exception as e:
+            LOGGER.error(f"Failed to create the interface for '{host}': {e}")
+            return None
+        with self._interfaces_lock:
+            # Another thread may have been faster
+            return self._interfaces.setdefault(host, interface)
+
+    def _read_host(self, host):
+        """Read all data of a single host. Returns None in case of an error."""
+        interface = self.get_interface(host)
+        if interface is None:
+            return None
+        try:
+            return interface.read_all()
+        except Exception as e:
+            LOGGER.error(f"Failed to read '{host}': {e}")
+            return None
+
+    def _deliver(self, host, data):
+        """Hand over the read data to the callback and the queue."""
+        if self._callback is not None:
+            try:
+                self._callback(host, data)
+            except Exception as e:
+                LOGGER.error(f"Callback failed for '{host}': {e}")
+        if self._queue is not None:
+            self._queue.put((host, data))
+
+    def poll(self):
+        """
+        Read all hosts once. At most `max_workers` hosts are read at the same time.
+        The data of each host is delivered as soon as it is available.
+
+        Returns:
+            dict[str | tuple, LuxtronikAllData | None]: The read data by host key,
+                None for hosts that could not be read.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="luxtronik-fleet"
+            )
+        futures = {self._executor.submit(self._read_host, host): host for host in self._hosts}
+        results = {host: None for host in self._hosts}
+        for future in as_completed(futures):
+            host = futures[future]
+            data = future.result()
+            results[host] = data
+            if data is not None:
+                self._deliver(host, data)
+        return results
+
+    def start(self, interval):
+        """
+        Start polling all hosts every `interval` seconds in a background thread.
+
+        Args:
+            interval (float): Time in seconds between the start of two polls.
+                If a poll takes longer, the next poll starts immediately.
+
+        Returns:
+            bool: True if the polling was started, False if it is already running.
+        """
+        if self.running:
+            LOGGER.warning("The fleet is already polling.")
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(interval,),
+            name="luxtronik-fleet-poller",
+            daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def _run(self, interval):
+        next_poll = time.monotonic()
+        while not self._stop_event.is_set():
+            self.poll()
+            next_poll = max(next_poll + interval, time.monotonic())
+            self._stop_event.wait(next_poll - time.monotonic())
+
+    def stop(self, timeout=None):
+        """
+        Stop the background polling. A running poll is completed first.
+
+        Args:
+            timeout (float | None): Maximum time in seconds to wait for the poller thread.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self):
+        """Stop the background polling and release all threads and interfaces."""
+        self.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._interfaces_lock:
+            self._interfaces.clear()
@@ -0,0 +1,334 @@
+"""
+Keep a bounded in-memory history of field values.
+
+The raw values are stored in fixed-capacity ring buffers based on
+`array.array`, which need 16 bytes per sample independent of the datatype.
+New samples are only appended if the raw value has changed.
+"""
+
+import logging
+import threading
+import time
+
+from array import array
+
+from luxtronik.datatypes import Base
+from luxtronik.definitions import LuxtronikDefinition
+
+
+LOGGER = logging.getLogger(__name__)
+
+LUXTRONIK_HISTORY_DEFAULT_CAPACITY = 4096
+
+
+###############################################################################
+# FieldHistory
+###############################################################################
+
+class FieldHistory:
+    """
+    Ring buffer of `(timestamp, raw)` samples of a single field.
+
+    Only integer raw values are recorded. Missing raw values (None)
+    and multi-register values that are not concatenated are skipped.
+    If the buffer is full, the oldest sample is overwritten.
+    """
+
+    def __init__(self, definition, field, capacity=LUXTRONIK_HISTORY_DEFAULT_CAPACITY):
+        """
+        Initialize a field history.
+
+        Args:
+            definition (LuxtronikDefinition): Definition of the field.
+            field (Base): The field object. It is used to decode the raw values.
+            capacity (int): Maximum number of samples.
+        """
+        self.definition = definition
+        self.field = field
+        self._capacity = max(1, int(capacity))
+        self._times = array("d", bytes(8 * self._capacity))
+        self._raws = array("q", bytes(8 * self._capacity))
+        self._start = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"FieldHistory(name={self.definition.name}, " \
+            + f"samples={self._count}, capacity={self._capacity})"
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def nbytes(self):
+        """Return the number of bytes used for the samples."""
+        return self._times.itemsize * self._capacity + self._raws.itemsize * self._capacity
+
+    def _pos(self, offset):
+        return (self._start + offset) % self._capacity
+
+    def last(self):
+        """
+        Return the latest sample.
+
+        Returns:
+            tuple[float, int] | None: The latest `(timestamp, raw)` sample, or None if empty.
+        """
+        with self._lock:
+            if not self._count:
+                return None
+            pos = self._pos(self._count - 1)
+            return self._times[pos], self._raws[pos]
+
+    def append(self, timestamp, raw):
+        """
+        Append a sample if the raw value differs from the latest one.
+
+        Args:
+            timestamp (float): Point in time of the sample. Must not be older than the latest one.
+            raw (int | None): Raw value of the field.
+
+        Returns:
+            bool: True if the sample was appended.
+        """
+        if not isinstance(raw, int):
+            return False
+        with self._lock:
+            count = self._count
+            if count:
+                last_pos = self._pos(count - 1)
+                if self._raws[last_pos] == raw:
+                    return False
+                if timestamp < self._times[last_pos]:
+                    LOGGER.debug(f"Sample of '{self.definition.name}' is older than the latest one.")
+                    return False
+            if count < self._capacity:
+                pos = self._pos(count)
+                self._count = count + 1
+            else:
+                # overwrite the oldest sample
+                pos = self._start
+                self._start = self._pos(1)
+            try:
+                self._raws[pos] = raw
+            except OverflowError:
+                LOGGER.debug(f"Raw value of '{self.definition.name}' is too large: {raw}")
+                # undo the reservation of the slot
+                if count < self._capacity:
+                    self._count = count
+                else:
+                    self._start = pos
+                return False
+            self._times[pos] = timestamp
+            return True
+
+    def _bisect(self, timestamp):
+        """Return the offset of the first sample not older than `timestamp`."""
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._times[self._pos(mid)] < timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def range(self, start=None, end=None):
+        """
+        Return all samples within a time range.
+
+        Args:
+            start (float | None): Include samples not older than this point in time.
+            end (float | None): Include samples older than this point in time.
+
+        Returns:
+            list[tuple[float, int]]: The `(timestamp, raw)` samples in chronological order.
+        """
+        with self._lock:
+            first = 0 if start is None else self._bisect(start)
+            last = self._count if end is None else self._bisect(end)
+            return [(self._times[self._pos(i)], self._raws[self._pos(i)])
+                for i in range(first, last)]
+
+    def values(self, start=None, end=None):
+        """
+        Return the decoded samples within a time range. See `range` for details.
+
+        Returns:
+            list[tuple[float, Any]]: The `(timestamp, value)` samples in chronological order.
+        """
+        decode = self.field.from_heatpump
+        return [(t, decode(raw)) for t, raw in self.range(start, end)]
+
+    def downsample(self, interval, start=None, end=None):
+        """
+        Combine the decoded samples within a time range into buckets of equal duration.
+
+        Args:
+            interval (float): Duration of each bucket in seconds.
+            start (float | None): Include samples not older than this point in time.
+                Defaults to the timestamp of the oldest sample.
+            end (float | None): Include samples older than this point in time.
+
+        Returns:
+            list[tuple[float, float, float, float]]: `(bucket_start, min, max, mean)`
+                of every bucket which contains at least one numeric value.
+        """
+        samples = self.values(start, end)
+        if not samples:
+            return []
+        origin = samples[0][0] if start is None else start
+        buckets = []
+        current = None
+        for timestamp, value in samples:
+            if isinstance(value, bool):
+                value = int(value)
+            elif not isinstance(value, (int, float)):
+                continue
+            bucket = int((timestamp - origin) // interval)
+            if current is None or current[0] != bucket:
+                current = [bucket, value, value, value, 1]
+                buckets.append(current)
+            else:
+                current[1] = min(current[1], value)
+                current[2] = max(current[2], value)
+                current[3] += value
+                current[4] += 1
+        return [(origin + b * interval, lo, hi, total / n) for b, lo, hi, total, n in buckets]
+
+
+###############################################################################
+# History
+###############################################################################
+
+class History:
+    """
+    In-memory history of the fields of one or more data vectors.
+
+    The history is fed by the read paths of the interfaces: It registers
+    itself as change observer (see `DataVector.on_any_change`), so a sample
+    is only appended if a read raw value has changed. The memory is bounded
+    by `capacity` samples per tracked field, regardless of the poll rate.
+    """
+
+    def __init__(self, capacity=LUXTRONIK_HISTORY_DEFAULT_CAPACITY, clock=time.time):
+        """
+        Initialize the history.
+
+        Args:
+            capacity (int): Maximum number of samples per field.
+            clock (callable): Function that returns the current timestamp.
+        """
+        self._capacity = capacity
+        self._clock = clock
+        self._by_definition = {}
+        self._by_name = {}
+        self._owners = {}
+
+    def __len__(self):
+        return len(self._by_definition)
+
+    def __iter__(self):
+        return iter(list(self._by_definition.values()))
+
+    @property
+    def nbytes(self):
+        """Return the number of bytes used for the samples of all fields."""
+        return sum(h.nbytes for h in self._by_definition.values())
+
+    def track(self, data_vector, defs_fields_names_or_idxs=None):
+        """
+        Record the fields of a data vector. The current raw values are recorded immediately.
+
+        Each field (definition) is fed by one data vector at a time. To continue
+        the histories with another data vector of the same type, untrack the
+        previous one first.
+
+        Args:
+            data_vector (DataVector): Data vector whose reads feed the history.
+            defs_fields_names_or_idxs (Iterable[LuxtronikDefinition | Base | str | int] | None):
+                Fields to record. If None is provided, all fields are recorded.
+
+        Returns:
+            list[FieldHistory]: The histories of the tracked fields.
+
+        Raises:
+            ValueError: If a field is still tracked from another data vector.
+        """
+        if defs_fields_names_or_idxs is None:
+            pairs = list(data_vector.data.pairs)
+        else:
+            pairs = []
+            for item in defs_fields_names_or_idxs:
+                definition, _ = data_vector._get_definition(item, False)
+                field = data_vector.data.get(definition) if definition is not None else None
+                if field is None:
+                    LOGGER.warning(f"entry '{item}' not found")
+                    continue
+                pairs.append((definition, field))
+
+        # A definition can only be fed by one data vector at a time
+        for definition, field in pairs:
+            history = self._by_definition.get(definition)
+            owner = self._owners.get(definition)
+            if history is not None and history.field is not field and owner is not data_vector \
+                    and self._on_changes in owner._change_callbacks:
+                raise ValueError(f"Field '{definition.name}' is already tracked " \
+                    + "from another data vector. Untrack it first.")
+
+        now = self._clock()
+        histories = []
+        for definition, field in pairs:
+            history = self._by_definition.get(definition)
+            if history is None:
+                history = FieldHistory(definition, field, self._capacity)
+                self._by_definition[definition] = history
+                self._by_name.setdefault(definition.name, history)
+                history.append(now, field.raw)
+            elif history.field is not field:
+                # Continue the existing history with the field of the new data vector
+                history.field = field
+                history.append(now, field.raw)
+            self._owners[definition] = data_vector
+            histories.append(history)
+
+        callback = self._on_changes
+        if callback not in data_vector._change_callbacks:
+            data_vector.on_any_change(callback)
+        return histories
+
+    def untrack(self, data_vector):
+        """Stop recording the fields of a data vector. The recorded samples are kept."""
+        return data_vector.unsubscribe(self._on_changes)
+
+    def _on_changes(self, changes):
+        now = self._clock()
+        lookup = self._by_definition
+        for definition, field, _ in changes:
+            history = lookup.get(definition)
+            if history is not None and history.field is field:
+                history.append(now, field.raw)
+
+    def get(self, def_field_or_name):
+        """
+        Return the history of a tracked field.
+
+        Args:
+            def_field_or_name (LuxtronikDefinition | Base | str): Definition,
+                field object or name of the field.
+
+        Returns:
+            FieldHistory | None: The history or None if the field is not tracked.
+        """
+        if isinstance(def_field_or_name, LuxtronikDefinition):
+            return self._by_definition.get(def_field_or_name)
+        if isinstance(def_field_or_name, Base):
+            for history in self._by_definition.values():
+                if history.field is def_field_or_name:
+                    return history
+            return None
+        return self._by_name.get(def_field_or_name)
@@ -0,0 +1,468 @@
+"""
+Lightweight instrumentation of the interfaces.
+
+The interfaces wrap each phase of a transfer (lock wait, connect, send,
+receive, parse, integrate, each telegram, ...) into a span. If no
+instrumentation is attached, a shared no-op span is used, so the overhead
+of the disabled instrumentation is a single attribute check per phase.
+
+Attach an `Instrumentation` (e.g. `InterfaceStats`) to collect the spans:
+
+    stats = InterfaceStats()
+    interface = LuxtronikInterface("192.168.0.10", instrumentation=stats)
+    interface.read_all()
+    print(stats.to_dict())
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+# Upper bounds in seconds of the histogram buckets: 10 us ... ~84 s
+LUXTRONIK_HISTOGRAM_BOUNDS = tuple(0.00001 * 2 ** i for i in range(24))
+
+# Maximum number of trace events kept in memory by default
+LUXTRONIK_TRACE_MAX_EVENTS = 1000000
+
+
+###############################################################################
+# Histogram
+###############################################################################
+
+class Histogram:
+    """
+    Histogram of durations in seconds with exponential bucket boundaries.
+    Not thread-safe, the owner must serialize the access.
+    """
+
+    __slots__ = ("_bounds", "buckets", "count", "total", "min", "max")
+
+    def __init__(self, bounds=LUXTRONIK_HISTOGRAM_BOUNDS):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            bounds (tuple[float]): Ascending upper bounds of the buckets.
+                An additional bucket collects all larger values.
+        """
+        self._bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        self.buckets[bisect.bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, fraction):
+        """
+        Return the estimated percentile, i.e. the upper bound of the bucket
+        which contains the requested rank (limited to the observed maximum).
+
+        Args:
+            fraction (float): Percentile between 0.0 and 1.0.
+
+        Returns:
+            float | None: The estimated value or None if the histogram is empty.
+        """
+        if not self.count:
+            return None
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for idx, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank:
+                bound = self._bounds[idx] if idx < len(self._bounds) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        """Return a JSON compatible summary (durations in milliseconds)."""
+        def ms(value):
+            return value * 1000 if value is not None else None
+        return {
+            "count": self.count,
+            "total_ms": ms(self.total),
+            "min_ms": ms(self.min),
+            "mean_ms": ms(self.mean),
+            "p50_ms": ms(self.percentile(0.5)),
+            "p90_ms": ms(self.percentile(0.9)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "max_ms": ms(self.max),
+        }
+
+
+###############################################################################
+# Spans
+###############################################################################
+
+class Span:
+    """
+    Timing of a single phase. Use it as context manager.
+    """
+
+    __slots__ = ("instrumentation", "name", "host", "attributes", "counts",
+        "thread_id", "start", "duration", "error")
+
+    def __init__(self, instrumentation, name, host=None, attributes=None):
+        """
+        Initialize the span.
+
+        Args:
+            instrumentation (Instrumentation): Receiver of the span.
+            name (str): Name of the phase, e.g. "cfi.connect".
+            host (str | None): Host of the related controller.
+            attributes (dict | None): Additional descriptive data, e.g. the address.
+        """
+        self.instrumentation = instrumentation
+        self.name = name
+        self.host = host
+        self.attributes = attributes if attributes is not None else {}
+        self.counts = {}
+        self.thread_id = None
+        self.start = None
+        self.duration = None
+        self.error = None
+
+    def __repr__(self):
+        return f"Span({self.name}, host={self.host}, duration={self.duration}, " \
+            + f"attributes={self.attributes}, counts={self.counts})"
+
+    def set(self, key, value):
+        """Set a descriptive attribute."""
+        self.attributes[key] = value
+
+    def count(self, key, value):
+        """Add to a counter, e.g. the number of bytes or registers."""
+        self.counts[key] = self.counts.get(key, 0) + value
+
+    def __enter__(self):
+        self.thread_id = threading.get_ident()
+        self.instrumentation.span_started(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.instrumentation.span_finished(self)
+        return False
+
+
+class _NullSpan:
+    """Span that does nothing. Used if no instrumentation is attached."""
+
+    __slots__ = ()
+
+    def set(self, key, value):
+        pass
+
+    def count(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def create_span(instrumentation, name, host=None, **attributes):
+    """
+    Return a new span or `NULL_SPAN` if no instrumentation is attached.
+
+    Args:
+        instrumentation (Instrumentation | None): Receiver of the span.
+        name (str): Name of the phase.
+        host (str | None): Host of the related controller.
+        attributes: Additional descriptive data.
+
+    Returns:
+        Span | _NullSpan: The span to use as context manager.
+    """
+    if instrumentation is None:
+        return NULL_SPAN
+    return Span(instrumentation, name, host, attributes)
+
+
+class _TimedLock:
+    """Acquire a lock within a span to measure the wait time."""
+
+    __slots__ = ("_lock", "_span", "_priority")
+
+    def __init__(self, lock, span, priority=0):
+        self._lock = lock
+        self._span = span
+        self._priority = priority
+
+    def __enter__(self):
+        with self._span:
+            if self._priority:
+                self._lock.acquire(priority=self._priority)
+            else:
+                self._lock.acquire()
+        return self._lock
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._lock.release()
+        return False
+
+def timed_lock(lock, instrumentation, name, host=None, priority=0):
+    """
+    Return a context manager that acquires the lock and
+    measures the wait time if an instrumentation is attached.
+
+    Args:
+        lock (HostLock | threading.RLock): Lock to acquire.
+        instrumentation (Instrumentation | None): Receiver of the span.
+        name (str): Name of the phase, e.g. "cfi.lock".
+        host (str | None): Host of the related controller.
+        priority (int): Queuing priority, only supported by a `HostLock`.
+    """
+    if instrumentation is None:
+        if not priority:
+            return lock
+        return _TimedLock(lock, NULL_SPAN, priority)
+    return _TimedLock(lock, Span(instrumentation, name, host), priority)
+
+
+###############################################################################
+# Instrumentation
+###############################################################################
+
+class Instrumentation:
+    """
+    Receiver of the spans of the interfaces. All hooks do nothing,
+    override the required ones. The hooks are called from the threads
+    that use the interfaces, so implementations must be thread-safe.
+    """
+
+    def span_started(self, span):
+        """Called when a span is entered."""
+
+    def span_finished(self, span):
+        """Called when a span is left. `span.duration` is available."""
+
+
+class PhaseStats:
+    """Aggregated statistics of all spans with the same name."""
+
+    __slots__ = ("histogram", "counts", "errors")
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.counts = {}
+        self.errors = 0
+
+    def record(self, span):
+        self.histogram.record(span.duration)
+        for key, value in span.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+        if span.error is not None:
+            self.errors += 1
+
+    def to_dict(self):
+        result = self.histogram.to_dict()
+        result["counts"] = dict(self.counts)
+        result["errors"] = self.errors
+        return result
+
+
+class InterfaceStats(Instrumentation):
+    """
+    Collect duration histograms and counters (bytes, registers, telegrams)
+    per phase. The phase is the span name, optionally combined with the host.
+    """
+
+    def __init__(self, per_host=False):
+        """
+        Initialize the statistics.
+
+        Args:
+            per_host (bool): If true, keep separate statistics per host.
+        """
+        self._per_host = per_host
+        self._lock = threading.Lock()
+        self._phases = {}
+
+    def _key(self, name, host):
+        return f"{host}/{name}" if self._per_host else name
+
+    def span_finished(self, span):
+        key = self._key(span.name, span.host)
+        with self._lock:
+            phase = self._phases.get(key)
+            if phase is None:
+                phase = self._phases[key] = PhaseStats()
+            phase.record(span)
+
+    def get(self, name, host=None):
+        """
+        Return the statistics of a phase.
+
+        Args:
+            name (str): Name of the phase, e.g. "modbus.read_inputs".
+            host (str | None): Host of the phase, only used with `per_host`.
+
+        Returns:
+            PhaseStats | None: The statistics or None if the phase was never recorded.
+        """
+        return self._phases.get(self._key(name, host))
+
+    def __len__(self):
+        return len(self._phases)
+
+    def __iter__(self):
+        return iter(sorted(self._phases))
+
+    def reset(self):
+        with self._lock:
+            self._phases = {}
+
+    def to_dict(self):
+        """Return a JSON compatible summary of all phases."""
+        with self._lock:
+            return {key: phase.to_dict() for key, phase in sorted(self._phases.items())}
+
+
+class CompositeInstrumentation(Instrumentation):
+    """Forward the spans to several instrumentations, e.g. statistics and a trace."""
+
+    def __init__(self, *instrumentations):
+        self._instrumentations = instrumentations
+
+    def span_started(self, span):
+        for instrumentation in self._instrumentations:
+            instrumentation.span_started(span)
+
+    def span_finished(self, span):
+        for instrumentation in self._instrumentations:
+            instrumentation.span_finished(span)
+
+
+###############################################################################
+# Chrome trace
+###############################################################################
+
+class ChromeTraceRecorder(Instrumentation):
+    """
+    Record the spans as Chrome Trace Event JSON, viewable in Perfetto
+    (https://ui.perfetto.dev) or chrome://tracing.
+
+    Each host is shown as a process and each thread as a track within it,
+    so the interleaving of several threads and controllers becomes visible.
+    """
+
+    def __init__(self, max_events=LUXTRONIK_TRACE_MAX_EVENTS):
+        """
+        Initialize the recorder.
+
+        Args:
+            max_events (int): Maximum number of recorded events, including
+                the metadata events. Further spans are dropped and counted.
+        """
+        self._max_events = max_events
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._events = []
+        self._pids = {}
+        self._threads = set()
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._events)
+
+    def _get_pid(self, host):
+        """Return the process id of the host. Must be called with the lock held."""
+        pid = self._pids.get(host)
+        if pid is None:
+            pid = self._pids[host] = len(self._pids) + 1
+            self._events.append({"ph": "M", "name": "process_name", "pid": pid,
+                "args": {"name": str(host) if host is not None else "luxtronik"}})
+        return pid
+
+    def span_finished(self, span):
+        args = dict(span.attributes)
+        args.update(span.counts)
+        if span.error is not None:
+            args["error"] = span.error
+        event = {
+            "ph": "X",
+            "name": span.name,
+            "cat": span.name.split(".", 1)[0],
+            "ts": (span.start - self._origin) * 1e6,
+            "dur": span.duration * 1e6,
+            "tid": span.thread_id,
+            "args": args,
+        }
+        with self._lock:
+            if len(self._events) >= self._max_events:
+                self.dropped += 1
+                return
+            event["pid"] = pid = self._get_pid(span.host)
+            if (pid, span.thread_id) not in self._threads:
+                self._threads.add((pid, span.thread_id))
+                # Called from the thread that executed the span
+                self._events.append({"ph": "M", "name": "thread_name", "pid": pid,
+                    "tid": span.thread_id, "args": {"name": threading.current_thread().name}})
+            self._events.append(event)
+
+    def clear(self):
+        with self._lock:
+            self._events = []
+            self._pids = {}
+            self._threads = set()
+            self.dropped = 0
+
+    def to_dict(self):
+        """Return the trace in the JSON object format of the Trace Event Format."""
+        with self._lock:
+            events = list(self._events)
+            dropped = self.dropped
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_events": dropped},
+        }
+
+    def save(self, filename):
+        """
+        Write the trace to a file.
+
+        Args:
+            filename (str): Name of the JSON file.
+
+        Returns:
+            bool: True if the trace was written, otherwise False.
+        """
+        tmp_filename = f"{filename}.tmp"
+        try:
+            with open(tmp_filename, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_filename, filename)
+        except OSError as e:
+            LOGGER.error(f"Failed to write trace '{filename}': {e}")
+            return False
+        return True
@@ -0,0 +1,532 @@
+"""
+Record and replay the raw traffic of the configuration and smart home interface.
+
+The recording is a JSON lines file. Each line contains one event with the
+timestamp `t` and the `kind` of the event:
+- `cfi_connect`: A socket connection to the configuration interface was opened.
+- `cfi_send` / `cfi_recv`: Bytes sent / received via this socket (hex encoded).
+  All bytes received in response to one send are stored within one `cfi_recv`.
+- `shi_read`: Registers read via modbus (`registers`, `addr`, `count`, `data`).
+- `shi_write`: Registers written via modbus (`addr`, `data`, `result`).
+
+The replay interfaces serve the recorded data back without any connection
+to a heat pump, either at full speed or paced like the recording.
+"""
+
+import json
+import logging
+import threading
+import time
+
+from collections import deque
+
+from luxtronik import LuxtronikInterface
+from luxtronik.cfi import LUXTRONIK_DEFAULT_PORT, LuxtronikSocketInterface
+from luxtronik.shi import LUXTRONIK_DEFAULT_MODBUS_PORT
+from luxtronik.shi.common import LuxtronikSmartHomeReadHoldingsTelegram
+from luxtronik.shi.constants import LUXTRONIK_DEFAULT_MODBUS_TIMEOUT
+from luxtronik.shi.modbus import LuxtronikModbusTcpInterface
+
+
+LOGGER = logging.getLogger(__name__)
+
+LUXTRONIK_REPLAY_HOST = "replay"
+
+EVENT_CFI_CONNECT = "cfi_connect"
+EVENT_CFI_SEND = "cfi_send"
+EVENT_CFI_RECV = "cfi_recv"
+EVENT_SHI_READ = "shi_read"
+EVENT_SHI_WRITE = "shi_write"
+
+
+def _register_type(telegram):
+    return "holdings" if isinstance(telegram, LuxtronikSmartHomeReadHoldingsTelegram) else "inputs"
+
+
+###############################################################################
+# Recording
+###############################################################################
+
+class TrafficRecorder:
+    """
+    Writes traffic events into a JSON lines file. Thread-safe.
+    """
+
+    def __init__(self, filename):
+        """
+        Open (or create) a recording file for appending.
+
+        Args:
+            filename (str): Path of the recording.
+        """
+        self._file = open(filename, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    @staticmethod
+    def create_event(kind, **kwargs):
+        """
+        Create an event with the current timestamp, e.g. to write it later via `write`.
+
+        Args:
+            kind (str): Kind of the event, e.g. `EVENT_CFI_SEND`.
+            kwargs: Additional JSON serializable content of the event.
+
+        Returns:
+            dict: The created event.
+        """
+        event = {"t": time.time(), "kind": kind}
+        event.update(kwargs)
+        return event
+
+    def write(self, events):
+        """
+        Append several events at once. The file is flushed only once.
+
+        Args:
+            events (list[dict]): Events created via `create_event`.
+        """
+        lines = "".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+
+    def record(self, kind, **kwargs):
+        """
+        Append an event.
+
+        Args:
+            kind (str): Kind of the event, e.g. `EVENT_CFI_SEND`.
+            kwargs: Additional JSON serializable content of the event.
+        """
+        self.write([self.create_event(kind, **kwargs)])
+
+
+class RecordingSocket:
+    """
+    Wraps a connected socket and records all sent and received bytes.
+
+    The events are recorded per exchange: The sent bytes and all bytes received
+    in response are written together as soon as the next command is sent
+    or the socket is closed.
+    """
+
+    def __init__(self, sock, recorder):
+        self._socket = sock
+        self._recorder = recorder
+        # Events of the current exchange and the bytes received so far
+        self._events = []
+        self._chunks = []
+
+    def __enter__(self):
+        self._socket.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._flush()
+        return self._socket.__exit__(exc_type, exc_value, traceback)
+
+    def __getattr__(self, name):
+        return getattr(self._socket, name)
+
+    def _flush(self):
+        """Record the current exchange."""
+        if self._chunks:
+            self._events.append(self._recorder.create_event(EVENT_CFI_RECV,
+                data=b"".join(self._chunks).hex()))
+            self._chunks = []
+        if self._events:
+            self._recorder.write(self._events)
+            self._events = []
+
+    def close(self):
+        self._flush()
+        return self._socket.close()
+
+    def sendall(self, data):
+        self._flush()
+        self._events.append(self._recorder.create_event(EVENT_CFI_SEND, data=bytes(data).hex()))
+        return self._socket.sendall(data)
+
+    def recv(self, count):
+        data = self._socket.recv(count)
+        if data:
+            self._chunks.append(data)
+        return data
+
+
+def _create_recording_connection(interface, recorder):
+    """Open the connection of a configuration interface and record its traffic."""
+    sock = LuxtronikSocketInterface._create_connection(interface)
+    recorder.record(EVENT_CFI_CONNECT, host=interface._host, port=interface._port)
+    return RecordingSocket(sock, recorder)
+
+
+class RecordingSocketInterface(LuxtronikSocketInterface):
+    """Configuration interface, which records the traffic."""
+
+    def __init__(self, host, recorder, port=LUXTRONIK_DEFAULT_PORT):
+        """
+        Initialize the interface.
+
+        Args:
+            host (str): Hostname or IP address of the heat pump.
+            recorder (TrafficRecorder): Recorder for the traffic.
+            port (int): TCP port for the config interface.
+        """
+        super().__init__(host, port)
+        self._recorder = recorder
+
+    def _create_connection(self):
+        return _create_recording_connection(self, self._recorder)
+
+
+class RecordingModbusTcpInterface(LuxtronikModbusTcpInterface):
+    """Modbus TCP interface, which records all read and written registers."""
+
+    def __init__(
+        self,
+        host,
+        recorder,
+        port=LUXTRONIK_DEFAULT_MODBUS_PORT,
+        timeout=LUXTRONIK_DEFAULT_MODBUS_TIMEOUT
+    ):
+        """
+        Initialize the interface.
+
+        Args:
+            host (str): Hostname or IP address of the heat pump.
+            recorder (TrafficRecorder): Recorder for the traffic.
+            port (int): TCP port for the Modbus connection.
+            timeout (float): Timeout in seconds for communication.
+        """
+        super().__init__(host, port, timeout)
+        self._recorder = recorder
+
+    def _read_register(self, read_reg_cb, telegram):
+        valid = super()._read_register(read_reg_cb, telegram)
+        self._recorder.record(EVENT_SHI_READ, registers=_register_type(telegram),
+            addr=telegram.addr, count=telegram.count, data=telegram.data)
+        return valid
+
+    def _write_register(self, write_reg_cb, telegram):
+        valid = super()._write_register(write_reg_cb, telegram)
+        self._recorder.record(EVENT_SHI_WRITE, addr=telegram.addr,
+            data=list(telegram.data), result=bool(valid))
+        return valid
+
+
+class RecordingInterface(LuxtronikInterface):
+    """
+    Combined luxtronik interface (see `LuxtronikInterface`),
+    which records the traffic of both interfaces.
+    """
+
+    def __init__(
+        self,
+        host,
+        recorder,
+        port_config=LUXTRONIK_DEFAULT_PORT,
+        port_shi=LUXTRONIK_DEFAULT_MODBUS_PORT
+    ):
+        """
+        Initialize the interface.
+
+        Args:
+            host (str): Hostname or IP address of the heat pump.
+            recorder (TrafficRecorder): Recorder for the traffic.
+            port_config (int): TCP port for the config interface.
+            port_shi (int): TCP port for the smart home interface.
+        """
+        self._recorder = recorder
+        super().__init__(host, port_config, port_shi)
+
+    def _create_connection(self):
+        return _create_recording_connection(self, self._recorder)
+
+    def _create_modbus_interface(self, host, port):
+        return RecordingModbusTcpInterface(host, self._recorder, port)
+
+
+###############################################################################
+# Replay
+###############################################################################
+
+def load_recording(filename):
+    """
+    Load all events of a recording.
+
+    Args:
+        filename (str): Path of the recording.
+
+    Returns:
+        list[dict]: The events in the order of the recording.
+            Lines which could not be parsed are skipped.
+    """
+    events = []
+    with open(filename, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError as e:
+                LOGGER.warning(f"Skipped line {number} of the recording: {e}")
+    return events
+
+
+class TrafficReplay:
+    """
+    Serves recorded traffic back to the replay interfaces.
+
+    The configuration interface traffic is replayed in the recorded order.
+    Smart home reads are served by their register type, address and count,
+    also in the recorded order. Reads that were not recorded in this form
+    (e.g. due to a different block planning) are assembled from the registers
+    read so far.
+    """
+
+    def __init__(self, events, realtime=False, speed=1.0):
+        """
+        Initialize the replay.
+
+        Args:
+            events (str | list[dict]): Path of the recording or the loaded events.
+            realtime (bool): If true, the events are served paced like they were recorded.
+                Otherwise at full speed.
+            speed (float): Speed-up factor for the real-time pacing.
+        """
+        if isinstance(events, str) or hasattr(events, "__fspath__"):
+            events = load_recording(events)
+        self._realtime = realtime
+        self._speed = speed
+        self._origin = None
+        self._lock = threading.Lock()
+
+        self._cfi_events = [e for e in events if e["kind"].startswith("cfi_")]
+        self._cfi_pos = 0
+        self._cfi_buffer = b""
+
+        self._shi_reads = [e for e in events if e["kind"] == EVENT_SHI_READ]
+        self._shi_pos = 0
+        self._shi_by_key = {}
+        for pos, event in enumerate(self._shi_reads):
+            key = (event["registers"], event["addr"], event["count"])
+            self._shi_by_key.setdefault(key, deque()).append(pos)
+        # registers read so far: registers type -> addr -> value
+        self._registers = {"holdings": {}, "inputs": {}}
+
+    def _pace(self, event):
+        """Wait until the event is due (only for real-time pacing)."""
+        if not self._realtime:
+            return
+        now = time.monotonic()
+        if self._origin is None:
+            self._origin = (now, event["t"])
+            return
+        due = self._origin[0] + (event["t"] - self._origin[1]) / self._speed
+        if due > now:
+            time.sleep(due - now)
+
+    @property
+    def finished(self):
+        """Return True if all configuration interface connections have been replayed."""
+        return not any(e["kind"] == EVENT_CFI_CONNECT for e in self._cfi_events[self._cfi_pos:])
+
+    # Configuration interface #################################################
+
+    def cfi_connect(self):
+        """
+        Start the next recorded connection.
+
+        Raises:
+            ConnectionRefusedError: If no further connection was recorded.
+        """
+        with self._lock:
+            events = self._cfi_events
+            pos = self._cfi_pos
+            while pos < len(events) and events[pos]["kind"] != EVENT_CFI_CONNECT:
+                pos += 1
+            if pos >= len(events):
+                self._cfi_pos = pos
+                raise ConnectionRefusedError("No further connection recorded.")
+            self._cfi_pos = pos + 1
+            self._cfi_buffer = b""
+            event = events[pos]
+        self._pace(event)
+        return ReplaySocket(self)
+
+    def cfi_send(self, data):
+        with self._lock:
+            events = self._cfi_events
+            pos = self._cfi_pos
+            if pos < len(events) and events[pos]["kind"] == EVENT_CFI_SEND:
+                event = events[pos]
+                if bytes.fromhex(event["data"]) != bytes(data):
+                    LOGGER.warning(f"Replay: sent data {bytes(data).hex()} differs "
+                        + f"from the recorded {event['data']}.")
+                pos += 1
+            else:
+                event = None
+                LOGGER.warning("Replay: no further data sent within this connection.")
+            # The recorded response
+            while pos < len(events) and events[pos]["kind"] == EVENT_CFI_RECV:
+                self._cfi_buffer += bytes.fromhex(events[pos]["data"])
+                pos += 1
+            self._cfi_pos = pos
+        if event is not None:
+            self._pace(event)
+
+    def cfi_recv(self, count):
+        with self._lock:
+            data = self._cfi_buffer[:count]
+            self._cfi_buffer = self._cfi_buffer[count:]
+        return data
+
+    # Smart home interface ####################################################
+
+    def _apply_shi_reads(self, end):
+        """Update the known registers by all recorded reads up to `end` (exclusive)."""
+        for event in self._shi_reads[self._shi_pos:end]:
+            if event["data"] is not None:
+                registers = self._registers[event["registers"]]
+                for offset, value in enumerate(event["data"]):
+                    registers[event["addr"] + offset] = value
+        self._shi_pos = max(self._shi_pos, end)
+
+    def shi_read(self, register_type, addr, count):
+        """
+        Return the recorded register values.
+
+        Args:
+            register_type (str): Either "holdings" or "inputs".
+            addr (int): Address of the first register.
+            count (int): Number of registers.
+
+        Returns:
+            list[int] | None: The register values, or None if they were not recorded.
+        """
+        with self._lock:
+            positions = self._shi_by_key.get((register_type, addr, count))
+            if positions:
+                pos = positions.popleft()
+                self._apply_shi_reads(pos + 1)
+                event = self._shi_reads[pos]
+                data = event["data"]
+            else:
+                event = None
+                registers = self._registers[register_type]
+                data = [registers.get(a) for a in range(addr, addr + count)]
+                if None in data:
+                    data = None
+        if event is not None:
+            self._pace(event)
+        return data
+
+
+class ReplaySocket:
+    """Socket-like object, that serves the recorded bytes of one connection."""
+
+    def __init__(self, replay):
+        self._replay = replay
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        pass
+
+    def sendall(self, data):
+        self._replay.cfi_send(data)
+
+    def recv(self, count):
+        return self._replay.cfi_recv(count)
+
+
+class ReplaySocketInterface(LuxtronikSocketInterface):
+    """Configuration interface, which replays recorded traffic."""
+
+    def __init__(self, replay, host=LUXTRONIK_REPLAY_HOST):
+        """
+        Initialize the interface.
+
+        Args:
+            replay (TrafficReplay): The traffic to replay.
+            host (str): Name of the host, only used for the host lock and logging.
+        """
+        super().__init__(host)
+        self._replay = replay
+
+    def _create_connection(self):
+        return self._replay.cfi_connect()
+
+
+class ReplayModbusTcpInterface(LuxtronikModbusTcpInterface):
+    """Modbus TCP interface, which replays recorded registers."""
+
+    def __init__(self, replay, host=LUXTRONIK_REPLAY_HOST):
+        """
+        Initialize the interface.
+
+        Args:
+            replay (TrafficReplay): The traffic to replay.
+            host (str): Name of the host, only used for the host lock.
+        """
+        super().__init__(host)
+        self._replay = replay
+
+    def _connect(self):
+        return True
+
+    def _disconnect(self):
+        return True
+
+    def _read_register(self, read_reg_cb, telegram):
+        data = self._replay.shi_read(_register_type(telegram), telegram.addr, telegram.count)
+        valid = isinstance(data, list) and len(data) == telegram.count
+        telegram.data = data if valid else None
+        if not valid:
+            LOGGER.error(f"Modbus read failed: addr={telegram.addr}, "
+                + f"count={telegram.count}, not recorded")
+        return valid
+
+    def _write_register(self, write_reg_cb, telegram):
+        LOGGER.debug(f"Replay: ignored write of addr={telegram.addr}, data={telegram.data}")
+        return True
+
+
+class ReplayInterface(LuxtronikInterface):
+    """
+    Combined luxtronik interface (see `LuxtronikInterface`),
+    which replays the recorded traffic of both interfaces.
+    """
+
+    def __init__(self, replay, host=LUXTRONIK_REPLAY_HOST):
+        """
+        Initialize the interface.
+
+        Args:
+            replay (TrafficReplay): The traffic to replay.
+            host (str): Name of the host, only used for the host lock and logging.
+        """
+        self._replay = replay
+        super().__init__(host)
+
+    def _create_connection(self):
+        return self._replay.cfi_connect()
+
+    def _create_modbus_interface(self, host, port):
+        return ReplayModbusTcpInterface(self._replay, host)
@@ -0,0 +1,452 @@
+"""Poll the data vectors of a controller at independent rates."""
+
+import logging
+import threading
+import time
+
+from luxtronik.datatypes import Base
+
+
+LOGGER = logging.getLogger(__name__)
+
+CFI_VECTORS = ("parameters", "calculations", "visibilities")
+SHI_VECTORS = ("holdings", "inputs")
+
+
+###############################################################################
+# PollingTask
+###############################################################################
+
+class PollingTask:
+    """
+    A data vector (or a group of smart home fields) that is read periodically.
+
+    If bounds for the interval are given, the interval adapts itself to the
+    observed changes of the read raw values: The `change_rate` is the smoothed
+    fraction of the watched fields that changed per read. A rate of 0.0 results
+    in `max_interval`, a rate of at least `target_change_rate` in `min_interval`,
+    and rates in between are interpolated geometrically between both bounds.
+
+    By default all fields of the vector are watched. Restrict them via `watch`
+    to the fields that matter, e.g. to ignore free-running counters.
+    """
+
+    # Change rate that results in the minimum interval
+    target_change_rate = 0.5
+    # Weight of the latest read for the `change_rate`
+    change_rate_weight = 0.2
+
+    def __init__(self, name, vector_name, vector, interval, min_interval=None, max_interval=None,
+        watch=None):
+        """
+        Initialize a polling task.
+
+        Args:
+            name (str): Unique name of the task.
+            vector_name (str): Name of the related data vector within `LuxtronikAllData`,
+                e.g. "calculations" or "inputs".
+            vector (DataVector): Data vector to read. For field groups this is a
+                separate data vector, which contains the shared field objects.
+            interval (float): (Initial) time in seconds between two reads.
+            min_interval (float | None): Lower bound of the adaptive interval.
+            max_interval (float | None): Upper bound of the adaptive interval.
+                Only if both bounds are given, the interval is adapted.
+            watch (Iterable[LuxtronikDefinition | Base | str | int] | None):
+                Fields whose changes adapt the interval. All fields if None is provided.
+        """
+        self.name = name
+        self.vector_name = vector_name
+        self.vector = vector
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = self._limit(interval)
+        self.next_due = 0.0
+        self.last_read = None
+        # Result of the latest read, None until the first read
+        self.last_success = None
+        # Smoothed fraction of changed fields per read (0.0 .. 1.0), None until the second read
+        self.change_rate = None
+        self._watched = None
+        if watch is not None:
+            self._watched = []
+            for item in watch:
+                field = item if isinstance(item, Base) else vector.get(item)
+                if field is None:
+                    LOGGER.warning(f"Watched field '{item}' of task '{name}' not found.")
+                    continue
+                self._watched.append(field)
+        self._last_raws = None
+
+    def __repr__(self):
+        return f"PollingTask(name={self.name}, vector={self.vector_name}, " \
+            + f"interval={self.interval}, fields={len(self.vector)})"
+
+    @property
+    def adaptive(self):
+        """Return True if the interval adapts itself to the observed changes."""
+        return self.min_interval is not None and self.max_interval is not None
+
+    def _limit(self, interval):
+        if self.min_interval is not None:
+            interval = max(interval, self.min_interval)
+        if self.max_interval is not None:
+            interval = min(interval, self.max_interval)
+        return interval
+
+    def _adapt(self):
+        """Derive the interval from the change rate."""
+        ratio = min(1.0, self.change_rate / self.target_change_rate)
+        if self.min_interval > 0:
+            interval = self.max_interval * (self.min_interval / self.max_interval) ** ratio
+        else:
+            interval = self.max_interval - (self.max_interval - self.min_interval) * ratio
+        self.interval = self._limit(interval)
+
+    def observe(self):
+        """
+        Compare the current raw values of the watched fields with those
+        of the previous read, update the `change_rate` and adapt the interval.
+
+        Returns:
+            bool | None: True if any watched raw value has changed,
+                None if there was no previous read.
+        """
+        fields = self._watched if self._watched is not None else self.vector.values()
+        raws = [field.raw for field in fields]
+        last_raws = self._last_raws
+        self._last_raws = raws
+        if last_raws is None:
+            return None
+
+        changed = sum(1 for raw, last_raw in zip(raws, last_raws) if raw != last_raw)
+        fraction = changed / len(raws) if raws else 0.0
+        if self.change_rate is None:
+            self.change_rate = fraction
+        else:
+            weight = self.change_rate_weight
+            self.change_rate = (1.0 - weight) * self.change_rate + weight * fraction
+        if self.adaptive:
+            self._adapt()
+        return changed > 0
+
+    @property
+    def is_shi(self):
+        """Return True if the task is read via the smart home interface."""
+        return self.vector_name in SHI_VECTORS
+
+    def is_due(self, now):
+        return now >= self.next_due
+
+    def schedule(self, now):
+        """Schedule the next read relative to `now`."""
+        self.last_read = now
+        self.next_due = now + self.interval
+
+
+###############################################################################
+# LuxtronikScheduler
+###############################################################################
+
+class LuxtronikScheduler:
+    """
+    Reads the data vectors of a controller, each with its own interval.
+
+    Tasks are either whole data vectors (e.g. "parameters" every hour and
+    "calculations" every few seconds), or groups of smart home fields
+    (e.g. some inputs twice a second). On every tick only the due tasks are read:
+    - configuration interface vectors are only fetched when due,
+    - the fields of all due smart home tasks of the same register type are
+      merged into one data vector before they are collected, so adjacent
+      registers of different tasks are coalesced into the same telegram.
+      All of them are sent together while the host lock is held.
+
+    The read data is integrated into a single `LuxtronikAllData` object.
+    Field groups share their field objects with it.
+    """
+
+    def __init__(self, interface, data=None, callback=None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            interface (LuxtronikInterface): Interface used to read the data.
+            data (LuxtronikAllData | None): Data vector collection to fill.
+                If None is provided, it is created via the interface.
+            callback (callable | None): Optional function `callback(tasks, data)`
+                called after each tick in which at least one task was read.
+        """
+        self._interface = interface
+        self._data = data if data is not None else interface.create_all_data()
+        self._callback = callback
+        self._tasks = {}
+        # Merged data vectors by due smart home tasks, see `_merge_shi`
+        self._merged = {}
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def data(self):
+        """Return the data vector collection, which contains all read data."""
+        return self._data
+
+    @property
+    def tasks(self):
+        """Return all polling tasks."""
+        return list(self._tasks.values())
+
+    @property
+    def running(self):
+        """Return True if the background polling is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_task(self, name):
+        return self._tasks.get(name)
+
+    def _add_task(self, task):
+        if task.name in self._tasks:
+            LOGGER.warning(f"Task '{task.name}' replaced.")
+        self._tasks[task.name] = task
+        self._merged.clear()
+        return task
+
+    def add_vector(self, vector_name, interval, min_interval=None, max_interval=None, watch=None):
+        """
+        Read a whole data vector periodically.
+
+        Args:
+            vector_name (str): One of "parameters", "calculations",
+                "visibilities", "holdings" or "inputs".
+            interval (float): (Initial) time in seconds between two reads.
+            min_interval (float | None): Lower bound of the adaptive interval.
+            max_interval (float | None): Upper bound of the adaptive interval.
+                Only if both bounds are given, the interval is adapted
+                to the observed changes (see `PollingTask`).
+            watch (Iterable[LuxtronikDefinition | Base | str | int] | None):
+                Fields whose changes adapt the interval. All fields if None is provided.
+
+        Returns:
+            PollingTask | None: The created task, or None if the vector is unknown.
+        """
+        if vector_name not in CFI_VECTORS + SHI_VECTORS:
+            LOGGER.error(f"Unknown data vector '{vector_name}'.")
+            return None
+        vector = getattr(self._data, vector_name)
+        return self._add_task(PollingTask(vector_name, vector_name, vector, interval,
+            min_interval, max_interval, watch))
+
+    def add_group(self, name, vector_name, defs_fields_names_or_idxs, interval,
+        min_interval=None, max_interval=None, watch=None):
+        """
+        Read a group of smart home fields periodically.
+
+        The group shares the field objects with the related data vector of `data`,
+        so the read values are available there too.
+
+        Args:
+            name (str): Unique name of the task.
+            vector_name (str): Either "holdings" or "inputs".
+            defs_fields_names_or_idxs (Iterable[LuxtronikDefinition | Base | str | int]):
+                Fields of the group.
+            interval (float): (Initial) time in seconds between two reads.
+            min_interval (float | None): Lower bound of the adaptive interval.
+            max_interval (float | None): Upper bound of the adaptive interval.
+                Only if both bounds are given, the interval is adapted
+                to the observed changes (see `PollingTask`).
+            watch (Iterable[LuxtronikDefinition | Base | str | int] | None):
+                Fields of the group whose changes adapt the interval.
+                All fields if None is provided.
+
+        Returns:
+            PollingTask | None: The created task, or None if no group could be created.
+        """
+        if vector_name not in SHI_VECTORS:
+            LOGGER.error(f"Field groups are only supported for {SHI_VECTORS}, " \
+                + f"not for '{vector_name}'.")
+            return None
+        source = getattr(self._data, vector_name)
+        fields = []
+        for item in defs_fields_names_or_idxs:
+            field = item if isinstance(item, Base) else source.get(item)
+            if field is not None:
+                fields.append(field)
+        if not fields:
+            LOGGER.error(f"Group '{name}' does not contain any field.")
+            return None
+        vector = source.empty(source.version, source.safe)
+        vector.add_many(fields)
+        # Changes read via the group are reported to the observers of `data`
+        vector.share_observers(source)
+        return self._add_task(PollingTask(name, vector_name, vector, interval,
+            min_interval, max_interval, watch))
+
+    def remove(self, name):
+        """Remove a task by its name."""
+        self._merged.clear()
+        return self._tasks.pop(name, None) is not None
+
+    def due_tasks(self, now=None):
+        """Return all tasks that are due at `now` (defaults to the current time)."""
+        now = time.monotonic() if now is None else now
+        return [task for task in self._tasks.values() if task.is_due(now)]
+
+    def next_due(self):
+        """Return the point in time (`time.monotonic`) of the next due task, or None."""
+        if not self._tasks:
+            return None
+        return min(task.next_due for task in self._tasks.values())
+
+    def _read_cfi(self, task):
+        read = getattr(self._interface, f"read_{task.vector_name}")
+        read(task.vector)
+
+    def _collect_shi(self, vector_name, vector):
+        if vector_name == "inputs":
+            self._interface.collect_inputs(vector)
+        else:
+            self._interface.collect_holdings_for_read(vector)
+
+    def _merge_shi(self, vector_name, tasks):
+        """
+        Merge the fields of all given smart home tasks of the same register type
+        into one data vector. The merged vectors are cached per set of tasks.
+
+        Returns:
+            list[DataVector]: The data vectors to collect. Usually only the merged one,
+                plus the vectors of tasks with a field that conflicts with the field
+                of another task (same definition but different field object).
+        """
+        if len(tasks) == 1:
+            return [tasks[0].vector]
+        key = tuple((task, len(task.vector)) for task in tasks)
+        vectors = self._merged.get(key)
+        if vectors is None:
+            source = getattr(self._data, vector_name)
+            merged = source.empty(source.version, source.safe)
+            # Changes read via the merged vector are reported to the observers of `data`
+            merged.share_observers(source)
+            vectors = [merged]
+            for task in tasks:
+                fields = list(task.vector.values())
+                added = merged.add_many(fields)
+                if any(a is not field for a, field in zip(added, fields)):
+                    vectors.append(task.vector)
+            self._merged[key] = vectors
+        return vectors
+
+    def _read_shi(self, tasks):
+        """
+        Read all smart home tasks with a single send.
+
+        Returns:
+            dict[PollingTask, bool]: Whether each task could be read.
+        """
+        by_type = {}
+        for task in tasks:
+            by_type.setdefault(task.vector_name, []).append(task)
+        try:
+            with self._interface.lock:
+                for vector_name, type_tasks in by_type.items():
+                    for vector in self._merge_shi(vector_name, type_tasks):
+                        self._collect_shi(vector_name, vector)
+                success = self._interface.send()
+                failed_fields = getattr(self._interface, "failed_fields", None)
+        except Exception as e:
+            LOGGER.error(f"Failed to read {[task.name for task in tasks]}: {e}")
+            return {task: False for task in tasks}
+        if success:
+            return {task: True for task in tasks}
+        # Only the tasks with fields in a failed block are unsuccessful
+        if failed_fields is None:
+            return {task: False for task in tasks}
+        failed = {id(field) for field in failed_fields}
+        return {task: not any(id(field) in failed for field in task.vector.values())
+            for task in tasks}
+
+    def _read(self, tasks):
+        """
+        Read the given tasks.
+
+        Returns:
+            dict[PollingTask, bool]: Whether each task could be read.
+        """
+        results = {}
+        shi_tasks = []
+        for task in tasks:
+            if task.is_shi:
+                shi_tasks.append(task)
+                continue
+            try:
+                self._read_cfi(task)
+                results[task] = True
+            except Exception as e:
+                LOGGER.error(f"Failed to read '{task.name}': {e}")
+                results[task] = False
+        if shi_tasks:
+            results.update(self._read_shi(shi_tasks))
+        return results
+
+    def tick(self, now=None):
+        """
+        Read all due tasks once.
+
+        Args:
+            now (float | None): Current point in time (`time.monotonic`).
+
+        Returns:
+            list[PollingTask]: The tasks read within this tick.
+        """
+        now = time.monotonic() if now is None else now
+        tasks = self.due_tasks(now)
+        if not tasks:
+            return tasks
+        results = self._read(tasks)
+        for task in tasks:
+            task.last_success = results[task]
+            # Adapt the intervals only to successfully read data
+            if task.last_success:
+                task.observe()
+            task.schedule(now)
+        if self._callback is not None:
+            try:
+                self._callback(tasks, self._data)
+            except Exception as e:
+                LOGGER.error(f"Callback failed: {e}")
+        return tasks
+
+    def start(self):
+        """
+        Start the polling in a background thread.
+
+        Returns:
+            bool: True if the polling was started, False if it is already running.
+        """
+        if self.running:
+            LOGGER.warning("The scheduler is already running.")
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="luxtronik-scheduler",
+            daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.tick()
+            next_due = self.next_due()
+            timeout = 1.0 if next_due is None else next_due - time.monotonic()
+            self._stop_event.wait(max(0.0, timeout))
+
+    def stop(self, timeout=None):
+        """
+        Stop the background polling. A running tick is completed first.
+
+        Args:
+            timeout (float | None): Maximum time in seconds to wait for the thread.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
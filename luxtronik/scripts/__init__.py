@@ -1,8 +1,165 @@
 """Luxtronik script helper."""
 
 import argparse
+import json
+import platform
+import time
 
 
+# Version of the JSON format of the benchmark results
+BENCHMARK_RESULTS_FORMAT = 1
+
+
+class TimeMeasurement:
+    def __init__(self):
+        self.duration = 0
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        self.duration = end - self._start
+
+def percentile(sorted_values, fraction):
+    """
+    Return the percentile of already sorted values (linear interpolation).
+
+    Args:
+        sorted_values (list[float]): Values in ascending order.
+        fraction (float): Percentile between 0.0 and 1.0.
+
+    Returns:
+        float | None: The percentile or None for an empty list.
+    """
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * fraction
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (pos - lower)
+
+def summarize_samples(durations, items_per_sample, unit, errors=0):
+    """
+    Summarize the durations of repeated operations.
+
+    Args:
+        durations (list[float]): Duration in seconds of each successful operation.
+        items_per_sample (int): Number of processed items (e.g. fields) per operation.
+        unit (str): Unit of the throughput, e.g. "fields/s".
+        errors (int): Number of failed operations.
+
+    Returns:
+        dict: Latency percentiles in milliseconds and the throughput.
+    """
+    values = sorted(durations)
+    total = sum(values)
+    latency = {
+        "min": values[0] * 1000 if values else None,
+        "mean": total / len(values) * 1000 if values else None,
+    }
+    for name, fraction in [("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0)]:
+        value = percentile(values, fraction)
+        latency[name] = value * 1000 if value is not None else None
+    return {
+        "samples": len(values),
+        "errors": errors,
+        "latency_ms": latency,
+        "throughput": len(values) * items_per_sample / total if total > 0 else None,
+        "unit": unit,
+    }
+
+def create_results(name, results, **info):
+    """Wrap benchmark results into the stable JSON structure."""
+    return {
+        "format": BENCHMARK_RESULTS_FORMAT,
+        "benchmark": name,
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        **info,
+        "results": results,
+    }
+
+def save_results(filename, results):
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+def load_results(filename):
+    """Return the stored benchmark results or None if they cannot be read."""
+    try:
+        with open(filename, encoding="utf-8") as f:
+            results = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read baseline '{filename}': {e}")
+        return None
+    if results.get("format") != BENCHMARK_RESULTS_FORMAT:
+        print(f"Unsupported format of baseline '{filename}'")
+        return None
+    return results
+
+def compare_results(current, baseline, threshold):
+    """
+    Compare benchmark results with a baseline.
+
+    A case is flagged as regression if its median latency increased or
+    its throughput decreased by more than `threshold` (relative).
+
+    Args:
+        current (dict): Results created by `create_results`.
+        baseline (dict): Results created by `create_results`.
+        threshold (float): Tolerated relative deviation, e.g. 0.2 for 20%.
+
+    Returns:
+        list[str]: Descriptions of the detected regressions.
+    """
+    regressions = []
+    for case, result in current["results"].items():
+        base = baseline["results"].get(case)
+        if base is None:
+            continue
+        p50, base_p50 = result["latency_ms"]["p50"], base["latency_ms"]["p50"]
+        if p50 is not None and base_p50 and p50 > base_p50 * (1 + threshold):
+            regressions.append(f"{case}: median latency {p50:.3f} ms > baseline {base_p50:.3f} ms")
+        rate, base_rate = result["throughput"], base["throughput"]
+        if rate is not None and base_rate and rate < base_rate * (1 - threshold):
+            regressions.append(f"{case}: throughput {rate:.1f} {result['unit']} < baseline {base_rate:.1f}")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{case}: {result['errors']} errors > baseline {base['errors']}")
+    return regressions
+
+def add_results_args(parser):
+    """Add the common output and baseline arguments of the benchmark scripts."""
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare the results with this JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Tolerated relative deviation from the baseline",
+    )
+
+def report_results(results, args):
+    """
+    Print and store the results and compare them with the baseline.
+
+    Returns:
+        int: 1 if a regression was detected, otherwise 0.
+    """
+    print(json.dumps(results, indent=2, sort_keys=True))
+    if args.output:
+        save_results(args.output, results)
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        if baseline is None:
+            return 1
+        regressions = compare_results(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
 def create_default_args_parser(func_desc, default_port):
     parser = argparse.ArgumentParser(description=func_desc)
     parser.add_argument("ip", help="IP address of Luxtronik controller to connect to")
@@ -0,0 +1,215 @@
+#! /usr/bin/env python3
+# pylint: disable=invalid-name
+"""
+Script to benchmark the end-to-end performance of both interfaces,
+either against a Luxtronik controller or against the built-in simulator.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from contextlib import contextmanager
+
+from luxtronik import LuxtronikInterface
+from luxtronik.cfi import LuxtronikSocketInterface, LuxtronikData
+from luxtronik.cfi import interface as cfi_interface
+from luxtronik.cfi.constants import LUXTRONIK_DEFAULT_PORT
+from luxtronik.instrumentation import ChromeTraceRecorder
+from luxtronik.scripts import add_results_args, create_results, report_results, summarize_samples
+from luxtronik.shi import modbus as shi_modbus
+from luxtronik.shi.constants import LUXTRONIK_DEFAULT_MODBUS_PORT
+from luxtronik.simulator import LuxtronikSimulator
+
+logging.disable(logging.CRITICAL)
+
+# Fields that are written with their current value by the write benchmarks
+BENCH_PARAMETER = "ID_Einst_WK_akt"
+BENCH_HOLDING = "heating_offset"
+
+BENCH_CASES = ["cfi_read", "cfi_write", "shi_read", "shi_write", "read_all"]
+BENCH_WRITE_CASES = ["cfi_write", "shi_write"]
+
+
+@contextmanager
+def without_write_wait():
+    """
+    Skip the settle time after writes. Only the simulator does not need it.
+    """
+    saved = (cfi_interface.WAIT_TIME_AFTER_PARAMETER_WRITE, shi_modbus.LUXTRONIK_WAIT_TIME_AFTER_HOLDING_WRITE)
+    cfi_interface.WAIT_TIME_AFTER_PARAMETER_WRITE = 0
+    shi_modbus.LUXTRONIK_WAIT_TIME_AFTER_HOLDING_WRITE = 0
+    try:
+        yield
+    finally:
+        cfi_interface.WAIT_TIME_AFTER_PARAMETER_WRITE, shi_modbus.LUXTRONIK_WAIT_TIME_AFTER_HOLDING_WRITE = saved
+
+def measure(func, iterations, items, unit="fields/s"):
+    """
+    Call `func` repeatedly and summarize the durations.
+    Calls returning a falsy value are counted as errors.
+    """
+    durations = []
+    errors = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        success = func()
+        duration = time.perf_counter() - start
+        if success:
+            durations.append(duration)
+        else:
+            errors += 1
+    return summarize_samples(durations, items, unit, errors)
+
+
+###############################################################################
+# Benchmark cases
+###############################################################################
+
+def bench_cfi_read(interface, iterations):
+    """Full read of parameters, calculations and visibilities."""
+    data = LuxtronikData()
+    items = len(data.parameters) + len(data.calculations) + len(data.visibilities)
+    return measure(lambda: LuxtronikSocketInterface.read(interface, data), iterations, items)
+
+def bench_cfi_write(interface, iterations):
+    """Write a single parameter with its current value."""
+    parameters = LuxtronikSocketInterface.read_parameters(interface)
+    if parameters is None:
+        return summarize_samples([], 1, "fields/s", iterations)
+    field = parameters.get(BENCH_PARAMETER)
+
+    def write():
+        field.write_pending = True
+        LuxtronikSocketInterface.write(interface, parameters)
+        # The config interface does not report failed writes
+        return not field.write_pending
+    return measure(write, iterations, 1)
+
+def bench_shi_read(interface, iterations):
+    """Block read of all supported inputs and holdings."""
+    inputs = interface.create_inputs()
+    holdings = interface.create_holdings()
+    items = len(inputs) + len(holdings)
+
+    def read():
+        interface.collect_inputs(inputs)
+        interface.collect_holdings_for_read(holdings)
+        return interface.send()
+    return measure(read, iterations, items)
+
+def bench_shi_write(interface, iterations):
+    """Write a single holding with its current value."""
+    holdings = interface.create_holdings()
+    interface.collect_holdings_for_read(holdings)
+    field = holdings.get(BENCH_HOLDING)
+    if not interface.send() or field is None or field.raw is None:
+        return summarize_samples([], 1, "fields/s", iterations)
+
+    def write():
+        field.write_pending = True
+        interface.collect_holdings_for_write(holdings)
+        return interface.send()
+    return measure(write, iterations, 1)
+
+def bench_read_all(interface, iterations):
+    """Combined read of both interfaces."""
+    data = interface.create_all_data()
+    items = sum(len(vector) for vector in
+        [data.parameters, data.calculations, data.visibilities, data.holdings, data.inputs])
+    return measure(lambda: interface.read_all(data), iterations, items)
+
+BENCH_FUNCTIONS = {
+    "cfi_read": bench_cfi_read,
+    "cfi_write": bench_cfi_write,
+    "shi_read": bench_shi_read,
+    "shi_write": bench_shi_write,
+    "read_all": bench_read_all,
+}
+
+def run_benchmarks(interface, cases, iterations):
+    """
+    Run the selected benchmark cases.
+
+    Args:
+        interface (LuxtronikInterface): Combined interface to the controller.
+        cases (list[str]): Names of the cases to run.
+        iterations (int): Number of repetitions per case.
+
+    Returns:
+        dict: Summary per case.
+    """
+    return {case: BENCH_FUNCTIONS[case](interface, iterations) for case in cases}
+
+
+###############################################################################
+# Command line interface
+###############################################################################
+
+def create_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark both interfaces of a Luxtronik controller "
+        + "or of the built-in simulator."
+    )
+    parser.add_argument("ip", nargs="?", default=None,
+        help="IP address of the Luxtronik controller. Use the simulator if omitted.")
+    parser.add_argument("--port-cfi", type=int, default=LUXTRONIK_DEFAULT_PORT,
+        help="Port of the config interface")
+    parser.add_argument("--port-shi", type=int, default=LUXTRONIK_DEFAULT_MODBUS_PORT,
+        help="Port of the smart home interface")
+    parser.add_argument("--iterations", type=int, default=20, help="Number of repetitions per case")
+    parser.add_argument("--cases", default=",".join(BENCH_CASES),
+        help=f"Comma separated list of cases, available: {', '.join(BENCH_CASES)}")
+    parser.add_argument("--write", action="store_true",
+        help="Allow write cases against a real controller (current values are written back)")
+    parser.add_argument("--latency", type=float, default=0.0,
+        help="Response latency of the simulator in seconds")
+    parser.add_argument("--trace", help="Write a Chrome trace (viewable in Perfetto) to this file")
+    add_results_args(parser)
+    return parser
+
+def select_cases(args):
+    """Return the cases to run. Write cases are skipped for a controller without --write."""
+    cases = [case for case in args.cases.split(",") if case]
+    unknown = [case for case in cases if case not in BENCH_FUNCTIONS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases: {', '.join(unknown)}")
+    if args.ip is not None and not args.write:
+        cases = [case for case in cases if case not in BENCH_WRITE_CASES]
+    return cases
+
+def bench(argv=None):
+    """
+    Entry point of `luxtronik bench`.
+
+    Returns:
+        int: Exit code, 1 if a regression was detected.
+    """
+    args = create_parser().parse_args(argv)
+    try:
+        cases = select_cases(args)
+    except ValueError as e:
+        print(e)
+        return 2
+
+    trace = ChromeTraceRecorder() if args.trace else None
+    if args.ip is None:
+        with LuxtronikSimulator(port_config=0, port_shi=0, latency=args.latency) as simulator, \
+                without_write_wait():
+            interface = LuxtronikInterface(simulator.host, simulator.port_config,
+                simulator.port_shi, trace)
+            results = run_benchmarks(interface, cases, args.iterations)
+        target = "simulator"
+    else:
+        interface = LuxtronikInterface(args.ip, args.port_cfi, args.port_shi, trace)
+        results = run_benchmarks(interface, cases, args.iterations)
+        target = f"{args.ip}:{args.port_cfi}/{args.port_shi}"
+    if trace is not None:
+        trace.save(args.trace)
+
+    results = create_results("bench", results, target=target, iterations=args.iterations)
+    return report_results(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(bench())
@@ -0,0 +1,331 @@
+#! /usr/bin/env python3
+# pylint: disable=invalid-name
+"""
+Script to measure CPU-bound operations of the data handling.
+No connection to a controller is required, all payloads are synthetic.
+
+The results are printed (and optionally stored) as JSON, so that
+optimizations can be compared against a baseline with the same numbers.
+"""
+
+import argparse
+import inspect
+import logging
+import sys
+
+from luxtronik import datatypes
+from luxtronik.collections import (
+    _unpack_values_loop,
+    integrate_data,
+    pack_all_values,
+    pack_values,
+    unpack_values,
+)
+from luxtronik.scripts import (
+    TimeMeasurement,
+    add_results_args,
+    create_results,
+    report_results,
+    summarize_samples,
+)
+from luxtronik.cfi import Calculations, Parameters
+from luxtronik.cfi.interface import LuxtronikSocketInterface
+from luxtronik.shi.constants import LUXTRONIK_SHI_REGISTER_BIT_SIZE
+from luxtronik.shi.contiguous import ContiguousDataBlockList
+from luxtronik.shi.holdings import Holdings
+from luxtronik.shi.inputs import Inputs
+
+logging.disable(logging.CRITICAL)
+
+
+def measure(func, repeat, items, unit="fields/s"):
+    """
+    Call `func` `repeat` times and summarize the duration of each round.
+
+    Args:
+        func (Callable[[], Any]): Function processing `items` items per call.
+        repeat (int): Number of rounds.
+        items (int): Number of processed items per round.
+        unit (str): Unit of the throughput.
+
+    Returns:
+        dict: Summary created by `summarize_samples`.
+    """
+    durations = []
+    for _ in range(repeat):
+        with TimeMeasurement() as t:
+            func()
+        durations.append(t.duration)
+    return summarize_samples(durations, items, unit)
+
+def measure_add_fields(vector_type, repeat):
+    """
+    Measure the creation of an empty data vector
+    which is filled with all available fields afterwards.
+    """
+    indices = [d.index for d in vector_type.definitions]
+    num_fields = len(indices)
+
+    def add_one_by_one():
+        vector = vector_type.empty()
+        for index in reversed(indices):
+            vector.add(index)
+
+    def add_at_once():
+        vector = vector_type.empty()
+        vector.add_many(reversed(indices))
+
+    return {
+        f"add_fields/{vector_type.name}/one_by_one": measure(add_one_by_one, repeat, num_fields),
+        f"add_fields/{vector_type.name}/at_once": measure(add_at_once, repeat, num_fields),
+    }
+
+def measure_parse(vector_type, repeat):
+    """
+    Measure the parsing of raw data, which contains only defined indices.
+    """
+    interface = LuxtronikSocketInterface("localhost")
+    vector = vector_type()
+    raw_data = list(range(max(d.index + d.count for d in vector_type.definitions)))
+    return {
+        f"parse/{vector_type.name}": measure(
+            lambda: interface._parse(vector, raw_data), repeat, len(raw_data)),
+    }
+
+def measure_parse_unknown(vector_type, num_unknown, repeat):
+    """
+    Measure the parsing of raw data, which contains
+    a large range of undefined (= unknown) indices.
+    """
+    interface = LuxtronikSocketInterface("localhost")
+    num_defined = len(vector_type())
+    raw_data = list(range(num_defined + num_unknown))
+    vector = vector_type()
+    return {
+        f"parse_unknown/{vector_type.name}/new_vector": measure(
+            lambda: interface._parse(vector_type(), raw_data), repeat, len(raw_data)),
+        f"parse_unknown/{vector_type.name}/same_vector": measure(
+            lambda: interface._parse(vector, raw_data), repeat, len(raw_data)),
+    }
+
+def measure_integrate_data(vector_type, repeat):
+    """
+    Measure `integrate_data` for all fields of a data vector.
+    """
+    vector = vector_type()
+    pairs = list(vector.data.pairs)
+    raw_data = list(range(max(pair.index + pair.count for pair in pairs)))
+
+    def integrate():
+        for definition, field in pairs:
+            integrate_data(definition, field, raw_data, 32)
+
+    return {
+        f"integrate_data/{vector_type.name}": measure(integrate, repeat, len(pairs)),
+    }
+
+def measure_blocks(vector_type, repeat):
+    """
+    Measure the creation of the contiguous data blocks of a smart home interface
+    data vector: directly via `ContiguousDataBlockList.collect` and
+    via `DataVectorSmartHome.update_read_blocks` (forced re-creation).
+    Also measure the integration of the read data into the blocks.
+    """
+    vector = vector_type()
+    pairs = list(vector.data.pairs)
+
+    def collect():
+        blocks = ContiguousDataBlockList(vector_type.name, True)
+        for definition, field in pairs:
+            blocks.collect(definition, field)
+
+    def update_read_blocks():
+        vector._read_blocks_up_to_date = False
+        vector.update_read_blocks()
+
+    vector.update_read_blocks()
+    blocks = list(vector._read_blocks)
+    block_data = [list(range(block.overall_count)) for block in blocks]
+
+    def integrate():
+        for block, data in zip(blocks, block_data):
+            block.integrate_data(data)
+
+    return {
+        f"blocks/{vector_type.name}/collect": measure(collect, repeat, len(pairs)),
+        f"blocks/{vector_type.name}/update_read_blocks": measure(update_read_blocks, repeat, len(pairs)),
+        f"blocks/{vector_type.name}/integrate_data": measure(integrate, repeat, len(pairs)),
+    }
+
+def measure_definition_lookups(definitions, name, repeat):
+    """
+    Measure the look-up of definitions by name and by index.
+    Outdated definitions are skipped, as they are not the common case.
+    """
+    names = [d.name for d in definitions if d.valid]
+    indices = [d.index for d in definitions if d.valid]
+
+    def by_name():
+        for n in names:
+            definitions.get(n)
+
+    def by_index():
+        for i in indices:
+            definitions.get(i)
+
+    return {
+        f"definition_lookup/{name}/by_name": measure(by_name, repeat, len(names), "lookups/s"),
+        f"definition_lookup/{name}/by_index": measure(by_index, repeat, len(indices), "lookups/s"),
+    }
+
+def get_datatypes():
+    """
+    Return all usable datatypes of the datatypes module.
+    ScalingBase is skipped, as it is only initialized for subclasses.
+    """
+    return [cls for _, cls in inspect.getmembers(datatypes, inspect.isclass)
+        if issubclass(cls, datatypes.Base) and cls.__module__ == datatypes.__name__
+        and cls is not datatypes.ScalingBase]
+
+def measure_datatypes(num_values, repeat):
+    """
+    Measure the conversion throughput of all datatypes
+    in both directions (from_heatpump and to_heatpump).
+    """
+    results = {}
+    for datatype in get_datatypes():
+        if datatype.concatenate_multiple_data_chunks:
+            raws = list(range(num_values))
+        else:
+            raws = [[65 + i % 26, 66, 67, 0] for i in range(num_values)]
+        values = [datatype.from_heatpump(raw) for raw in raws]
+        values = [value for value in values if value is not None]
+
+        def from_heatpump():
+            for raw in raws:
+                datatype.from_heatpump(raw)
+
+        def to_heatpump():
+            for value in values:
+                datatype.to_heatpump(value)
+
+        results[f"datatype/{datatype.__name__}/from_heatpump"] = \
+            measure(from_heatpump, repeat, len(raws), "values/s")
+        results[f"datatype/{datatype.__name__}/to_heatpump"] = \
+            measure(to_heatpump, repeat, len(values), "values/s")
+    return results
+
+def pack_values_loop(values, num_bits, reverse=True):
+    """
+    Previous implementation of `pack_values`, used as reference.
+    """
+    count = len(values)
+    mask = (1 << num_bits) - 1
+
+    result = 0
+    for idx, value in enumerate(values):
+        bit_index = (count - 1 - idx) if reverse else idx
+        result |= (value & mask) << (num_bits * bit_index)
+
+    return result
+
+def measure_pack_values(num_fields, repeat):
+    """
+    Measure the packing and unpacking of multi-register fields (16 bit registers)
+    with the generic loop, the struct-based functions and the batch variant.
+    """
+    counts = [2, 4] * (num_fields // 2)
+    chunks = []
+    offset = 0
+    for count in counts:
+        chunks.append((offset, count))
+        offset += count
+    data = [(i * 7919) & 0xFFFF for i in range(offset)]
+    packed = pack_all_values(data, chunks, LUXTRONIK_SHI_REGISTER_BIT_SIZE)
+
+    def pack_loop():
+        for o, c in chunks:
+            pack_values_loop(data[o:o + c], 16, True)
+
+    def pack():
+        for o, c in chunks:
+            pack_values(data[o:o + c], 16)
+
+    def unpack_loop():
+        for value, (_, c) in zip(packed, chunks):
+            _unpack_values_loop(value, c, 16, True)
+
+    def unpack():
+        for value, (_, c) in zip(packed, chunks):
+            unpack_values(value, c, 16)
+
+    return {
+        "pack_values/loop_reference": measure(pack_loop, repeat, len(chunks)),
+        "pack_values/pack_values": measure(pack, repeat, len(chunks)),
+        "pack_values/pack_all_values": measure(
+            lambda: pack_all_values(data, chunks, 16), repeat, len(chunks)),
+        "unpack_values/loop_reference": measure(unpack_loop, repeat, len(chunks)),
+        "unpack_values/unpack_values": measure(unpack, repeat, len(chunks)),
+    }
+
+def run_benchmarks(repeat, num_unknown, num_values):
+    """
+    Run all microbenchmarks.
+
+    Returns:
+        dict: Summary per case.
+    """
+    results = {}
+    results.update(measure_add_fields(Parameters, repeat))
+    results.update(measure_add_fields(Calculations, repeat))
+    results.update(measure_parse(Parameters, repeat))
+    results.update(measure_parse(Calculations, repeat))
+    results.update(measure_parse_unknown(Calculations, num_unknown, repeat))
+    results.update(measure_integrate_data(Calculations, repeat))
+    results.update(measure_blocks(Holdings, repeat))
+    results.update(measure_blocks(Inputs, repeat))
+    results.update(measure_definition_lookups(Calculations.definitions, "calculations", repeat))
+    results.update(measure_definition_lookups(Inputs.definitions, "inputs", repeat))
+    results.update(measure_datatypes(num_values, repeat))
+    results.update(measure_pack_values(num_values, repeat))
+    return results
+
+def performance_cpu(argv=None):
+    """
+    Entry point of `luxtronik bench-cpu`.
+
+    Returns:
+        int: Exit code, 1 if a regression was detected.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure CPU-bound operations of the data handling."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=10,
+        help="Number of repetitions per measurement",
+    )
+    parser.add_argument(
+        "--unknown",
+        type=int,
+        default=5000,
+        help="Number of unknown indices to parse",
+    )
+    parser.add_argument(
+        "--values",
+        type=int,
+        default=1000,
+        help="Number of values to convert per datatype",
+    )
+    add_results_args(parser)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.repeat, args.unknown, args.values)
+    results = create_results("cpu", results, repeat=args.repeat,
+        unknown=args.unknown, values=args.values)
+    return report_results(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(performance_cpu())
@@ -4,28 +4,14 @@
 Script to measure different access methods of the smart home interface.
 """
 
-import time
-
 from luxtronik.scripts import (
-    create_default_args_parser
+    create_default_args_parser,
+    TimeMeasurement,
 )
 from luxtronik.shi import create_modbus_tcp
 from luxtronik.shi.constants import LUXTRONIK_DEFAULT_MODBUS_PORT
 from luxtronik.shi.common import LuxtronikSmartHomeReadInputsTelegram
 
-class TimeMeasurement:
-    def __init__(self):
-        self.duration = 0
-        self._start = 0
-
-    def __enter__(self):
-        self._start = time.perf_counter()
-        return self
-
-    def __exit__(self, exc_type, exc, tb):
-        end = time.perf_counter()
-        self.duration = end - self._start
-
 def performance_shi():
     parser = create_default_args_parser(
         "Measure different access methods of the smart home interface.",
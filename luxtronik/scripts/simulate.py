@@ -0,0 +1,67 @@
+#! /usr/bin/env python3
+
+# pylint: disable=invalid-name
+"""
+Script to run a simulated Luxtronik controller on the local machine
+"""
+
+import argparse
+import logging
+import time
+
+from luxtronik.cfi.constants import LUXTRONIK_DEFAULT_PORT
+from luxtronik.shi.constants import LUXTRONIK_DEFAULT_MODBUS_PORT
+from luxtronik.simulator import LUXTRONIK_SIMULATOR_DEFAULT_HOST, LuxtronikSimulator, SimulatorState
+
+
+def parse_addrs(text):
+    """Parse a list of addresses like "10000,10005-10010"."""
+    addrs = []
+    for part in text.split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        addrs.extend(range(int(first), int(last or first) + 1))
+    return addrs
+
+def create_simulator(args):
+    state = SimulatorState()
+    state.remove_registers("holdings", parse_addrs(args.missing_holdings))
+    state.remove_registers("inputs", parse_addrs(args.missing_inputs))
+    return LuxtronikSimulator(
+        args.host, args.port_cfi, args.port_shi, state,
+        latency=args.latency, evolve_interval=args.evolve, seed=args.seed
+    )
+
+def create_parser():
+    parser = argparse.ArgumentParser(description="Runs a simulated Luxtronik controller")
+    parser.add_argument("--host", default=LUXTRONIK_SIMULATOR_DEFAULT_HOST, help="Address to listen on")
+    parser.add_argument("--port-cfi", type=int, default=LUXTRONIK_DEFAULT_PORT,
+        help="Port of the config interface")
+    parser.add_argument("--port-shi", type=int, default=LUXTRONIK_DEFAULT_MODBUS_PORT,
+        help="Port of the smart home interface")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay in seconds before each response")
+    parser.add_argument("--evolve", type=float, default=None,
+        help="Interval in seconds in which values change")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the evolving values")
+    parser.add_argument("--missing-holdings", default="",
+        help="Holding register addresses that do not exist, e.g. 10000,10005-10010")
+    parser.add_argument("--missing-inputs", default="",
+        help="Input register addresses that do not exist, e.g. 10000,10005-10010")
+    return parser
+
+def simulate():
+    args = create_parser().parse_args()
+    logging.basicConfig(level=logging.INFO)
+    with create_simulator(args) as simulator:
+        print(f"Simulating on {simulator.host}: config port {simulator.port_config}, "
+            + f"modbus port {simulator.port_shi}. Press Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    simulate()
@@ -117,7 +117,8 @@ def create_modbus_tcp(
     host,
     port=LUXTRONIK_DEFAULT_MODBUS_PORT,
     timeout=LUXTRONIK_DEFAULT_MODBUS_TIMEOUT,
-    version=VERSION_DETECT
+    version=VERSION_DETECT,
+    instrumentation=None
 ):
     """
     Create a LuxtronikSmartHomeInterface using a Modbus TCP connection.
@@ -138,13 +139,17 @@ def create_modbus_tcp(
             If VERSION_DETECT is passed, the function will attempt to determine the version.
             If a str is passed, the string will be parsed into a version tuple.
             If None is passed, trial-and-error mode is activated.
+        instrumentation (Instrumentation | None): Optional receiver
+            of the timing of each phase and telegram.
 
     Returns:
         LuxtronikSmartHomeInterface:
             Initialized interface instance bound to the Modbus TCP connection.
     """
     modbus_interface = LuxtronikModbusTcpInterface(host, port, timeout)
+    if instrumentation is not None:
+        modbus_interface.instrumentation = instrumentation
     resolved_version = resolve_version(modbus_interface, version)
     LOGGER.info(f"Create smart home interface via modbus-TCP on {host}:{port}"
         + f" for version {resolved_version}")
-    return LuxtronikSmartHomeInterface(modbus_interface, resolved_version)
\ No newline at end of file
+    return LuxtronikSmartHomeInterface(modbus_interface, resolved_version, instrumentation)
\ No newline at end of file
@@ -6,7 +6,10 @@ or a non-existent register within a read/write operation will result in a transm
 
 import logging
 
-from luxtronik.collections import LuxtronikDefFieldPair
+from luxtronik.collections import (
+    LuxtronikDefFieldPair,
+    pack_all_values,
+)
 from luxtronik.shi.constants import LUXTRONIK_SHI_REGISTER_BIT_SIZE
 
 
@@ -22,9 +25,33 @@ class ContiguousDataPart(LuxtronikDefFieldPair):
     Each part references a `field` and its associated `definition`.
     """
 
+    def __init__(self, definition, field, data_arr=None):
+        """
+        Initialize a contiguous data part.
+
+        Args:
+            definition (LuxtronikDefinition): The definition for this field.
+            field (Base): The field object.
+            data_arr (list[int] | None): Optional, already determined register values
+                of the field (see `get_data_arr`). They are used as long as
+                the raw value of the field does not change.
+        """
+        super().__init__(definition, field)
+        self._data_arr = data_arr
+        self._data_raw = field.raw if data_arr is not None else None
+
     def __repr__(self):
         return f"({self.index}, {self.count})"
 
+    def get_data_arr(self, num_bits):
+        """
+        Return the register values of the field.
+        Re-use the provided register values if the field's raw value is unchanged.
+        """
+        if self._data_arr is not None and self.field.raw is self._data_raw:
+            return self._data_arr
+        return super().get_data_arr(num_bits)
+
 
 ###############################################################################
 # ContiguousDataBlock
@@ -44,28 +71,33 @@ class ContiguousDataBlock:
 
     def __init__(self):
         self._parts = []
+        self._first_idx = 0
         self._last_idx = -1
+        self._kernel = None
 
     @classmethod
-    def create_and_add(cls, definition, field):
+    def create_and_add(cls, definition, field, data_arr=None):
         """
         Create a new block and add a single part.
 
         Args:
             definition (LuxtronikDefinition): Definition to add.
             field (Base): Associated field object.
+            data_arr (list[int] | None): Optional, already determined register values to write.
 
         Returns:
             ContiguousDataBlock: New block with the part added.
         """
         obj = cls()
-        obj.add(definition, field)
+        obj.add(definition, field, data_arr)
         return obj
 
     def clear(self):
         """Remove all parts from the block."""
         self._parts = []
+        self._first_idx = 0
         self._last_idx = -1
+        self._kernel = None
 
     def __iter__(self):
         return iter(self._parts)
@@ -97,9 +129,9 @@ class ContiguousDataBlock:
         if self._last_idx == -1:
             return True
         start_idx = definition.index
-        return start_idx >= self.first_index and start_idx <= self._last_idx + 1
+        return self._first_idx <= start_idx <= self._last_idx + 1
 
-    def add(self, definition, field):
+    def add(self, definition, field, data_arr=None):
         """
         Add a subsequent part to this contiguous data block.
         We assume that the (valid) parts are added in order.
@@ -109,9 +141,14 @@ class ContiguousDataBlock:
         Args:
             definition (LuxtronikDefinition): Definition to add.
             field (Base): Associated field object.
+            data_arr (list[int] | None): Optional, already determined register values to write.
         """
-        self._parts.append(ContiguousDataPart(definition, field))
-        self._last_idx = max(self._last_idx, definition.index + definition.count - 1)
+        index = definition.index
+        if not self._parts:
+            self._first_idx = index
+        self._parts.append(ContiguousDataPart(definition, field, data_arr))
+        self._last_idx = max(self._last_idx, index + definition.count - 1)
+        self._kernel = None
 
     @property
     def first_index(self):
@@ -122,7 +159,7 @@ class ContiguousDataBlock:
         Returns:
             int: index of the first part or 0 if empty.
         """
-        return self._parts[0].index if self._parts else 0
+        return self._first_idx
 
     @property
     def first_addr(self):
@@ -143,15 +180,17 @@ class ContiguousDataBlock:
         Returns:
             int: number of registers or 0 if block is empty.
         """
-        return self._last_idx - self.first_index + 1 if self._parts else 0
+        return self._last_idx - self._first_idx + 1 if self._parts else 0
 
-    def integrate_data(self, data_arr):
+    def integrate_data(self, data_arr, changes=None):
         """
         Integrate an array of registers (e.g. the read data)
         into the raw values of the corresponding fields.
 
         Args:
             data_arr (list[int] | None): A list of register values.
+            changes (list | None): If a list is provided, a
+                `(definition, field, old_raw)` tuple is appended for every changed field.
 
         Returns:
             bool: True if data length matches `overall_count`
@@ -168,13 +207,63 @@ class ContiguousDataBlock:
             )
             return False
 
-        first = self.first_index
-        for part in self._parts:
-            data_offset = part.index - first
-            part.integrate_data(data_arr, LUXTRONIK_SHI_REGISTER_BIT_SIZE, data_offset)
+        chunks, steps = self._get_kernel()
+        packed = iter(pack_all_values(data_arr, chunks, LUXTRONIK_SHI_REGISTER_BIT_SIZE)
+            if chunks else ())
+
+        for definition, field, start, end, multi, not_available, bit_offset, bit_mask in steps:
+            if multi:
+                raw = next(packed)
+            elif end - start == 1:
+                raw = data_arr[start]
+            else:
+                raw = data_arr[start:end]
+            if not_available is not None and raw == not_available:
+                raw = None
+            if bit_offset and isinstance(raw, int):
+                raw = (raw >> bit_offset) & bit_mask
+            if changes is None:
+                field.raw = raw
+            else:
+                old_raw = field.raw
+                field.raw = raw
+                if field.raw != old_raw:
+                    changes.append((definition, field, old_raw))
 
         return True
 
+    def _get_kernel(self):
+        """
+        Return the integration kernel of this block. It contains everything
+        `integrate_data` needs per part, which is fixed as long as no parts
+        are added. The kernel is compiled on first use.
+
+        Returns:
+            tuple[list, list]:
+                - (offset, count) of all parts whose registers are packed into one value
+                - per part: (definition, field, start, end, multi, not_available,
+                  bit_offset, bit_mask)
+        """
+        if self._kernel is None:
+            first = self._first_idx
+            chunks = []
+            steps = []
+            for part in self._parts:
+                definition = part.definition
+                field = part.field
+                start = part.index - first
+                count = part.count
+                multi = count != 1 and field.concatenate_multiple_data_chunks
+                if multi:
+                    chunks.append((start, count))
+                # same rules as in `collections.integrate_data`
+                bit_offset = definition.bit_offset if definition.num_bits else None
+                bit_mask = (1 << definition.num_bits) - 1 if bit_offset else 0
+                steps.append((definition, field, start, start + count, multi,
+                    definition.not_available_raw, bit_offset, bit_mask))
+            self._kernel = (chunks, steps)
+        return self._kernel
+
     def get_data_arr(self):
         """
         Build a data array to write from parts' fields.
@@ -186,6 +275,30 @@ class ContiguousDataBlock:
         if not self._parts:
             return None
 
+        # Usually, the parts follow each other without gaps and overlaps.
+        # In this case, the data array can be assembled directly.
+        total = self.overall_count
+        first = self._first_idx
+        data_arr = []
+        for part in self._parts:
+            data = part.get_data_arr(LUXTRONIK_SHI_REGISTER_BIT_SIZE)
+            if data is None or None in data or part.index - first != len(data_arr):
+                break
+            data_arr.extend(data)
+        else:
+            if len(data_arr) == total:
+                return data_arr
+
+        return self._assemble_data_arr()
+
+    def _assemble_data_arr(self):
+        """
+        Build a data array to write from parts' fields slot by slot,
+        with checks for overlaps and missing elements.
+
+        Returns:
+            list[int] | None: List of register values when valid, otherwise None.
+        """
         total = self.overall_count
         data_arr = [None] * total
         first = self.first_index
@@ -279,7 +392,7 @@ class ContiguousDataBlockList:
     def read_not_write(self):
         return self._read_not_write
 
-    def collect(self, definition, field):
+    def collect(self, definition, field, data_arr=None):
         """
         Add a part into the appropriate contiguous block.
         Assumes parts arrive in sorted order by index. (see LuxtronikDefinitionsList).
@@ -287,6 +400,7 @@ class ContiguousDataBlockList:
         Args:
             definition (LuxtronikDefinition): Definition to add.
             field (Base): Associated field object.
+            data_arr (list[int] | None): Optional, already determined register values to write.
         """
         # Start a new block if none exists or the last block cannot accept this definition
         if not self._blocks or not self._can_add or not self._blocks[-1].can_add(definition):
@@ -294,7 +408,7 @@ class ContiguousDataBlockList:
         self._can_add = True
 
         # Append the (new) part to the last block
-        self._blocks[-1].add(definition, field)
+        self._blocks[-1].add(definition, field, data_arr)
 
     def append(self, block):
         """
@@ -305,13 +419,14 @@ class ContiguousDataBlockList:
         """
         self._blocks.append(block)
 
-    def append_single(self, definition, field):
+    def append_single(self, definition, field, data_arr=None):
         """
         Create a new block with a single part and append it.
 
         Args:
             definition (LuxtronikDefinition): Definition to add.
             field (Base): Associated field object.
+            data_arr (list[int] | None): Optional, already determined register values to write.
         """
-        self._blocks.append(ContiguousDataBlock.create_and_add(definition, field))
+        self._blocks.append(ContiguousDataBlock.create_and_add(definition, field, data_arr))
         self._can_add = False
\ No newline at end of file
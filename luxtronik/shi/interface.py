@@ -5,6 +5,7 @@ import logging
 from luxtronik.common import classproperty, version_in_range
 from luxtronik.collections import get_data_arr
 from luxtronik.datatypes import Base
+from luxtronik.instrumentation import create_span
 from luxtronik.definitions import (
     LuxtronikDefinition,
     LuxtronikDefinitionsList,
@@ -107,7 +108,7 @@ class LuxtronikSmartHomeInterface:
     which is cleared afterwards.
     """
 
-    def __init__(self, interface, version=LUXTRONIK_LATEST_SHI_VERSION):
+    def __init__(self, interface, version=LUXTRONIK_LATEST_SHI_VERSION, instrumentation=None):
         """
         Initialize the smart home interface.
 
@@ -118,10 +119,17 @@ class LuxtronikSmartHomeInterface:
                 If None is passed, all available fields are added.
                 Additionally, the version is used to performed some consistency checks.
                 (default: LUXTRONIK_LATEST_SHI_VERSION)
+            instrumentation (Instrumentation | None): Optional receiver
+                of the timing of each phase. Not passed to the underlying interface.
         """
         self._interface = interface
         self._version = version
+        self._instrumentation = instrumentation
         self._blocks_list = []
+        # Collected data vectors with change observers
+        self._observed_vectors = []
+        # Fields that could not be read by the last send
+        self._failed_fields = []
         self._filtered_holdings = LuxtronikDefinitionsList.filtered(HOLDINGS_DEFINITIONS, version)
         self._filtered_inputs = LuxtronikDefinitionsList.filtered(INPUTS_DEFINITIONS, version)
 
@@ -129,8 +137,29 @@ class LuxtronikSmartHomeInterface:
     def version(self):
         return self._version
 
+    @property
+    def failed_fields(self):
+        """
+        Return the fields that could not be read by the last `send()`,
+        e.g. because the telegram of their block was rejected.
+        """
+        return self._failed_fields
+
+    @property
+    def instrumentation(self):
+        return self._instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation):
+        """Attach an `Instrumentation` to time the phases. Pass None to disable it."""
+        self._instrumentation = instrumentation
+
 # Helper methods ##############################################################
 
+    def _span(self, name, **attributes):
+        host = getattr(self._interface, "host", None)
+        return create_span(self._instrumentation, name, host, **attributes)
+
     def _get_definition(self, def_name_or_idx, definitions):
         """
         Retrieve a definition by name or index that is supported by the controller.
@@ -144,6 +173,9 @@ class LuxtronikSmartHomeInterface:
         """
         if isinstance(def_name_or_idx, LuxtronikDefinition):
             definition = def_name_or_idx
+        elif type(def_name_or_idx) is int:
+            # Register indices are resolved via the dense address table
+            definition = definitions.columns.get_by_addr(definitions.offset + def_name_or_idx)
         else:
             definition = definitions.get(def_name_or_idx)
         if definition is None:
@@ -310,11 +342,17 @@ class LuxtronikSmartHomeInterface:
                     telegrams_data.append((block, telegram, blocks.read_not_write))
         return telegrams_data
 
-    def _integrate_data(self, telegrams_data):
+    def _integrate_data(self, telegrams_data, changes=None, failed=None):
         """
         Integrate the read data from telegrams back into the corresponding blocks.
         '_create_telegrams' must be called up beforehand.
 
+        Args:
+            changes (list | None): If a list is provided, a
+                `(definition, field, old_raw)` tuple is appended for every changed field.
+            failed (list | None): If a list is provided, the fields
+                of all blocks that could not be integrated are appended.
+
         Returns:
             bool: True if all data could be integrated.
         """
@@ -323,9 +361,11 @@ class LuxtronikSmartHomeInterface:
             if (read_not_write == READ):
                 # integrate_data() also resets the write_pending flag,
                 # intentionally only for read fields
-                valid = block.integrate_data(telegram.data)
+                valid = block.integrate_data(telegram.data, changes)
                 if not valid:
                     LOGGER.debug(f"Failed to integrate read data into {block}")
+                    if failed is not None:
+                        failed.extend(part.field for part in block)
                 success &= valid
             else:
                 # Reset write_pending flag
@@ -370,15 +410,17 @@ class LuxtronikSmartHomeInterface:
                 Field to be read.
 
         Returns:
-            bool: True if all checks have been passed, False otherwise.
+            list[int] | None: The register values to write if all checks
+                have been passed, None otherwise. They are handed over to the
+                write blocks, so the field's data is not unpacked again.
         """
         # Skip non-supported fields
         if not version_in_range(self._version, definition.since, definition.until):
-            return False
+            return None
 
         # Skip fields that do not carry user-data and not data is provided
         if not field.write_pending and data is None:
-            return False
+            return None
 
         # Override the field's data with the provided data
         if data is not None:
@@ -386,15 +428,16 @@ class LuxtronikSmartHomeInterface:
 
         # Abort if field is not writeable or the value is invalid
         if not field.check_for_write(safe):
-            return False
+            return None
 
         # Abort if insufficient data is provided
-        if not get_data_arr(definition, field, LUXTRONIK_SHI_REGISTER_BIT_SIZE):
+        data_arr = get_data_arr(definition, field, LUXTRONIK_SHI_REGISTER_BIT_SIZE)
+        if not data_arr:
             LOGGER.warning("Data error / insufficient data provided: " \
                 + f"name={definition.name}, data={field.raw}")
-            return False
+            return None
 
-        return True
+        return data_arr
 
     def _collect_field(self, blocks_list, def_field_name_or_idx, definitions, \
         read_not_write, safe, data):
@@ -434,13 +477,16 @@ class LuxtronikSmartHomeInterface:
         if definition is None:
             return None
 
+        data_arr = None
         if (read_not_write == READ) and not self._prepare_read_field(definition, field):
             return None
-        if (read_not_write == WRITE) and not self._prepare_write_field(definition, field, safe, data):
-            return None
+        if (read_not_write == WRITE):
+            data_arr = self._prepare_write_field(definition, field, safe, data)
+            if data_arr is None:
+                return None
 
         blocks = ContiguousDataBlockList(definitions.name, read_not_write)
-        blocks.append_single(definition, field)
+        blocks.append_single(definition, field, data_arr)
         blocks_list.append(blocks)
         return field
 
@@ -459,6 +505,8 @@ class LuxtronikSmartHomeInterface:
         """
         if not isinstance(data_vector, DataVectorSmartHome):
             return
+        if (read_not_write == READ) and data_vector.observed:
+            self._observed_vectors.append(data_vector)
 
         if self._version is None:
             # Trial-and-error mode: Add a block for every field
@@ -470,8 +518,9 @@ class LuxtronikSmartHomeInterface:
                     blocks.append_single(definition, field)
             else:
                 for definition, field in data_vector.data.items():
-                    if self._prepare_write_field(definition, field, data_vector.safe, None):
-                        blocks.append_single(definition, field)
+                    data_arr = self._prepare_write_field(definition, field, data_vector.safe, None)
+                    if data_arr is not None:
+                        blocks.append_single(definition, field, data_arr)
             if len(blocks) > 0:
                 blocks_list.append(blocks)
         else:
@@ -484,12 +533,13 @@ class LuxtronikSmartHomeInterface:
                 blocks = ContiguousDataBlockList(definitions.name, read_not_write)
                 # Organize data into contiguous blocks
                 for definition, field in data_vector.data.items():
-                    if self._prepare_write_field(definition, field, data_vector.safe, None):
-                        blocks.collect(definition, field)
+                    data_arr = self._prepare_write_field(definition, field, data_vector.safe, None)
+                    if data_arr is not None:
+                        blocks.collect(definition, field, data_arr)
                 if len(blocks) > 0:
                     blocks_list.append(blocks)
 
-    def _send_and_integrate(self, blocks_list):
+    def _send_and_integrate(self, blocks_list, changes=None, failed=None):
         """
         Generate all necessary telegrams and then send them.
         Subsequently, the retrieved data is integrated into the provided fields.
@@ -497,19 +547,47 @@ class LuxtronikSmartHomeInterface:
         Args:
             blocks_list (list[ContiguousDataBlockList]):
                 List of contiguous block lists.
+            changes (list | None): If a list is provided, a
+                `(definition, field, old_raw)` tuple is appended for every changed field.
+            failed (list | None): If a list is provided, the fields
+                that could not be read are appended.
 
         Returns:
             bool: True if no errors occurred, otherwise False.
         """
         # Convert the list of contiguous blocks to telegrams
-        telegrams_data = self._create_telegrams(blocks_list)
+        with self._span("shi.prepare") as span:
+            telegrams_data = self._create_telegrams(blocks_list)
+            span.count("telegrams", len(telegrams_data))
         # Send all telegrams. The retrieved data is returned within the telegrams
         telegrams = [data[1] for data in telegrams_data]
         success = self._interface.send(telegrams)
         # Transfer the data from the telegrams into the fields
-        success &= self._integrate_data(telegrams_data)
+        with self._span("shi.integrate") as span:
+            success &= self._integrate_data(telegrams_data, changes, failed)
+            span.count("telegrams", len(telegrams_data))
         return success
 
+    def _notify_changes(self, observed_vectors, changes):
+        """
+        Dispatch the detected changes to the observers of the collected data vectors.
+        Data vectors which share their observers are notified only once.
+
+        Args:
+            observed_vectors (list[DataVectorSmartHome]): Collected data vectors with observers.
+            changes (list[tuple[LuxtronikDefinition, Base, Any]]): All detected changes.
+        """
+        registries = {}
+        for data_vector in observed_vectors:
+            lookup = data_vector.data._field_lookup
+            _, vector_changes = registries.setdefault(
+                id(data_vector._change_callbacks), (data_vector, {}))
+            for change in changes:
+                if lookup.get(change[0]) is change[1]:
+                    vector_changes[id(change[1])] = change
+        for data_vector, vector_changes in registries.values():
+            data_vector.notify_changes(list(vector_changes.values()))
+
 
 # Collect and send methods ####################################################
 
@@ -678,8 +756,15 @@ class LuxtronikSmartHomeInterface:
         Returns:
             bool: True if no errors occurred, otherwise False.
         """
-        success = self._send_and_integrate(self._blocks_list)
+        observed_vectors = self._observed_vectors
+        changes = [] if observed_vectors else None
+        failed = []
+        success = self._send_and_integrate(self._blocks_list, changes, failed)
+        self._failed_fields = failed
         self._blocks_list = []
+        self._observed_vectors = []
+        if changes:
+            self._notify_changes(observed_vectors, changes)
         return success
 
 
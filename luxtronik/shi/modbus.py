@@ -3,7 +3,12 @@ import logging
 import time
 from pyModbusTCP.client import ModbusClient
 
-from luxtronik.common import get_host_lock
+from luxtronik.common import (
+    LUXTRONIK_LOCK_PRIORITY_READ,
+    LUXTRONIK_LOCK_PRIORITY_WRITE,
+    get_host_lock,
+)
+from luxtronik.instrumentation import create_span, timed_lock
 from luxtronik.shi.constants import (
     LUXTRONIK_DEFAULT_MODBUS_PORT,
     LUXTRONIK_DEFAULT_MODBUS_TIMEOUT,
@@ -37,7 +42,8 @@ class LuxtronikModbusTcpInterface:
         self,
         host,
         port=LUXTRONIK_DEFAULT_MODBUS_PORT,
-        timeout=LUXTRONIK_DEFAULT_MODBUS_TIMEOUT
+        timeout=LUXTRONIK_DEFAULT_MODBUS_TIMEOUT,
+        instrumentation=None
     ):
         """
         Initialize the Modbus TCP interface for a Luxtronik host.
@@ -48,9 +54,13 @@ class LuxtronikModbusTcpInterface:
                   (default: LUXTRONIK_DEFAULT_MODBUS_PORT).
             timeout (float): Timeout in seconds for communication
                      (default: LUXTRONIK_DEFAULT_MODBUS_TIMEOUT).
+            instrumentation (Instrumentation | None): Optional receiver
+                of the timing of each phase and telegram.
         """
         # Acquire a lock object for this host to ensure thread safety
         self._lock = get_host_lock(host)
+        self._host = host
+        self._instrumentation = instrumentation
 
         # Create the Modbus client (connection is not opened/closed automatically)
         self._client = ModbusClient(
@@ -65,6 +75,22 @@ class LuxtronikModbusTcpInterface:
     def lock(self):
         return self._lock
 
+    @property
+    def host(self):
+        return self._host
+
+    @property
+    def instrumentation(self):
+        return self._instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation):
+        """Attach an `Instrumentation` to time the phases. Pass None to disable it."""
+        self._instrumentation = instrumentation
+
+    def _span(self, name, **attributes):
+        return create_span(self._instrumentation, name, self._host, **attributes)
+
 # Connection methods ##########################################################
 
     def _connect(self):
@@ -79,7 +105,8 @@ class LuxtronikModbusTcpInterface:
         if self._client.is_open:
             return True
 
-        self._client.open()
+        with self._span("modbus.connect"):
+            self._client.open()
 
         if not self._client.is_open:
             LOGGER.error("Modbus connection failed, client did not open: " \
@@ -298,9 +325,15 @@ class LuxtronikModbusTcpInterface:
             LOGGER.warning("No data requested/provided. Abort operation.")
             return False
 
+        # Writes are served before waiting reads
+        if any(isinstance(t, LuxtronikSmartHomeWriteHoldingsTelegram) for t in _telegrams):
+            priority = LUXTRONIK_LOCK_PRIORITY_WRITE
+        else:
+            priority = LUXTRONIK_LOCK_PRIORITY_READ
+
         # Acquire lock, connect and read/write data. Disconnect afterwards.
         success = False
-        with self._lock:
+        with timed_lock(self._lock, self._instrumentation, "modbus.lock", self._host, priority):
             if self._connect():
                 success = True
                 was_write = False
@@ -312,12 +345,15 @@ class LuxtronikModbusTcpInterface:
                     if isinstance(t, LuxtronikSmartHomeReadHoldingsTelegram):
                         reg_cb = self._client.read_holding_registers
                         is_write = False
+                        name = "modbus.read_holdings"
                     elif isinstance(t, LuxtronikSmartHomeReadInputsTelegram):
                         reg_cb = self._client.read_input_registers
                         is_write = False
+                        name = "modbus.read_inputs"
                     elif isinstance(t, LuxtronikSmartHomeWriteHoldingsTelegram):
                         reg_cb = self._client.write_multiple_registers
                         is_write = True
+                        name = "modbus.write_holdings"
                     else:
                         # this should never happen
                         assert False, "Telegram type not supported"
@@ -325,13 +361,18 @@ class LuxtronikModbusTcpInterface:
                     # Wait a short time when switching from write to read
                     if not is_write and was_write:
                         # Allow the heat pump to process the changes
-                        time.sleep(LUXTRONIK_WAIT_TIME_AFTER_HOLDING_WRITE)
+                        with self._span("modbus.write_wait"):
+                            time.sleep(LUXTRONIK_WAIT_TIME_AFTER_HOLDING_WRITE)
 
                     # Perform read or write operation
-                    if is_write:
-                        valid = self._write_register(reg_cb, t)
-                    else:
-                        valid = self._read_register(reg_cb, t)
+                    with self._span(name, addr=t.addr) as span:
+                        if is_write:
+                            valid = self._write_register(reg_cb, t)
+                        else:
+                            valid = self._read_register(reg_cb, t)
+                        span.count("registers", t.count)
+                        if not valid:
+                            span.count("failures", 1)
 
                     success &= valid
                     was_write = is_write
@@ -340,6 +381,7 @@ class LuxtronikModbusTcpInterface:
                 # Wait a short time after a write
                 if was_write:
                     # Allow the heat pump to process the changes
-                    time.sleep(LUXTRONIK_WAIT_TIME_AFTER_HOLDING_WRITE)
+                    with self._span("modbus.write_wait"):
+                        time.sleep(LUXTRONIK_WAIT_TIME_AFTER_HOLDING_WRITE)
 
         return success
\ No newline at end of file
@@ -115,6 +115,26 @@ class DataVectorSmartHome(DataVector):
             return field
         return None
 
+    def add_many(self, defs_fields_names_or_idxs):
+        """
+        Adds multiple additional version-dependent fields to this data vector at once.
+        Behaves like `add`, but the fields are sorted only once.
+
+        Args:
+            defs_fields_names_or_idxs (Iterable[LuxtronikDefinition | Base | str | int]):
+                Fields to add. Either by definition, name or index, or the fields itself.
+
+        Returns:
+            list[Base | None]: For each entry the added field object or the
+                existing field, otherwise None.
+        """
+        num_fields = len(self._data)
+        fields = self._add_many(defs_fields_names_or_idxs,
+            lambda definition: version_in_range(self._version, definition.since, definition.until))
+        if len(self._data) != num_fields:
+            self._read_blocks_up_to_date = False
+        return fields
+
     def update_read_blocks(self):
         """
         (Re-)Create the data block list (`ContiguousDataBlockList`) for read-operations.
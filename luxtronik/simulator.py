@@ -0,0 +1,384 @@
+"""
+Simulate a luxtronik controller on the local machine.
+
+The simulator serves the configuration interface protocol (commands 3002 - 3005)
+and Modbus TCP (function codes 3, 4, 6 and 16) via real TCP sockets,
+so the complete client stack including the connection setup can be tested.
+The registers are derived from the definitions lists.
+"""
+
+import logging
+import random
+import socketserver
+import struct
+import threading
+import time
+
+from luxtronik.cfi import Calculations, Parameters, Visibilities
+from luxtronik.cfi.constants import (
+    LUXTRONIK_DEFAULT_PORT,
+    LUXTRONIK_PARAMETERS_WRITE,
+    LUXTRONIK_PARAMETERS_READ,
+    LUXTRONIK_CALCULATIONS_READ,
+    LUXTRONIK_VISIBILITIES_READ,
+)
+from luxtronik.datatypes import FullVersion, MajorMinorVersion
+from luxtronik.definitions import LuxtronikDefinitionsList
+from luxtronik.shi.constants import LUXTRONIK_DEFAULT_MODBUS_PORT, LUXTRONIK_LATEST_SHI_VERSION
+from luxtronik.shi.holdings import HOLDINGS_DEFINITIONS
+from luxtronik.shi.inputs import INPUTS_DEFINITIONS
+
+
+LOGGER = logging.getLogger(__name__)
+
+LUXTRONIK_SIMULATOR_DEFAULT_HOST = "127.0.0.1"
+# Interval in seconds in which the servers check for a shutdown request
+LUXTRONIK_SIMULATOR_POLL_INTERVAL = 0.05
+
+MODBUS_READ_HOLDINGS = 3
+MODBUS_READ_INPUTS = 4
+MODBUS_WRITE_SINGLE = 6
+MODBUS_WRITE_MULTIPLE = 16
+
+MODBUS_EXCEPTION_ILLEGAL_FUNCTION = 1
+MODBUS_EXCEPTION_ILLEGAL_ADDRESS = 2
+MODBUS_EXCEPTION_ILLEGAL_VALUE = 3
+
+_MODBUS_HEADER = struct.Struct(">HHHB")
+
+
+def _initial_value(index):
+    """Deterministic initial register value, so reads return something meaningful."""
+    return (index * 7) % 100
+
+def _cfi_size(definitions):
+    return max((d.index + d.count for d in definitions), default=0)
+
+
+###############################################################################
+# Simulator state
+###############################################################################
+
+class SimulatorState:
+    """
+    Register contents of the simulated controller. Thread-safe.
+
+    - The configuration interface registers are plain lists.
+    - The smart home interface registers are dictionaries `addr -> value`.
+      Registers not contained do not exist (existence map), and any
+      access to them is answered with a Modbus exception.
+    """
+
+    def __init__(self, version=LUXTRONIK_LATEST_SHI_VERSION, firmware="V3.92.1"):
+        """
+        Initialize the registers from the definitions lists.
+
+        Args:
+            version (tuple[int]): Smart home interface version. Only registers
+                of fields available in this version exist.
+            firmware (str): Firmware version reported via the configuration interface.
+        """
+        self.lock = threading.Lock()
+        self.parameters = [_initial_value(i) for i in range(_cfi_size(Parameters.definitions))]
+        self.calculations = [_initial_value(i) for i in range(_cfi_size(Calculations.definitions))]
+        self.visibilities = [i % 2 for i in range(_cfi_size(Visibilities.definitions))]
+        firmware_def = Calculations.definitions.get("ID_WEB_SoftStand")
+        for offset in range(firmware_def.count):
+            char = ord(firmware[offset]) if offset < len(firmware) else 0
+            self.calculations[firmware_def.index + offset] = char
+
+        self.holdings = self._create_registers(HOLDINGS_DEFINITIONS, version)
+        self.inputs = self._create_registers(INPUTS_DEFINITIONS, version)
+        for definition in LuxtronikDefinitionsList.filtered(INPUTS_DEFINITIONS, version):
+            if definition.field_type is FullVersion:
+                for i, part in enumerate(version[:definition.count]):
+                    self.inputs[definition.addr + i] = part
+            elif definition.field_type is MajorMinorVersion:
+                self.inputs[definition.addr] = version[0] * 100 + version[1]
+
+    @staticmethod
+    def _create_registers(definitions, version):
+        registers = {}
+        for definition in LuxtronikDefinitionsList.filtered(definitions, version):
+            for addr in range(definition.addr, definition.addr + definition.count):
+                registers[addr] = _initial_value(addr)
+        return registers
+
+    def remove_registers(self, registers, addrs):
+        """
+        Remove registers from the existence map.
+
+        Args:
+            registers (str): Either "holdings" or "inputs".
+            addrs (Iterable[int]): Modbus addresses of the registers.
+        """
+        registers = getattr(self, registers)
+        with self.lock:
+            for addr in addrs:
+                registers.pop(addr, None)
+
+    def read_registers(self, registers, addr, count):
+        """Return the values of the registers, or None if any of them does not exist."""
+        registers = getattr(self, registers)
+        with self.lock:
+            try:
+                return [registers[a] for a in range(addr, addr + count)]
+            except KeyError:
+                return None
+
+    def write_registers(self, addr, values):
+        """Write holding registers. Returns False if any of them does not exist."""
+        with self.lock:
+            if any(a not in self.holdings for a in range(addr, addr + len(values))):
+                return False
+            for offset, value in enumerate(values):
+                self.holdings[addr + offset] = value
+            return True
+
+    def evolve(self, rng, count):
+        """
+        Let some values change, like a running heat pump does.
+
+        Args:
+            rng (random.Random): Random number generator.
+            count (int): Number of calculations and inputs to change.
+        """
+        with self.lock:
+            for _ in range(count):
+                if self.calculations:
+                    i = rng.randrange(len(self.calculations))
+                    self.calculations[i] = max(0, self.calculations[i] + rng.choice((-1, 1)))
+                if self.inputs:
+                    addr = rng.choice(list(self.inputs))
+                    self.inputs[addr] = max(0, min(0xFFFF, self.inputs[addr] + rng.choice((-1, 1))))
+
+
+###############################################################################
+# Request handlers
+###############################################################################
+
+def _recv_exactly(sock, count):
+    """Receive exactly `count` bytes. Returns None if the connection was closed."""
+    data = b""
+    while len(data) < count:
+        chunk = sock.recv(count - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+class _ConfigHandler(socketserver.BaseRequestHandler):
+    """Serves the configuration interface protocol on one connection."""
+
+    def handle(self):
+        simulator = self.server.simulator
+        state = simulator.state
+        while True:
+            request = _recv_exactly(self.request, 8)
+            if request is None:
+                return
+            command, index = struct.unpack(">ii", request)
+            if command == LUXTRONIK_PARAMETERS_WRITE:
+                value = _recv_exactly(self.request, 4)
+                if value is None:
+                    return
+                value = struct.unpack(">i", value)[0]
+                with state.lock:
+                    if 0 <= index < len(state.parameters):
+                        state.parameters[index] = value
+                # The controller echoes the command and the written value
+                response = struct.pack(">ii", command, value)
+            elif command == LUXTRONIK_PARAMETERS_READ:
+                with state.lock:
+                    values = list(state.parameters)
+                response = struct.pack(f">ii{len(values)}i", command, len(values), *values)
+            elif command == LUXTRONIK_CALCULATIONS_READ:
+                with state.lock:
+                    values = list(state.calculations)
+                response = struct.pack(f">iii{len(values)}i", command, 0, len(values), *values)
+            elif command == LUXTRONIK_VISIBILITIES_READ:
+                with state.lock:
+                    values = list(state.visibilities)
+                response = struct.pack(f">ii{len(values)}b", command, len(values), *values)
+            else:
+                LOGGER.warning(f"Simulator: unknown command {command}")
+                return
+            simulator.delay()
+            self.request.sendall(response)
+
+
+class _ModbusHandler(socketserver.BaseRequestHandler):
+    """Serves Modbus TCP requests on one connection."""
+
+    def handle(self):
+        simulator = self.server.simulator
+        while True:
+            header = _recv_exactly(self.request, _MODBUS_HEADER.size)
+            if header is None:
+                return
+            transaction, protocol, length, unit = _MODBUS_HEADER.unpack(header)
+            pdu = _recv_exactly(self.request, length - 1)
+            if pdu is None or not pdu:
+                return
+            response = self._process(simulator.state, pdu)
+            simulator.delay()
+            self.request.sendall(
+                _MODBUS_HEADER.pack(transaction, protocol, len(response) + 1, unit) + response)
+
+    @staticmethod
+    def _process(state, pdu):
+        """Process a single request PDU and return the response PDU."""
+        function = pdu[0]
+        try:
+            if function in (MODBUS_READ_HOLDINGS, MODBUS_READ_INPUTS):
+                addr, count = struct.unpack(">HH", pdu[1:5])
+                if not 1 <= count <= 125:
+                    return bytes([function | 0x80, MODBUS_EXCEPTION_ILLEGAL_VALUE])
+                registers = "holdings" if function == MODBUS_READ_HOLDINGS else "inputs"
+                values = state.read_registers(registers, addr, count)
+                if values is None:
+                    return bytes([function | 0x80, MODBUS_EXCEPTION_ILLEGAL_ADDRESS])
+                return struct.pack(f">BB{count}H", function, 2 * count, *values)
+            if function == MODBUS_WRITE_SINGLE:
+                addr, value = struct.unpack(">HH", pdu[1:5])
+                if not state.write_registers(addr, [value]):
+                    return bytes([function | 0x80, MODBUS_EXCEPTION_ILLEGAL_ADDRESS])
+                return pdu[:5]
+            if function == MODBUS_WRITE_MULTIPLE:
+                addr, count, _ = struct.unpack(">HHB", pdu[1:6])
+                values = list(struct.unpack(f">{count}H", pdu[6:6 + 2 * count]))
+                if not state.write_registers(addr, values):
+                    return bytes([function | 0x80, MODBUS_EXCEPTION_ILLEGAL_ADDRESS])
+                return struct.pack(">BHH", function, addr, count)
+        except struct.error:
+            return bytes([function | 0x80, MODBUS_EXCEPTION_ILLEGAL_VALUE])
+        return bytes([function | 0x80, MODBUS_EXCEPTION_ILLEGAL_FUNCTION])
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, handler, simulator):
+        self.simulator = simulator
+        super().__init__(address, handler)
+
+
+###############################################################################
+# Simulator
+###############################################################################
+
+class LuxtronikSimulator:
+    """
+    Local luxtronik controller with a configuration interface and a smart home interface.
+    """
+
+    def __init__(
+        self,
+        host=LUXTRONIK_SIMULATOR_DEFAULT_HOST,
+        port_config=LUXTRONIK_DEFAULT_PORT,
+        port_shi=LUXTRONIK_DEFAULT_MODBUS_PORT,
+        state=None,
+        latency=0.0,
+        evolve_interval=None,
+        evolve_count=10,
+        seed=None,
+    ):
+        """
+        Initialize the simulator.
+
+        Args:
+            host (str): Address to listen on.
+            port_config (int): Port of the configuration interface. Use 0 for any free port.
+            port_shi (int): Port of the smart home interface. Use 0 for any free port.
+            state (SimulatorState | None): Register contents. Created if None is provided.
+            latency (float): Delay in seconds before each response.
+            evolve_interval (float | None): If given, let values change every `evolve_interval` seconds.
+            evolve_count (int): Number of values to change each time.
+            seed (int | None): Seed for the evolving values.
+        """
+        self.state = state if state is not None else SimulatorState()
+        self.latency = latency
+        self._address = host
+        self._ports = (port_config, port_shi)
+        self._evolve_interval = evolve_interval
+        self._evolve_count = evolve_count
+        self._rng = random.Random(seed)
+        self._servers = []
+        self._threads = []
+        self._stop_event = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def host(self):
+        return self._address
+
+    @property
+    def port_config(self):
+        """Return the (bound) port of the configuration interface."""
+        return self._servers[0].server_address[1] if self._servers else self._ports[0]
+
+    @property
+    def port_shi(self):
+        """Return the (bound) port of the smart home interface."""
+        return self._servers[1].server_address[1] if self._servers else self._ports[1]
+
+    @property
+    def running(self):
+        return bool(self._servers)
+
+    def delay(self):
+        """Apply the configured latency."""
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _start_thread(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def start(self):
+        """
+        Start listening on both ports.
+
+        Returns:
+            bool: True if the simulator was started, False if it is already running.
+        """
+        if self.running:
+            LOGGER.warning("The simulator is already running.")
+            return False
+        self._stop_event.clear()
+        self._servers = [
+            _Server((self._address, self._ports[0]), _ConfigHandler, self),
+            _Server((self._address, self._ports[1]), _ModbusHandler, self),
+        ]
+        for server, name in zip(self._servers, ("cfi", "shi")):
+            self._start_thread(lambda s=server: s.serve_forever(LUXTRONIK_SIMULATOR_POLL_INTERVAL),
+                f"luxtronik-simulator-{name}")
+        if self._evolve_interval:
+            self._start_thread(self._evolve, "luxtronik-simulator-evolve")
+        LOGGER.info(f"Simulator listening on {self._address}:{self.port_config} (config) "
+            + f"and {self._address}:{self.port_shi} (modbus)")
+        return True
+
+    def _evolve(self):
+        while not self._stop_event.wait(self._evolve_interval):
+            self.state.evolve(self._rng, self._evolve_count)
+
+    def stop(self):
+        """Stop listening and wait for the server threads."""
+        self._stop_event.set()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._servers = []
+        self._threads = []
@@ -0,0 +1,443 @@
+"""
+Append-only binary log of data vector snapshots.
+
+A log file starts with `LUXTRONIK_SNAPSHOT_LOG_MAGIC`, followed by records.
+Each record consists of a header `(type, length, crc32, timestamp)`
+and a payload of `length` bytes:
+- Layout records contain the field names of all logged data vectors as JSON.
+  They are written on first use and whenever fields are added to a data vector.
+- Snapshot records contain the raw values of all fields as 64-bit integers,
+  in the order of the last layout record. Fields that span several registers
+  use `1 + count` integers: A header (-1 for an integer raw value in the next
+  slot, otherwise the length of a list raw value) followed by the values.
+
+Each snapshot (including a possibly changed layout) is written with a single
+`write` call. An incomplete record at the end of the file, e.g. due to a crash,
+is ignored by the reader.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+
+from array import array
+from bisect import bisect_right
+
+from luxtronik import LuxtronikAllData
+
+
+LOGGER = logging.getLogger(__name__)
+
+LUXTRONIK_SNAPSHOT_LOG_MAGIC = b"LUXSNAP\x01"
+LUXTRONIK_SNAPSHOT_LOG_INDEX_INTERVAL = 64
+
+RECORD_TYPE_LAYOUT = 1
+RECORD_TYPE_SNAPSHOT = 2
+
+# type, payload length, crc32 of the payload, timestamp
+_RECORD_HEADER = struct.Struct("<BIId")
+# raw value of fields without an integer raw value
+_MISSING_RAW = -(1 << 63)
+# header of multi-register fields with an integer raw value
+_INT_RAW_HEADER = -1
+
+LUXTRONIK_SNAPSHOT_LOG_VECTORS = ("parameters", "calculations", "visibilities", "holdings", "inputs")
+
+# The raw values are stored little-endian
+_SWAP_BYTES = sys.byteorder != "little"
+
+
+def _field_width(definition):
+    """Return the number of 64-bit integers used for the raw value of a field."""
+    return definition.count + 1 if definition.count > 1 else 1
+
+def _is_int64(raw):
+    return type(raw) is int and -(1 << 63) < raw < (1 << 63)
+
+def _encode_wide_raw(raw, count):
+    """Encode the raw value of a field that spans several registers."""
+    if _is_int64(raw):
+        return [_INT_RAW_HEADER, raw] + [0] * (count - 1)
+    if isinstance(raw, list) and len(raw) <= count and all(_is_int64(r) for r in raw):
+        return [len(raw)] + raw + [0] * (count - len(raw))
+    return [_MISSING_RAW] * (count + 1)
+
+def _decode_wide_raw(values):
+    header = values[0]
+    if header == _INT_RAW_HEADER:
+        return values[1]
+    if 0 <= header < len(values):
+        return list(values[1:header + 1])
+    return None
+
+def _encode_raws(fields_dict):
+    """Return the raw values of all fields as 64-bit integers."""
+    raws = []
+    for definition, field in fields_dict.pairs:
+        raw = field.raw
+        if definition.count > 1:
+            raws.extend(_encode_wide_raw(raw, definition.count))
+        else:
+            raws.append(raw if _is_int64(raw) else _MISSING_RAW)
+    arr = array("q", raws)
+    if _SWAP_BYTES:
+        arr.byteswap()
+    return arr
+
+def _decode_raws(entries, raws, offset):
+    """
+    Iterate over the raw values of a data vector.
+
+    Yields:
+        tuple[str, int, int | list[int] | None]: Name, index and raw value of each field.
+    """
+    for name, index, width in entries:
+        if width > 1:
+            raw = _decode_wide_raw(raws[offset:offset + width])
+        else:
+            raw = raws[offset]
+            raw = None if raw == _MISSING_RAW else raw
+        offset += width
+        yield name, index, raw
+
+def _pack_record(record_type, timestamp, payload):
+    header = _RECORD_HEADER.pack(record_type, len(payload), zlib.crc32(payload), timestamp)
+    return header + payload
+
+
+###############################################################################
+# Writer
+###############################################################################
+
+class SnapshotLogWriter:
+    """
+    Appends snapshots of `LuxtronikAllData` objects to a log file.
+    Can be used directly as scheduler callback via `append_tasks`.
+    """
+
+    def __init__(self, filename, vector_names=LUXTRONIK_SNAPSHOT_LOG_VECTORS):
+        """
+        Open (or create) a log file for appending.
+
+        Args:
+            filename (str): Path of the log file.
+            vector_names (Iterable[str]): Names of the data vectors to log.
+
+        Raises:
+            ValueError: If the existing file is not a snapshot log.
+        """
+        self._vector_names = [name for name in vector_names if name in LUXTRONIK_SNAPSHOT_LOG_VECTORS]
+        # unbuffered, so that every record is written by a single system call
+        self._file = open(filename, "ab", buffering=0)
+        if self._file.tell() == 0:
+            self._file.write(LUXTRONIK_SNAPSHOT_LOG_MAGIC)
+        else:
+            with open(filename, "rb") as f:
+                magic = f.read(len(LUXTRONIK_SNAPSHOT_LOG_MAGIC))
+            if magic != LUXTRONIK_SNAPSHOT_LOG_MAGIC:
+                self._file.close()
+                raise ValueError(f"'{filename}' is not a snapshot log.")
+        # data vectors and fields dictionaries of the last written layout
+        self._layout_key = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def _layout_payload(self, data):
+        """Serialize the field names, indices and widths of all logged data vectors."""
+        layout = {
+            "version": None if data.holdings.version is None else list(data.holdings.version),
+            "vectors": [
+                [name, [[pair.definition.name, pair.definition.index, _field_width(pair.definition)]
+                    for pair in getattr(data, name).data.pairs]]
+                for name in self._vector_names
+            ],
+        }
+        return json.dumps(layout, separators=(",", ":")).encode("utf-8")
+
+    def append(self, data, timestamp=None):
+        """
+        Append a snapshot of the raw values.
+
+        Args:
+            data (LuxtronikAllData): Data vector collection to log.
+            timestamp (float | None): Point in time of the snapshot.
+                Defaults to the current time.
+
+        Returns:
+            int: Number of bytes written.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        fields_dicts = [getattr(data, name).data for name in self._vector_names]
+
+        record = b""
+        # fields dictionaries only get new columns if fields are added
+        layout_key = [(fields_dict, fields_dict.columns) for fields_dict in fields_dicts]
+        last_key = self._layout_key
+        if last_key is None or any(a[0] is not b[0] or a[1] is not b[1]
+                for a, b in zip(layout_key, last_key)):
+            record += _pack_record(RECORD_TYPE_LAYOUT, timestamp, self._layout_payload(data))
+            self._layout_key = layout_key
+
+        payload = b"".join(_encode_raws(fields_dict).tobytes() for fields_dict in fields_dicts)
+        record += _pack_record(RECORD_TYPE_SNAPSHOT, timestamp, payload)
+        return self._file.write(record)
+
+    def append_tasks(self, tasks, data):
+        """Scheduler callback `callback(tasks, data)`, see `LuxtronikScheduler`."""
+        self.append(data)
+
+
+###############################################################################
+# Reader
+###############################################################################
+
+class _Layout:
+    """Parsed layout record."""
+
+    def __init__(self, payload):
+        layout = json.loads(payload.decode("utf-8"))
+        version = layout.get("version")
+        self.version = None if version is None else tuple(version)
+        # name -> (entries, first offset, end offset) of the raw values
+        self.vectors = {}
+        offset = 0
+        for name, entries in layout["vectors"]:
+            # Logs of older versions do not contain the widths
+            entries = [(entry[0], entry[1], entry[2] if len(entry) > 2 else 1) for entry in entries]
+            end = offset + sum(width for _, _, width in entries)
+            self.vectors[name] = (entries, offset, end)
+            offset = end
+        self.size = offset
+
+
+class SnapshotRecord:
+    """
+    A snapshot within the log. The payload is read (and checked) only on demand.
+    """
+
+    def __init__(self, reader, offset, timestamp, layout):
+        self._reader = reader
+        self._offset = offset
+        self.timestamp = timestamp
+        self._layout = layout
+
+    def __repr__(self):
+        return f"SnapshotRecord(timestamp={self.timestamp}, offset={self._offset})"
+
+    @property
+    def vector_names(self):
+        return list(self._layout.vectors.keys())
+
+    def _raws(self):
+        payload = self._reader._payload(self._offset)
+        if payload is None:
+            return None
+        raws = array("q")
+        raws.frombytes(payload)
+        if _SWAP_BYTES:
+            raws.byteswap()
+        if len(raws) != self._layout.size:
+            LOGGER.error(f"Snapshot at offset {self._offset} does not match its layout.")
+            return None
+        return raws
+
+    def raws(self, vector_name):
+        """
+        Return the raw values of a data vector.
+
+        Args:
+            vector_name (str): Name of the data vector, e.g. "calculations".
+
+        Returns:
+            dict[str, int | list[int] | None] | None: The raw values by field name,
+                or None if the data vector is not contained or the record is corrupted.
+        """
+        vector = self._layout.vectors.get(vector_name)
+        raws = self._raws() if vector is not None else None
+        if raws is None:
+            return None
+        entries, first, _ = vector
+        return {name: raw for name, _, raw in _decode_raws(entries, raws, first)}
+
+    def materialize(self, safe=True):
+        """
+        Create a data vector collection which contains the logged raw values.
+
+        Args:
+            safe (bool): If true, prevent fields marked as
+                not secure from being written to.
+
+        Returns:
+            LuxtronikAllData | None: The data, or None if the record is corrupted.
+        """
+        raws = self._raws()
+        if raws is None:
+            return None
+        data = LuxtronikAllData(version=self._layout.version, safe=safe)
+        for name, (entries, first, _) in self._layout.vectors.items():
+            vector = getattr(data, name)
+            unknown = []
+            for field_name, index, raw in _decode_raws(entries, raws, first):
+                field = vector.data.get(field_name)
+                if field is None:
+                    definition = vector.definitions.get(field_name)
+                    if definition is None:
+                        definition = vector.definitions.create_unknown_definition(index)
+                        field = definition.create_field()
+                        unknown.append((definition, field))
+                    else:
+                        field = vector.add(definition)
+                if field is not None and raw is not None:
+                    field.raw = raw
+            if unknown:
+                vector.data.extend_sorted(unknown)
+        return data
+
+
+class SnapshotLogReader:
+    """
+    Reads a snapshot log via `mmap`.
+
+    On opening, only the record headers are scanned to build a sparse index
+    (every `index_interval`-th snapshot). Time ranges are found by a binary
+    search over this index. The timestamps within the log are expected
+    to be non-decreasing.
+    """
+
+    def __init__(self, filename, index_interval=LUXTRONIK_SNAPSHOT_LOG_INDEX_INTERVAL):
+        """
+        Open a log file for reading.
+
+        Args:
+            filename (str): Path of the log file.
+            index_interval (int): Number of snapshots per index entry.
+
+        Raises:
+            ValueError: If the file is not a snapshot log.
+        """
+        self._index_interval = max(1, int(index_interval))
+        self._file = open(filename, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        if size < len(LUXTRONIK_SNAPSHOT_LOG_MAGIC) \
+                or self._mmap[:len(LUXTRONIK_SNAPSHOT_LOG_MAGIC)] != LUXTRONIK_SNAPSHOT_LOG_MAGIC:
+            self.close()
+            raise ValueError(f"'{filename}' is not a snapshot log.")
+        # parsed layouts by offset
+        self._layouts = {}
+        # sparse index: timestamps and (offset, layout) of every n-th snapshot
+        self._index_times = []
+        self._index = []
+        self._count = 0
+        self._first = None
+        self._last = None
+        self._scan(size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        """Return the number of snapshots."""
+        return self._count
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    @property
+    def time_range(self):
+        """Return the timestamps of the first and the last snapshot, or None if empty."""
+        return None if self._first is None else (self._first, self._last)
+
+    def _headers(self, offset):
+        """Iterate over the headers of all complete records, beginning at `offset`."""
+        size = self._size
+        header_size = _RECORD_HEADER.size
+        while offset + header_size <= size:
+            record_type, length, crc, timestamp = _RECORD_HEADER.unpack_from(self._mmap, offset)
+            if offset + header_size + length > size:
+                break
+            yield offset, record_type, timestamp
+            offset += header_size + length
+
+    def _scan(self, size):
+        self._size = size
+        end = len(LUXTRONIK_SNAPSHOT_LOG_MAGIC)
+        layout = None
+        for offset, record_type, timestamp in self._headers(end):
+            end = offset + _RECORD_HEADER.size + _RECORD_HEADER.unpack_from(self._mmap, offset)[1]
+            if record_type == RECORD_TYPE_LAYOUT:
+                payload = self._payload(offset)
+                layout = _Layout(payload) if payload is not None else None
+                self._layouts[offset] = layout
+            elif record_type == RECORD_TYPE_SNAPSHOT:
+                if self._count % self._index_interval == 0:
+                    self._index_times.append(timestamp)
+                    self._index.append((offset, layout))
+                if self._first is None:
+                    self._first = timestamp
+                self._last = timestamp
+                self._count += 1
+        if end < size:
+            LOGGER.warning(f"Ignored {size - end} bytes of an incomplete record at the end of the log.")
+        # records appended later are ignored
+        self._size = end
+
+    def _payload(self, offset):
+        """Return the payload of a record, or None if it is corrupted."""
+        _, length, crc, _ = _RECORD_HEADER.unpack_from(self._mmap, offset)
+        start = offset + _RECORD_HEADER.size
+        payload = self._mmap[start:start + length]
+        if zlib.crc32(payload) != crc:
+            LOGGER.error(f"Checksum mismatch of the record at offset {offset}.")
+            return None
+        return payload
+
+    def records(self, start=None, end=None):
+        """
+        Iterate over the snapshots within a time range.
+
+        Args:
+            start (float | None): Include snapshots not older than this point in time.
+            end (float | None): Include snapshots older than this point in time.
+
+        Yields:
+            SnapshotRecord: The snapshots in the order of the log.
+        """
+        if not self._index:
+            return
+        pos = 0 if start is None else max(0, bisect_right(self._index_times, start) - 1)
+        # Snapshots with the same timestamp may precede the indexed one
+        while start is not None and pos > 0 and self._index_times[pos] >= start:
+            pos -= 1
+        offset, layout = self._index[pos]
+        for offset, record_type, timestamp in self._headers(offset):
+            if record_type == RECORD_TYPE_LAYOUT:
+                layout = self._layouts.get(offset)
+                continue
+            if record_type != RECORD_TYPE_SNAPSHOT:
+                continue
+            if end is not None and timestamp >= end:
+                return
+            if (start is None or timestamp >= start) and layout is not None:
+                yield SnapshotRecord(self, offset, timestamp, layout)
+
+    def __iter__(self):
+        return self.records()
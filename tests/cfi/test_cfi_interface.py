@@ -1,10 +1,14 @@
 
+import threading
+from unittest import mock
+
 from luxtronik import (
   Parameters,
   Calculations,
   Visibilities,
   LuxtronikSocketInterface,
 )
+from tests.fake import fake_calculation_value, fake_create_connection
 
 
 class TestLuxtronikSocketInterface:
@@ -67,4 +71,46 @@ class TestLuxtronikSocketInterface:
         for definition, field in visibilities.data.items():
             #if definition.index > n:
             #    assert field.raw is None # no update
-            assert not field.write_pending
\ No newline at end of file
+            assert not field.write_pending
+
+    @mock.patch("socket.create_connection", fake_create_connection)
+    def test_parse_changes(self):
+        lux = LuxtronikSocketInterface('host')
+        calculations = Calculations()
+        lux.read_calculations(calculations)
+
+        batches = []
+        single = []
+        lock_free = []
+
+        def on_change(changes):
+            batches.append(changes)
+            # The lock has already been released and the connection closed
+            def try_lock():
+                acquired = lux.lock.acquire(blocking=False)
+                if acquired:
+                    lux.lock.release()
+                lock_free.append(acquired)
+            t = threading.Thread(target=try_lock)
+            t.start()
+            t.join()
+            lock_free.append(lux._socket is None)
+
+        calculations.on_any_change(on_change)
+        calculations.subscribe("ID_WEB_Temperatur_TVL", lambda *c: single.append(c))
+
+        # No changes, no notification
+        lux.read_calculations(calculations)
+        assert batches == []
+
+        calculations.get(10).raw = -1
+        calculations.get(11).raw = -2
+        lux.read_calculations(calculations)
+        assert len(batches) == 1
+        assert [(d.index, f.raw, old) for d, f, old in batches[0]] == [
+            (10, fake_calculation_value(10), -1),
+            (11, fake_calculation_value(11), -2),
+        ]
+        assert len(single) == 1
+        assert single[0][1] is calculations.get(10)
+        assert lock_free == [True, True]
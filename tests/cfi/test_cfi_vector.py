@@ -108,3 +108,21 @@ class TestDataVector:
         assert field_12 in data_vector
         assert len(data_vector) == 2
         assert field == field_12
+
+    def test_add_many(self):
+        data_vector = DataVectorTest.empty()
+
+        field_7 = Base('field_7', False)
+        fields = data_vector.add_many([9, field_7, 'field_5_all', 'foo', 9])
+        assert fields[0].name == 'field_9'
+        assert fields[1] is field_7
+        assert fields[2].name == 'field_5_all'
+        assert fields[3] is None
+        assert fields[4] is fields[0]
+        assert len(data_vector) == 3
+        assert [d.index for d in data_vector] == [5, 7, 9]
+
+        # Add a field in front of the others
+        field = data_vector.add('field_5_bit1')
+        assert [d.name for d in data_vector] == ['field_5_all', 'field_5_bit1', 'field_7', 'field_9']
+        assert field is data_vector.get('field_5_bit1')
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from luxtronik.scripts import (
+    compare_results,
+    create_results,
+    load_results,
+    percentile,
+    summarize_samples,
+)
+from luxtronik.scripts.bench import BENCH_CASES, bench, create_parser, select_cases
+
+
+class TestResults:
+
+    def test_percentile(self):
+        assert percentile([], 0.5) is None
+        assert percentile([1.0], 0.99) == 1.0
+        assert percentile([1.0, 2.0, 3.0], 0.5) == 2.0
+        assert percentile([1.0, 2.0], 0.5) == 1.5
+
+    def test_summarize(self):
+        summary = summarize_samples([0.002, 0.001], 10, "fields/s", errors=1)
+        assert summary["samples"] == 2
+        assert summary["errors"] == 1
+        assert summary["latency_ms"]["p50"] == pytest.approx(1.5)
+        assert summary["throughput"] == pytest.approx(20 / 0.003)
+        empty = summarize_samples([], 1, "fields/s")
+        assert empty["throughput"] is None
+        assert empty["latency_ms"]["p99"] is None
+
+    def test_compare(self):
+        baseline = create_results("test", {
+            "a": summarize_samples([0.001], 1, "x/s"),
+            "b": summarize_samples([0.001], 1, "x/s"),
+        })
+        current = create_results("test", {
+            "a": summarize_samples([0.0011], 1, "x/s"),
+            "b": summarize_samples([0.002], 1, "x/s", errors=1),
+            "c": summarize_samples([1.0], 1, "x/s"),
+        })
+        assert compare_results(current, baseline, 0.2)[0].startswith("b: median latency")
+        assert len(compare_results(current, baseline, 0.2)) == 3
+        assert len(compare_results(current, baseline, 0.05)) == 5
+
+    def test_load(self, tmp_path):
+        filename = tmp_path / "baseline.json"
+        assert load_results(filename) is None
+        filename.write_text(json.dumps({"format": 0}))
+        assert load_results(filename) is None
+
+
+class TestBench:
+
+    def test_select_cases(self):
+        assert select_cases(create_parser().parse_args([])) == BENCH_CASES
+        args = create_parser().parse_args(["192.168.0.1"])
+        assert "cfi_write" not in select_cases(args)
+        args = create_parser().parse_args(["192.168.0.1", "--write"])
+        assert "cfi_write" in select_cases(args)
+        with pytest.raises(ValueError):
+            select_cases(create_parser().parse_args(["--cases", "cfi_read,foo"]))
+        assert bench(["--cases", "foo"]) == 2
+
+    def test_simulator(self, tmp_path):
+        output = tmp_path / "results.json"
+        assert bench(["--iterations", "2", "--output", str(output)]) == 0
+        results = json.loads(output.read_text())
+        assert results["target"] == "simulator"
+        assert sorted(results["results"]) == sorted(BENCH_CASES)
+        for result in results["results"].values():
+            assert result["samples"] == 2
+            assert result["errors"] == 0
+
+        # Compare with an unbeatable baseline
+        for result in results["results"].values():
+            result["throughput"] *= 1000
+        output.write_text(json.dumps(results))
+        assert bench(["--iterations", "1", "--cases", "cfi_read", "--baseline", str(output)]) == 1
+
+    def test_trace(self, tmp_path):
+        trace = tmp_path / "trace.json"
+        assert bench(["--iterations", "1", "--cases", "read_all", "--trace", str(trace)]) == 0
+        names = {event["name"] for event in json.loads(trace.read_text())["traceEvents"]}
+        assert {"luxtronik.lock", "cfi.read_calculations", "modbus.read_inputs"} <= names
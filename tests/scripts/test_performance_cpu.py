@@ -0,0 +1,67 @@
+import json
+
+from luxtronik.cfi import Calculations, Parameters
+from luxtronik.shi.inputs import Inputs
+from luxtronik.scripts.performance_cpu import (
+    get_datatypes,
+    measure_add_fields,
+    measure_blocks,
+    measure_datatypes,
+    measure_definition_lookups,
+    measure_integrate_data,
+    measure_pack_values,
+    measure_parse,
+    measure_parse_unknown,
+    performance_cpu,
+)
+
+
+class TestPerformanceCpu:
+
+    def test_measure(self):
+        # It is sufficient if no exception occurs.
+        measure_add_fields(Parameters, 1)
+        measure_parse_unknown(Calculations, 10, 1)
+        measure_datatypes(10, 1)
+        measure_pack_values(10, 1)
+
+    def test_results(self):
+        results = {}
+        results.update(measure_parse(Calculations, 2))
+        results.update(measure_integrate_data(Calculations, 2))
+        results.update(measure_blocks(Inputs, 2))
+        results.update(measure_definition_lookups(Inputs.definitions, "inputs", 2))
+        assert sorted(results) == [
+            "blocks/input/collect",
+            "blocks/input/integrate_data",
+            "blocks/input/update_read_blocks",
+            "definition_lookup/inputs/by_index",
+            "definition_lookup/inputs/by_name",
+            "integrate_data/calculation",
+            "parse/calculation",
+        ]
+        for result in results.values():
+            assert result["samples"] == 2
+            assert result["throughput"] > 0
+
+    def test_datatypes(self):
+        results = measure_datatypes(10, 1)
+        assert "datatype/Celsius/from_heatpump" in results
+        assert "datatype/Celsius/to_heatpump" in results
+        assert len(results) == 2 * len(get_datatypes())
+
+    def test_cli(self, tmp_path):
+        output = tmp_path / "cpu.json"
+        argv = ["--repeat", "1", "--unknown", "10", "--values", "10"]
+        assert performance_cpu(argv + ["--output", str(output)]) == 0
+        results = json.loads(output.read_text())
+        assert results["benchmark"] == "cpu"
+        assert results["repeat"] == 1
+        assert "pack_values/pack_values" in results["results"]
+        assert performance_cpu(argv + ["--baseline", str(output), "--threshold", "1000"]) == 0
+
+    def test_get_datatypes(self):
+        names = [datatype.__name__ for datatype in get_datatypes()]
+        assert "Base" in names
+        assert "Errorcode" in names
+        assert "HeatPumpStatus" in names
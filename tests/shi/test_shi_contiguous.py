@@ -1,4 +1,7 @@
 
+import random
+
+from luxtronik.collections import integrate_data
 from luxtronik.constants import LUXTRONIK_16BIT_FUNCTION_NOT_AVAILABLE
 from luxtronik.datatypes import Base
 from luxtronik.definitions import LuxtronikDefinition
@@ -90,6 +93,16 @@ class TestContiguousDataPart:
         field_a1.raw = 7
         assert part.get_data_arr(LUXTRONIK_SHI_REGISTER_BIT_SIZE) == [7]
 
+    def test_get_cached_data(self):
+        field_a1.raw = 7
+        data_arr = [7]
+        part = ContiguousDataPart(def_a1, field_a1, data_arr)
+        assert part.get_data_arr(LUXTRONIK_SHI_REGISTER_BIT_SIZE) is data_arr
+
+        # The provided data is dropped as soon as the field changes
+        field_a1.raw = 8
+        assert part.get_data_arr(LUXTRONIK_SHI_REGISTER_BIT_SIZE) == [8]
+
     def test_integrate_data(self):
         part = ContiguousDataPart(def_a, field_a)
 
@@ -231,6 +244,46 @@ class TestContiguousDataBlock:
         valid = block.integrate_data([5, 4, 3])
         assert not valid
 
+    def test_integrate_kernel(self):
+        class Concatenated(Base):
+            concatenate_multiple_data_chunks = True
+
+        definitions = [
+            LuxtronikDefinition({'index': 0, 'count': 1, 'datatype': 'INT16'}, 'test', 0),
+            LuxtronikDefinition({'index': 0, 'count': 1, 'datatype': 'UINT16',
+                'bit_offset': 3, 'bit_count': 4}, 'test', 0),
+            LuxtronikDefinition({'index': 1, 'count': 2, 'datatype': 'UINT32'}, 'test', 0),
+            LuxtronikDefinition({'index': 1, 'count': 2, 'datatype': 'INT16'}, 'test', 0),
+            LuxtronikDefinition({'index': 3, 'count': 4, 'datatype': 'UINT64'}, 'test', 0),
+            LuxtronikDefinition({'index': 7, 'count': 1, 'datatype': ''}, 'test', 0),
+        ]
+        types = [Base, Base, Concatenated, Base, Concatenated, Base]
+
+        block = ContiguousDataBlock()
+        expected = []
+        for definition, field_type in zip(definitions, types):
+            block.add(definition, field_type('field'))
+            expected.append(field_type('expected'))
+        assert block._kernel is None
+
+        rnd = random.Random(0)
+        for _ in range(50):
+            data = [rnd.choice([0, 1, 0x7FFF, 0xFFFF, rnd.randrange(0x10000)]) for _ in range(8)]
+            assert block.integrate_data(data)
+            for part, field in zip(block, expected):
+                integrate_data(part.definition, field, data, LUXTRONIK_SHI_REGISTER_BIT_SIZE,
+                    part.index)
+                assert part.field.raw == field.raw
+        assert block._kernel is not None
+
+        # Adding a part re-compiles the kernel
+        block.add(def_a1, field_a1)
+        assert block._kernel is None
+        assert block.integrate_data([1, 2, 3, 4, 5, 6, 7, 8])
+        assert field_a1.raw == 2
+        block.clear()
+        assert block._kernel is None
+
     def test_get_data(self):
         block = ContiguousDataBlock()
 
@@ -254,6 +307,13 @@ class TestContiguousDataBlock:
 
         data_arr = block.get_data_arr()
         assert data_arr == [11, 21, 22, 23]
+        assert block._assemble_data_arr() == data_arr
+
+        # Missing data within a field
+        field_c.raw = [21, None, 23]
+        data_arr = block.get_data_arr()
+        assert data_arr is None
+        field_c.raw = [21, 22, 23]
 
         # provided data greater than overall count
         orig_last = block._last_idx
@@ -402,7 +402,7 @@ class TestLuxtronikSmartHomeInterface:
         field.raw = 5
         field.write_pending = True
         valid = self.interface._prepare_write_field(definition, field, False, None)
-        assert valid
+        assert valid == [5]
         assert field.raw == 5
 
         # supported invalid write via safe
@@ -953,6 +953,51 @@ class TestLuxtronikSmartHomeInterface:
         field = vector[105]
         assert field is None
 
+    def test_read_changes(self):
+        FakeModbus.result = True
+        vector = self.interface.create_inputs()
+        batches = []
+        vector.on_any_change(batches.append)
+
+        # A part vector with shared fields and observers is notified only once
+        part = self.interface.create_empty_inputs()
+        part.add(vector[105])
+        part.share_observers(vector)
+
+        self.interface.collect_inputs(vector)
+        self.interface.collect_inputs(part)
+        assert self.interface.send()
+        assert len(batches) == 1
+        changed = [f for _, f, _ in batches[0]]
+        assert len(changed) == len(vector)
+        assert changed.count(vector[105]) == 1
+
+        # Nothing changed
+        self.interface.read_inputs(vector)
+        assert len(batches) == 1
+        assert self.interface._observed_vectors == []
+
+    def test_failed_fields(self):
+        vector = self.interface.create_empty_inputs()
+        vector.add(0)
+        vector.add(105)
+
+        def send(telegrams):
+            # The telegram of input 105 is rejected
+            for t in telegrams:
+                t.data = [0] * t.count if t.addr != 10105 else []
+            return False
+
+        self.interface.collect_inputs(vector)
+        with patch.object(self.interface._interface, "send", side_effect=send):
+            assert not self.interface.send()
+        assert self.interface.failed_fields == [vector[105]]
+
+        FakeModbus.result = True
+        self.interface.collect_inputs(vector)
+        assert self.interface.send()
+        assert self.interface.failed_fields == []
+
     def test_read_input(self):
         FakeModbus.result = False
 
@@ -249,6 +249,37 @@ class TestDataVector:
         field = data_vector.get(2)
         assert field is None
 
+    def test_add_many(self):
+        data_vector = DataVectorTest.empty(parse_version("1.1.2"))
+        data_vector._read_blocks_up_to_date = True
+
+        # Nothing added
+        fields = data_vector.add_many([6, 7])
+        assert fields == [None, None]
+        assert len(data_vector) == 0
+        assert data_vector._read_blocks_up_to_date
+
+        # Add in reverse order, with duplicates and invalid entries
+        field_9 = Base('field_9', False)
+        fields = data_vector.add_many([field_9, 'field_9a', 7, 5, 6, 'field_5'])
+        assert fields[0] is field_9
+        assert fields[1].name == 'field_9a'
+        assert fields[2] is None
+        assert fields[3].name == 'field_5'
+        assert fields[4] is None
+        assert fields[5] is fields[3]
+        assert len(data_vector) == 3
+        assert not data_vector._read_blocks_up_to_date
+
+        # Sorted by index, same index in order of addition
+        assert [d.name for d in data_vector] == ['field_5', 'field_9', 'field_9a']
+
+        # Re-add existing
+        fields = data_vector.add_many([5, 'field_9'])
+        assert fields[0] is data_vector.get(5)
+        assert fields[1] is field_9
+        assert len(data_vector) == 3
+
     def test_iter(self):
         data_vector = DataVectorTest.empty(parse_version("1.1.2"))
         data_vector.add('field_9a')
@@ -1,11 +1,24 @@
 
+import random
+
+import pytest
+
 from luxtronik.collections import (
+    _unpack_values_loop,
     get_data_arr,
     integrate_data,
+    integrate_raw,
+    pack_all_values,
+    pack_values,
+    unpack_values,
     LuxtronikDefFieldPair,
     LuxtronikFieldsDictionary,
 )
-from luxtronik.definitions import LuxtronikDefinition, LuxtronikDefinitionsDictionary
+from luxtronik.definitions import (
+    LuxtronikDefinition,
+    LuxtronikDefinitionsColumns,
+    LuxtronikDefinitionsDictionary,
+)
 from luxtronik.datatypes import (
     Base,
     Unknown,
@@ -17,6 +30,64 @@ from luxtronik.constants import LUXTRONIK_16BIT_FUNCTION_NOT_AVAILABLE
 # Tests
 ###############################################################################
 
+def pack_values_reference(values, num_bits, reverse):
+    count = len(values)
+    mask = (1 << num_bits) - 1
+    result = 0
+    for idx, value in enumerate(values):
+        bit_index = (count - 1 - idx) if reverse else idx
+        result |= (value & mask) << (num_bits * bit_index)
+    return result
+
+
+class TestPackValues:
+
+    @pytest.mark.parametrize("num_bits", [4, 8, 12, 16, 32, 64])
+    @pytest.mark.parametrize("reverse", [True, False])
+    def test_pack_unpack(self, num_bits, reverse):
+        rnd = random.Random(num_bits)
+        for count in range(0, 12):
+            for _ in range(20):
+                # also values exceeding the chunk size or negative values
+                values = [rnd.randrange(-(1 << num_bits), 1 << (num_bits + 2)) for _ in range(count)]
+                packed = pack_values(values, num_bits, reverse)
+                assert packed == pack_values_reference(values, num_bits, reverse)
+
+                packed = rnd.randrange(-(1 << (num_bits * count + 1)), 1 << (num_bits * count + 1))
+                unpacked = unpack_values(packed, count, num_bits, reverse)
+                assert unpacked == _unpack_values_loop(packed, count, num_bits, reverse)
+
+    def test_pack_values(self):
+        assert pack_values([0x1234, 0x5678], 16) == 0x12345678
+        assert pack_values([0x1234, 0x5678], 16, False) == 0x56781234
+        assert pack_values([0x11234, -1], 16) == 0x1234FFFF
+        assert unpack_values(0x12345678, 2, 16) == [0x1234, 0x5678]
+        assert unpack_values(0x12345678, 2, 16, False) == [0x5678, 0x1234]
+        assert unpack_values(-1, 2, 16) == [0xFFFF, 0xFFFF]
+
+    @pytest.mark.parametrize("num_bits", [12, 16])
+    @pytest.mark.parametrize("reverse", [True, False])
+    def test_pack_all_values(self, num_bits, reverse):
+        values = [1, 2, 3, 4, 5, 6, 0x1FFFF]
+        chunks = [(0, 2), (1, 3), (5, 2), (6, 1), (0, 0)]
+        packed = pack_all_values(values, chunks, num_bits, reverse)
+        assert packed == [pack_values(values[o:o + c], num_bits, reverse) for o, c in chunks]
+        assert pack_all_values(values, [], num_bits, reverse) == []
+
+    def test_integrate_raw(self):
+        definition = LuxtronikDefinition({
+            "index": 0,
+            "count": 2,
+            "names": ["bar"],
+            "bit_offset": 4,
+            "bit_count": 8,
+        }, "foo", 0)
+        field = definition.create_field()
+        integrate_raw(definition, field, 0x12345678)
+        assert field.raw == 0x67
+        integrate_raw(definition, field, 0x00000AB0)
+        assert field.raw == 0xAB
+
 class TestDefinitionFieldPair:
 
     def test_init(self):
@@ -263,6 +334,51 @@ class TestLuxtronikFieldsDictionary:
         assert d.pairs[0].definition is u
         assert d.pairs[0].field is f
 
+    def test_add_sorted_order(self):
+        d = LuxtronikFieldsDictionary()
+        for index, name in [(3, "a"), (1, "b"), (3, "c"), (2, "d"), (1, "e")]:
+            u = LuxtronikDefinition({"index": index, "names": [name]}, "test", 0)
+            d.add_sorted(u, u.create_field())
+        # equal indices keep their order of addition
+        assert [pair.definition.name for pair in d.pairs] == ["b", "e", "d", "a", "c"]
+        assert d[1].name == "e"
+        assert d[3].name == "c"
+
+    def test_add_many(self):
+        d = LuxtronikFieldsDictionary()
+        defs = [LuxtronikDefinition.unknown(i, "test", 0) for i in range(4)]
+        d.add_many((u, u.create_field()) for u in defs)
+        assert [pair.definition for pair in d.pairs] == defs
+        assert all(u in d for u in defs)
+
+        # invalid definitions are skipped
+        d.add_many([(LuxtronikDefinition.unknown(-1, "test", 0), None)])
+        assert len(d) == 4
+
+    def test_extend_sorted(self):
+        d = LuxtronikFieldsDictionary()
+        defs = [LuxtronikDefinition.unknown(i, "test", 0) for i in [0, 2, 4]]
+        d.extend_sorted((u, u.create_field()) for u in defs)
+        assert [pair.definition.index for pair in d.pairs] == [0, 2, 4]
+
+        # already sorted entries behind the last one
+        defs = [LuxtronikDefinition.unknown(i, "test", 0) for i in [4, 5, 6]]
+        d.extend_sorted((u, u.create_field()) for u in defs)
+        assert [pair.definition.index for pair in d.pairs] == [0, 2, 4, 4, 5, 6]
+        assert d[4] is d.get(defs[0])
+
+        # unsorted entries
+        defs = [LuxtronikDefinition.unknown(i, "test", 0) for i in [3, 1, 3]]
+        d.extend_sorted((u, u.create_field()) for u in defs)
+        assert [pair.definition.index for pair in d.pairs] == [0, 1, 2, 3, 3, 4, 4, 5, 6]
+        assert d.pairs[3].definition is defs[0]
+        assert d.pairs[4].definition is defs[2]
+        assert list(d.columns.index) == [0, 1, 2, 3, 3, 4, 4, 5, 6]
+
+        # nothing to add
+        d.extend_sorted([])
+        assert len(d) == 9
+
     def create_instance(self):
         d = LuxtronikFieldsDictionary()
         u = LuxtronikDefinition.unknown(1, "test", 0)
@@ -310,6 +426,24 @@ class TestLuxtronikFieldsDictionary:
         assert d[f].name == "base2"
         assert 4 not in d
 
+    def test_contains_identity(self):
+        d, u, f = self.create_instance()
+
+        # other objects with the same content are not contained
+        other = LuxtronikDefinition.unknown(2, "test", 0)
+        assert other not in d
+        assert other.create_field() not in d
+
+        # a replaced field is no longer contained
+        replaced = d[u]
+        assert replaced in d
+        g = u.create_field()
+        d.add(u, g)
+        assert g in d
+        assert d[u] is g
+        assert replaced not in d
+        assert f in d
+
     def test_iter(self):
         d, _, _ = self.create_instance()
         for idx, d in enumerate(d):
@@ -362,5 +496,31 @@ class TestLuxtronikFieldsDictionary:
                 assert type(f) is Base
                 assert f.name == "base3"
 
+    def test_columns(self):
+        d, _, _ = self.create_instance()
+        columns = d.columns
+        assert d.columns is columns
+        assert list(columns.index) == [1, 2, 2, 3]
+        assert columns.definitions == [pair.definition for pair in d.pairs]
+        assert columns.field_types == [Unknown, Base]
+
+        # re-created after adding a field
+        u = LuxtronikDefinition.unknown(0, "test", 0)
+        d.add_sorted(u, u.create_field())
+        assert d.columns is not columns
+        assert list(d.columns.index) == [0, 1, 2, 2, 3]
+
+    def test_share_columns(self):
+        d, _, _ = self.create_instance()
+        columns = LuxtronikDefinitionsColumns([pair.definition for pair in d.pairs])
+        d.share_columns(columns)
+        assert d.columns is columns
+
+        # not applied if the definitions do not match
+        d, _, _ = self.create_instance()
+        d.share_columns(LuxtronikDefinitionsColumns([]))
+        assert d.columns is not columns
+        assert len(d.columns) == 4
+
     class MyTestClass:
         pass
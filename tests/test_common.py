@@ -1,14 +1,194 @@
+import gc
+import threading
+import time
+from threading import Condition
+from unittest.mock import patch
+
 import pytest
 
+from luxtronik import common
 from luxtronik.common import (
+    LUXTRONIK_LOCK_PRIORITY_WRITE,
+    HostLock,
+    get_host_lock,
+    get_host_lock_stats,
     parse_version,
     version_in_range
 )
+from luxtronik.instrumentation import timed_lock
 
 ###############################################################################
 # Tests
 ###############################################################################
 
+class TestHostLock:
+
+    def test_get_host_lock(self):
+        lock_a = get_host_lock("lock_host_a")
+        lock_b = get_host_lock("lock_host_b")
+        assert lock_a is get_host_lock("lock_host_a")
+        assert lock_a is not lock_b
+
+        # unused locks are released
+        del lock_a
+        gc.collect()
+        assert "lock_host_a" not in common._hosts_locks
+        assert "lock_host_b" in common._hosts_locks
+        assert isinstance(lock_b, HostLock)
+        assert "lock_host_b" in get_host_lock_stats()
+
+    def wait_for_waiters(self, lock, count):
+        deadline = time.monotonic() + 5
+        while lock.waiters < count and time.monotonic() < deadline:
+            time.sleep(0.001)
+        assert lock.waiters == count
+
+    def start_waiters(self, lock, priorities):
+        order = []
+        threads = []
+        queued = lock.waiters
+        for idx, priority in enumerate(priorities):
+            def worker(idx=idx, priority=priority):
+                with timed_lock(lock, None, "lock", priority=priority):
+                    order.append(idx)
+            thread = threading.Thread(target=worker)
+            thread.start()
+            threads.append(thread)
+            self.wait_for_waiters(lock, queued + idx + 1)
+        return order, threads
+
+    def test_reentrant(self):
+        lock = HostLock("host")
+        assert lock.acquire(blocking=False)
+        assert lock.acquire(blocking=False)
+        lock.release()
+        lock.release()
+        with pytest.raises(RuntimeError):
+            lock.release()
+        with lock as acquired:
+            assert acquired is lock
+            with lock:
+                pass
+        assert lock.acquisitions == 2
+        assert lock.contentions == 0
+        assert lock.wait_histogram.count == 2
+        assert lock.hold_histogram.count == 2
+        assert repr(lock)
+
+    def test_fifo(self):
+        lock = HostLock()
+        with lock:
+            order, threads = self.start_waiters(lock, [0, 0, 0, 0])
+            # A non-blocking acquire from another thread must not overtake
+            result = []
+            thread = threading.Thread(target=lambda: result.append(lock.acquire(blocking=False)))
+            thread.start()
+            thread.join()
+            assert result == [False]
+        for thread in threads:
+            thread.join()
+        assert order == [0, 1, 2, 3]
+        stats = lock.to_dict()
+        assert stats["acquisitions"] == 5
+        assert stats["contentions"] == 4
+        assert stats["max_waiters"] == 4
+        assert stats["waiters"] == 0
+        assert stats["wait"]["count"] == 5
+        assert stats["hold"]["count"] == 5
+        lock.reset_stats()
+        assert lock.acquisitions == 0
+        assert lock.wait_histogram.count == 0
+
+    def test_priority(self):
+        lock = HostLock()
+        with lock:
+            order, threads = self.start_waiters(lock, [0, 0, LUXTRONIK_LOCK_PRIORITY_WRITE, 0])
+        for thread in threads:
+            thread.join()
+        assert order == [2, 0, 1, 3]
+
+    def test_interrupted_waiter(self):
+        class Interrupt(BaseException):
+            pass
+
+        class InterruptedCondition(Condition):
+            """Raise after the first wakeup or timeout, like a signal handler."""
+            def wait(self, timeout=None):
+                super().wait(timeout)
+                if threading.current_thread().name == "interrupted":
+                    raise Interrupt()
+
+        def interrupted(timeout):
+            with pytest.raises(Interrupt):
+                lock.acquire(timeout=timeout)
+
+        lock = HostLock()
+        with patch("luxtronik.common.Condition", InterruptedCondition):
+            with lock:
+                # Interrupted while waiting: The waiter leaves the queue
+                thread = threading.Thread(target=interrupted, args=(0.01,), name="interrupted")
+                thread.start()
+                thread.join()
+                assert lock.waiters == 0
+                # Interrupted after the lock was handed over: It is passed on
+                first = threading.Thread(target=interrupted, args=(-1,), name="interrupted")
+                first.start()
+                self.wait_for_waiters(lock, 1)
+                order, threads = self.start_waiters(lock, [0])
+            first.join()
+            for thread in threads:
+                thread.join()
+        assert order == [0]
+        assert lock.waiters == 0
+        assert lock.acquire(blocking=False)
+        lock.release()
+
+    def test_timeout(self):
+        lock = HostLock()
+        result = []
+        with lock:
+            thread = threading.Thread(target=lambda: result.append(lock.acquire(timeout=0.01)))
+            thread.start()
+            thread.join()
+        assert result == [False]
+        assert lock.timeouts == 1
+        assert lock.waiters == 0
+        # The lock is still usable after the timeout
+        assert lock.acquire(timeout=0.01)
+        lock.release()
+
+    def test_condition(self):
+        lock = HostLock()
+        condition = Condition(lock)
+        ready = []
+        state = []
+
+        def notifier():
+            with condition:
+                ready.append(True)
+                condition.notify()
+
+        with lock:
+            with condition:
+                assert lock._is_owned()
+                thread = threading.Thread(target=notifier)
+                thread.start()
+                # The recursively held lock is released completely while waiting
+                assert condition.wait_for(lambda: ready, timeout=5)
+                state.append(lock._count)
+            state.append(lock._count)
+        thread.join()
+        assert state == [2, 1]
+        assert not lock._is_owned()
+        assert lock.acquire(blocking=False)
+        lock.release()
+
+        # Waiting requires the lock
+        with pytest.raises(RuntimeError):
+            condition.wait(0)
+
+
+
 class TestVersion:
 
     @pytest.mark.parametrize(
@@ -3,8 +3,11 @@
 # pylint: disable=too-few-public-methods,invalid-name,too-many-lines
 
 import pytest
+from unittest.mock import patch
 
-from luxtronik.data_vector import DataVector
+from luxtronik.data_vector import DataVector, FieldHandle, FieldHandleGroup
+from luxtronik.cfi import Calculations, Parameters, Visibilities
+from luxtronik.shi import Holdings, Inputs
 from luxtronik.datatypes import Base
 from luxtronik.definitions import LuxtronikDefinition
 
@@ -45,4 +48,127 @@ class TestDataVector:
             obsolete.get(name)
             assert not exception_expected
         except KeyError:
-            assert exception_expected
\ No newline at end of file
+            assert exception_expected
+
+
+class TestFieldHandle:
+    """Test suite for FieldHandle and FieldHandleGroup"""
+
+    @pytest.mark.parametrize("vector_type, name", [
+        (Parameters, "ID_Einst_WK_akt"),
+        (Calculations, "ID_WEB_Temperatur_TVL"),
+        (Visibilities, "ID_Visi_NieAnzeigen"),
+        (Holdings, "heating_mode"),
+        (Inputs, "heating_status"),
+    ])
+    def test_handle(self, vector_type, name):
+        handle = vector_type.handle(name)
+        assert type(handle) is FieldHandle
+        assert handle.vector_type is vector_type
+        assert handle.definition is vector_type.definitions.get(name)
+        assert handle.name == name
+        assert repr(handle)
+
+        vector = vector_type()
+        field = vector.get(name)
+        assert handle.field(vector) is field
+        assert vector.get(handle) is field
+        assert vector[handle] is field
+
+        field.raw = 1
+        assert handle.raw(vector) == 1
+        assert handle.value(vector) == field.value
+
+        # empty vectors do not contain the field
+        empty = vector_type.empty()
+        assert handle.field(empty) is None
+        assert handle.raw(empty) is None
+        assert handle.value(empty) is None
+
+    def test_handle_lookup(self):
+        definition = Calculations.definitions.get(10)
+        assert Calculations.handle(10).definition is definition
+        assert Calculations.handle("10").definition is definition
+        assert Calculations.handle(definition).definition is definition
+        assert Calculations.handle("not_existing") is None
+
+    def test_handle_obsolete(self):
+        with pytest.raises(KeyError):
+            ObsoleteDataVector.handle("baz")
+
+    def test_handle_group(self):
+        group = Calculations.handles(["ID_WEB_Temperatur_TVL", "not_existing", 11])
+        assert type(group) is FieldHandleGroup
+        assert len(group) == 3
+        assert group[1] is None
+        assert [h is not None for h in group] == [True, False, True]
+
+        vector = Calculations()
+        vector.get(10).raw = 123
+        vector.get(11).raw = 456
+        assert group.fields(vector) == [vector.get(10), None, vector.get(11)]
+        assert group.raws(vector) == [123, None, 456]
+        assert group.values(vector) == [12.3, None, 45.6]
+
+
+class TestChangeObservers:
+    """Test suite for the change observers of DataVector"""
+
+    def test_subscribe(self):
+        vector = Calculations()
+        assert not vector.observed
+        single = []
+        handle_calls = []
+        batches = []
+        assert vector.subscribe("ID_WEB_Temperatur_TVL", lambda *c: single.append(c))
+        assert vector.subscribe(Calculations.handle(11), lambda *c: handle_calls.append(c))
+        with patch("luxtronik.data_vector.LOGGER") as logger:
+            assert not vector.subscribe("not_existing", print)
+            assert logger.warning.call_count == 1
+        vector.on_any_change(batches.append)
+        assert vector.observed
+
+        tvl = vector.get(10)
+        changes = [(Calculations.definitions.get(10), tvl, None),
+            (Calculations.definitions.get(12), vector.get(12), 5)]
+        vector.notify_changes(changes)
+        assert single == [changes[0]]
+        assert handle_calls == []
+        assert batches == [changes]
+
+        # Nothing to dispatch
+        vector.notify_changes([])
+        assert len(batches) == 1
+
+    def test_unsubscribe(self):
+        vector = Calculations()
+        calls = []
+        callback = lambda *c: calls.append(c)
+        vector.subscribe(10, callback)
+        vector.on_any_change(callback)
+        assert vector.unsubscribe(callback)
+        assert not vector.unsubscribe(callback)
+        assert not vector.observed
+
+    def test_callback_error(self):
+        vector = Calculations()
+        calls = []
+        def fail(*args):
+            raise ValueError("fail")
+        vector.subscribe(10, fail)
+        vector.on_any_change(fail)
+        vector.on_any_change(calls.append)
+        with patch("luxtronik.data_vector.LOGGER") as logger:
+            vector.notify_changes([(Calculations.definitions.get(10), vector.get(10), None)])
+            assert logger.error.call_count == 2
+        assert len(calls) == 1
+
+    def test_share_observers(self):
+        vector = Inputs()
+        part = Inputs.empty()
+        part.share_observers(vector)
+        calls = []
+        vector.on_any_change(calls.append)
+        assert part.observed
+        part.notify_changes([(None, None, None)])
+        assert len(calls) == 1
@@ -126,6 +126,40 @@ class TestBase:
         a._raw = 19
         assert a.value == 19
 
+    def test_value_cache(self):
+        """Test case for the cached value"""
+
+        class Counted(Base):
+            calls = 0
+
+            @classmethod
+            def from_heatpump(cls, value):
+                cls.calls += 1
+                return value
+
+        a = Counted("counted")
+        a.raw = 20
+        assert a.value == 20
+        assert a.value == 20
+        assert Counted.calls == 1
+
+        a.raw = 21
+        assert a.value == 21
+        a._raw = 22
+        assert a.value == 22
+        a.value = 23
+        assert a.value == 23
+        a.clear(False)
+        assert a.value is None
+        assert Counted.calls == 5
+
+        # lists are not cached
+        a.raw = [1, 2]
+        a.raw.append(3)
+        assert a.value == [1, 2, 3]
+        assert a.value == [1, 2, 3]
+        assert Counted.calls == 7
+
     def test_value_setter(self):
         """Test case for the value setter"""
 
@@ -287,6 +321,44 @@ class TestSelectionBaseChild:
         assert a.to_heatpump(2) == 2
         assert a.to_heatpump("3") == 3
 
+    def test_lookup_table(self):
+        """Test cases for the reverse lookup table"""
+
+        assert SelectionBaseChild.to_heatpump("a") == 0
+        assert SelectionBaseChild._code_lookup == {"a": 0, "b": 1, "c_d": 2}
+
+        class SelectionBaseDuplicate(SelectionBase):
+            codes = {0: "a", 1: "A", 2: "b"}
+
+        # The first code wins, as before
+        assert SelectionBaseDuplicate.to_heatpump("a") == 0
+        assert SelectionBaseDuplicate.to_heatpump("b") == 2
+
+    def test_lookup_table_changed_codes(self):
+        """The tables are re-built by calling _build_tables after changing the codes"""
+
+        class SelectionBaseMutable(SelectionBase):
+            codes = {0: "a", 1: "b"}
+
+        assert SelectionBaseMutable.to_heatpump("b") == 1
+        # Replaced codes
+        SelectionBaseMutable.codes = {0: "x", 1: "a"}
+        SelectionBaseMutable._build_tables()
+        assert SelectionBaseMutable.to_heatpump("a") == 1
+        assert SelectionBaseMutable.to_heatpump("x") == 0
+        assert SelectionBaseMutable.to_heatpump("b") is None
+        assert SelectionBaseMutable.options() == ["x", "a"]
+        # Codes changed in place
+        SelectionBaseMutable.codes[2] = "new"
+        assert SelectionBaseMutable.to_heatpump("new") is None
+        SelectionBaseMutable._build_tables()
+        assert SelectionBaseMutable.to_heatpump("new") == 2
+        # Subclasses use their own table
+        class SelectionBaseSub(SelectionBaseMutable):
+            codes = {5: "a"}
+        assert SelectionBaseSub.to_heatpump("a") == 5
+        assert SelectionBaseMutable.to_heatpump("a") == 1
+
 
 class TestBitMaskBase:
     """Test suite for BitMaskBase datatype"""
@@ -383,9 +455,26 @@ class TestBitMaskBaseChild:
         assert a.to_heatpump("b-z") == 4
         assert a.to_heatpump("a-c-z") == 17
         assert a.to_heatpump("Unknown_1-b-z") == 6
+        assert a.to_heatpump("a-a-z") is None
         assert a.to_heatpump(1) is None
         assert a.to_heatpump(None) is None
 
+    def test_decode_cache(self):
+        """Test cases for the decode cache"""
+
+        class BitMaskBaseCached(BitMaskBaseChild):
+            decode_cache_size = 2
+
+        assert BitMaskBaseCached._bit_lookup["b"] == 4
+        assert BitMaskBaseCached._bit_lookup["Unknown_1"] == 2
+        assert BitMaskBaseCached.from_heatpump(5) == "a-b-z"
+        assert BitMaskBaseCached.from_heatpump(5) == "a-b-z"
+        assert BitMaskBaseCached.from_heatpump(1) == "a-z"
+        assert BitMaskBaseCached.from_heatpump(3) == "a-Unknown_1-z"
+        assert BitMaskBaseCached._decode_cache == {5: "a-b-z", 1: "a-z"}
+        # The cache of the parent class is not affected
+        assert BitMaskBaseCached._decode_cache is not BitMaskBaseChild._decode_cache
+
 
 class ScalingBaseTest(ScalingBase):
     """Class to test ScalingBase. Required because of __init_subclass__"""
@@ -0,0 +1,105 @@
+"""Test suite for decoding module"""
+
+# pylint: disable=too-few-public-methods,invalid-name
+
+import random
+from unittest.mock import patch
+
+import pytest
+
+from luxtronik.cfi import Calculations, Parameters
+from luxtronik.datatypes import (
+    Base,
+    Bool,
+    Celsius,
+    CelsiusUInt16,
+    Errorcode,
+    Pressure,
+    Timestamp,
+    Version,
+)
+from luxtronik.decoding import (
+    GROUP_BOOL,
+    GROUP_PLAIN,
+    GROUP_SCALING,
+    decode_all,
+    get_decode_group,
+    to_numpy,
+)
+from luxtronik.shi import Inputs
+
+
+class CelsiusOverridden(Celsius):
+
+    @classmethod
+    def from_heatpump(cls, value):
+        return value
+
+
+def fill_random(vector, seed=0):
+    rnd = random.Random(seed)
+    for definition, field in vector.data.pairs:
+        if rnd.random() < 0.1:
+            field.raw = None
+        elif field.concatenate_multiple_data_chunks:
+            field.raw = rnd.randrange(0, 1 << (16 * definition.count if definition.count else 32))
+        else:
+            field.raw = [rnd.randrange(0, 128) for _ in range(definition.count)]
+    return vector
+
+
+class TestDecoding:
+    """Test suite for vectorized decoding"""
+
+    def test_decode_group(self):
+        assert get_decode_group(Celsius) == (GROUP_SCALING, 0.1, 2, 32, True)
+        assert get_decode_group(CelsiusUInt16) == (GROUP_SCALING, 0.1, 2, 16, False)
+        assert get_decode_group(Pressure) == (GROUP_SCALING, 0.01, 3, 32, True)
+        assert get_decode_group(Bool) == (GROUP_BOOL,)
+        assert get_decode_group(Base) == (GROUP_PLAIN,)
+        assert get_decode_group(Errorcode) is None
+        assert get_decode_group(Timestamp) is None
+        assert get_decode_group(Version) is None
+        assert get_decode_group(CelsiusOverridden) is None
+
+    @pytest.mark.parametrize("vector_type", [Calculations, Parameters, Inputs])
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_decode_all(self, vector_type, use_numpy):
+        vector = fill_random(vector_type())
+        values = decode_all(vector, use_numpy)
+        assert list(values.keys()) == [d.name for d in vector]
+        for definition, field in vector.data.pairs:
+            assert values[definition.name] == field.value
+            assert type(values[definition.name]) is type(field.value)
+        assert vector.decode_all(use_numpy) == values
+
+    @patch("luxtronik.decoding.np", None)
+    def test_to_numpy_not_installed(self):
+        with patch("luxtronik.decoding.LOGGER") as logger:
+            assert to_numpy(Calculations()) is None
+            assert logger.error.call_count == 1
+
+    def test_to_numpy(self):
+        np = pytest.importorskip("numpy")
+
+        vector = fill_random(Calculations())
+        arr = vector.to_numpy()
+        assert arr.shape == (1,)
+        names = arr.dtype.names
+        assert "ID_WEB_Temperatur_TVL" in names
+        assert "ID_WEB_Time_VDStd_akt" in names
+        for name in names:
+            value = vector.get(name).value
+            if not isinstance(value, (int, float)):
+                assert np.isnan(arr[name][0])
+            else:
+                assert arr[name][0] == float(value)
+        for definition, field in vector.data.pairs:
+            if get_decode_group(type(field)) is None:
+                assert definition.name not in names
+
+        # multiple polls form a time series
+        series = np.concatenate([arr, to_numpy(fill_random(Calculations(), 1))])
+        assert series.shape == (2,)
+
+        assert to_numpy(Calculations.empty()).shape == (1,)
@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 from luxtronik.datatypes import Base, Unknown
 from luxtronik.definitions import (
     LuxtronikDefinition,
+    LuxtronikDefinitionsColumns,
     LuxtronikDefinitionsDictionary,
     LuxtronikDefinitionsList,
 )
@@ -197,6 +200,49 @@ class TestDefinitionsDict:
         d_out = def_dict.get(list())
         assert d_out is None
 
+    def test_lookup_variants(self):
+        def_dict = LuxtronikDefinitionsDictionary()
+        d1 = LuxtronikDefinition({'index': 5, 'names': ['Foo', 'Bar']}, 'def', 0)
+        def_dict.add(d1)
+
+        # index as int or string, with whitespace, sign or leading zeros
+        assert def_dict.get(5) is d1
+        assert def_dict.get('5') is d1
+        assert def_dict.get(' 5 ') is d1
+        assert def_dict.get('+5') is d1
+        assert def_dict.get('005') is d1
+        assert def_dict.get('-5') is None
+        assert def_dict.get('5a') is None
+
+        # names are case-insensitive
+        assert def_dict.get('Foo') is d1
+        assert def_dict.get('foo') is d1
+        assert def_dict.get('FOO') is d1
+
+        # only outdated names trigger a warning
+        with patch("luxtronik.definitions.LOGGER") as logger:
+            assert def_dict.get('Foo') is d1
+            logger.warning.assert_not_called()
+            assert def_dict.get('BAR') is d1
+            logger.warning.assert_called_once_with("'BAR' is outdated! Use 'Foo' instead.")
+
+    def test_contains_definition(self):
+        def_dict = LuxtronikDefinitionsDictionary()
+        d1 = LuxtronikDefinition({'index': 1, 'names': ['foo']}, 'def', 0)
+        d2 = LuxtronikDefinition({'index': 1, 'names': ['bar']}, 'def', 0)
+        d3 = LuxtronikDefinition({'index': 2, 'names': ['foo']}, 'def', 0)
+        def_dict.add(d1)
+        def_dict.add(d2)
+        assert d1 in def_dict
+        assert d2 in def_dict
+        assert d3 not in def_dict
+
+        # d3 covers the only name of d1
+        def_dict.add(d3)
+        assert d1 not in def_dict
+        assert d2 in def_dict
+        assert d3 in def_dict
+
 class TestDefinitionsList:
 
     def_list = [
@@ -312,6 +358,12 @@ class TestDefinitionsList:
         assert definition.since is None
         assert definition.until is None
 
+        # unknown definitions are cached
+        assert definitions.create_unknown_definition(4) is definition
+        assert definitions.create_unknown_definition(6) is not definition
+        filtered = LuxtronikDefinitionsList.filtered(definitions, (1, 0, 0, 0))
+        assert filtered.create_unknown_definition(4) is definition
+
     def test_add(self):
         definitions = LuxtronikDefinitionsList(self.def_list, 'foo', 100, '')
         assert len(definitions) == 4
@@ -355,4 +407,49 @@ class TestDefinitionsList:
     def test_repr(self):
         definitions = LuxtronikDefinitionsList(self.def_list, 'foo', 100, '')
         text = repr(definitions)
-        assert text
\ No newline at end of file
+        assert text
+
+    def test_columns(self):
+        definitions = LuxtronikDefinitionsList(self.def_list, 'foo', 100, '')
+
+        columns = definitions.columns
+        assert type(columns) is LuxtronikDefinitionsColumns
+        assert definitions.columns is columns
+        assert len(columns) == 4
+        assert list(columns.index) == [5, 7, 9, 9]
+        assert list(columns.count) == [1, 2, 1, 2]
+        assert list(columns.addr) == [105, 107, 109, 109]
+        assert list(columns.bit_offset) == [columns.NO_BIT_OFFSET] * 4
+        assert columns.definitions == list(definitions)
+        assert columns.field_types == [Base]
+        assert list(columns.type_id) == [0, 0, 0, 0]
+
+        # dense address table, last added takes precedence
+        assert columns.get_by_addr(105).name == "field_5"
+        assert columns.get_by_addr(106) is None
+        assert columns.get_by_addr(109).name == "field_9"
+        assert columns.get_by_addr(4) is None
+        assert columns.get_by_addr(1000) is None
+
+        # covered register indices, only of completely contained definitions
+        assert columns.covered(12) == bytes([0, 0, 0, 0, 0, 1, 0, 1, 1, 1, 1, 0])
+        assert columns.covered(8) == bytes([0, 0, 0, 0, 0, 1, 0, 0])
+        assert columns.covered(8) is columns.covered(8)
+
+        # re-created after adding a definition
+        definitions.add({"index": 6, "names": "baz", "type": Unknown, "bit_offset": 3})
+        columns = definitions.columns
+        assert len(columns) == 5
+        assert list(columns.index) == [5, 6, 7, 9, 9]
+        assert list(columns.bit_offset)[1] == 3
+        assert columns.definitions[1].name == "baz"
+        assert columns.field_types == [Base, Unknown]
+        assert list(columns.type_id) == [0, 1, 0, 0, 0]
+        assert columns.get_by_addr(106).name == "baz"
+
+    def test_columns_empty(self):
+        columns = LuxtronikDefinitionsColumns([])
+        assert len(columns) == 0
+        assert list(columns.index) == []
+        assert columns.get_by_addr(0) is None
+        assert columns.covered(3) == bytes(3)
@@ -0,0 +1,92 @@
+"""Test suite for faultproxy module"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from luxtronik.cfi import LuxtronikSocketInterface
+from luxtronik.faultproxy import FaultProfile, FaultProxy
+from luxtronik.shi.modbus import LuxtronikModbusTcpInterface
+from luxtronik.simulator import LuxtronikSimulator
+
+
+@pytest.fixture(scope="module")
+def simulator():
+    with LuxtronikSimulator(port_config=0, port_shi=0) as sim:
+        yield sim
+
+
+def cfi_proxy(simulator, profile):
+    return FaultProxy(simulator.host, simulator.port_config, profile)
+
+def shi_proxy(simulator, profile):
+    return FaultProxy(simulator.host, simulator.port_shi, profile, modbus=True)
+
+
+class TestFaultProfile:
+
+    def test_init(self):
+        with pytest.raises(ValueError):
+            FaultProfile(fragment_size=0)
+        profile = FaultProfile(delay=0.1, jitter=0.1, seed=1)
+        assert all(0.1 <= profile._get_delay() <= 0.2 for _ in range(10))
+        assert not profile._chance(0.0)
+        assert profile._chance(1.0)
+
+
+class TestFaultProxy:
+
+    def test_passthrough(self, simulator):
+        with cfi_proxy(simulator, None) as proxy:
+            interface = LuxtronikSocketInterface(proxy.host, proxy.port)
+            calculations = interface.read_calculations()
+            assert calculations.get_firmware_version() == "V3.92.1"
+            assert proxy.stats["connections"] == 1
+            assert proxy.stats["bytes"] > 0
+
+    def test_fragmentation(self, simulator):
+        with cfi_proxy(simulator, FaultProfile(fragment_size=3)) as proxy:
+            interface = LuxtronikSocketInterface(proxy.host, proxy.port)
+            data = interface.read()
+            assert data.calculations.get_firmware_version() == "V3.92.1"
+            assert data.parameters.get(1).raw == simulator.state.parameters[1]
+
+    def test_delay_and_stall(self, simulator):
+        profile = FaultProfile(delay=0.02, stall_probability=1.0, stall_duration=0.03)
+        with shi_proxy(simulator, profile) as proxy:
+            modbus = LuxtronikModbusTcpInterface(proxy.host, proxy.port)
+            start = time.perf_counter()
+            assert modbus.read_inputs(10400, 3) == [3, 92, 1]
+            assert time.perf_counter() - start >= 0.05
+            assert proxy.stats["stalls"] >= 1
+
+    def test_reset(self, simulator):
+        with cfi_proxy(simulator, FaultProfile(reset_probability=1.0)) as proxy:
+            interface = LuxtronikSocketInterface(proxy.host, proxy.port)
+            with patch("luxtronik.cfi.interface.LOGGER") as logger:
+                assert interface.read_calculations() is None
+                assert logger.error.call_count >= 1
+            assert proxy.stats["resets"] == 1
+
+            # Recovery with the next connection
+            proxy.profile.reset_probability = 0.0
+            assert interface.read_calculations() is not None
+
+    def test_modbus_exception(self, simulator):
+        with shi_proxy(simulator, FaultProfile(modbus_exception_probability=1.0)) as proxy:
+            modbus = LuxtronikModbusTcpInterface(proxy.host, proxy.port)
+            with patch("luxtronik.shi.modbus.LOGGER"):
+                assert modbus.read_inputs(10400, 3) is None
+            assert proxy.stats["exceptions"] == 1
+
+            proxy.profile.modbus_exception_probability = 0.0
+            assert modbus.read_inputs(10400, 3) == [3, 92, 1]
+
+    def test_target_unavailable(self, simulator):
+        with FaultProxy(simulator.host, 1) as proxy:
+            interface = LuxtronikSocketInterface(proxy.host, proxy.port)
+            with patch("luxtronik.faultproxy.LOGGER"), patch("luxtronik.cfi.interface.LOGGER"):
+                assert interface.read_calculations() is None
+            with patch("luxtronik.faultproxy.LOGGER"):
+                assert not proxy.start()
@@ -0,0 +1,119 @@
+"""Test suite for fleet module"""
+
+import queue
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from luxtronik import LuxtronikAllData
+from luxtronik.fleet import LuxtronikFleet
+
+
+class FakeFleetInterface:
+
+    created = []
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+
+    def __init__(self, host, port_config, port_shi):
+        if host.startswith("broken"):
+            raise ConnectionError("not reachable")
+        self.host = host
+        self.ports = (port_config, port_shi)
+        self.reads = 0
+        FakeFleetInterface.created.append(self)
+
+    def read_all(self):
+        with FakeFleetInterface.lock:
+            FakeFleetInterface.active += 1
+            FakeFleetInterface.max_active = max(FakeFleetInterface.max_active, FakeFleetInterface.active)
+        time.sleep(0.02)
+        with FakeFleetInterface.lock:
+            FakeFleetInterface.active -= 1
+        if self.host.startswith("failing"):
+            raise TimeoutError("timeout")
+        self.reads += 1
+        return LuxtronikAllData()
+
+    @classmethod
+    def reset(cls):
+        cls.created = []
+        cls.active = 0
+        cls.max_active = 0
+
+
+class TestLuxtronikFleet:
+
+    def test_poll(self):
+        FakeFleetInterface.reset()
+        results = []
+        q = queue.Queue()
+        hosts = [f"host{i}" for i in range(6)] + [("custom", 1, 2)]
+        with LuxtronikFleet(hosts, 3, lambda host, data: results.append(host), q,
+                FakeFleetInterface) as fleet:
+            assert fleet.hosts == [f"host{i}" for i in range(6)] + [("custom", 1, 2)]
+
+            data = fleet.poll()
+            assert len(data) == 7
+            assert all(isinstance(d, LuxtronikAllData) for d in data.values())
+            assert sorted(results, key=str) == sorted(fleet.hosts, key=str)
+            assert q.qsize() == 7
+            assert FakeFleetInterface.max_active == 3
+
+            # interfaces are re-used
+            fleet.poll()
+            assert len(FakeFleetInterface.created) == 7
+            assert all(i.reads == 2 for i in FakeFleetInterface.created)
+            assert fleet.get_interface(("custom", 1, 2)).ports == (1, 2)
+            assert fleet.get_interface(["custom", 1, 2]).ports == (1, 2)
+            assert fleet.get_interface("unknown") is None
+
+    def test_same_address(self):
+        FakeFleetInterface.reset()
+        hosts = ["sim", ("sim", 1, 2), ("sim", 3, 4)]
+        with LuxtronikFleet(hosts, interface_factory=FakeFleetInterface) as fleet:
+            data = fleet.poll()
+            assert len(data) == 3
+            assert all(d is not None for d in data.values())
+            assert sorted(i.ports for i in FakeFleetInterface.created) == [(1, 2), (3, 4), (8889, 502)]
+
+        with pytest.raises(ValueError):
+            LuxtronikFleet(["sim", ("sim", 8889, 502)])
+        with pytest.raises(ValueError):
+            LuxtronikFleet([("sim", 1, 2), ["sim", 1, 2]])
+
+    def test_errors(self):
+        FakeFleetInterface.reset()
+        results = []
+
+        def callback(host, data):
+            results.append(host)
+            raise ValueError("callback error")
+
+        fleet = LuxtronikFleet(["host", "broken", "failing"], 2, callback,
+            interface_factory=FakeFleetInterface)
+        with patch("luxtronik.fleet.LOGGER") as logger:
+            data = fleet.poll()
+            assert data["broken"] is None
+            assert data["failing"] is None
+            assert isinstance(data["host"], LuxtronikAllData)
+            assert results == ["host"]
+            assert logger.error.call_count == 3
+        fleet.close()
+
+    def test_start_stop(self):
+        FakeFleetInterface.reset()
+        q = queue.Queue()
+        fleet = LuxtronikFleet(["host_a", "host_b"], queue=q, interface_factory=FakeFleetInterface)
+        assert not fleet.running
+        assert fleet.start(0.01)
+        assert fleet.running
+        with patch("luxtronik.fleet.LOGGER"):
+            assert not fleet.start(0.01)
+        hosts = {q.get(timeout=2)[0] for _ in range(4)}
+        fleet.close()
+        assert not fleet.running
+        assert hosts == {"host_a", "host_b"}
@@ -0,0 +1,141 @@
+"""Test suite for history module"""
+
+from unittest.mock import patch
+
+import pytest
+
+from luxtronik.cfi import Calculations
+from luxtronik.history import FieldHistory, History
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFieldHistory:
+
+    def create(self, capacity):
+        definition = Calculations.definitions.get(10)
+        return FieldHistory(definition, definition.create_field(), capacity)
+
+    def test_append(self):
+        history = self.create(4)
+        assert history.last() is None
+        assert history.nbytes == 64
+        assert repr(history)
+
+        assert history.append(1.0, 100)
+        # unchanged values and missing values are not recorded
+        assert not history.append(2.0, 100)
+        assert not history.append(2.0, None)
+        assert not history.append(2.0, [1, 2])
+        # older samples are rejected
+        assert not history.append(0.5, 101)
+        assert history.append(3.0, 101)
+        assert len(history) == 2
+        assert history.last() == (3.0, 101)
+
+        with patch("luxtronik.history.LOGGER"):
+            assert not history.append(4.0, 1 << 70)
+        assert len(history) == 2
+
+    def test_ring(self):
+        history = self.create(3)
+        for i in range(5):
+            history.append(float(i), i)
+        assert len(history) == 3
+        assert history.range() == [(2.0, 2), (3.0, 3), (4.0, 4)]
+        assert history.range(3.0) == [(3.0, 3), (4.0, 4)]
+        assert history.range(2.5, 4.0) == [(3.0, 3)]
+        assert history.range(5.0) == []
+        assert history.values(4.0) == [(4.0, 0.4)]
+
+    def test_downsample(self):
+        history = self.create(100)
+        for i, raw in enumerate([10, 20, 30, 40, 50, 60]):
+            history.append(float(i), raw)
+        assert history.downsample(2.0) == [
+            (0.0, 1.0, 2.0, 1.5),
+            (2.0, 3.0, 4.0, 3.5),
+            (4.0, 5.0, 6.0, 5.5),
+        ]
+        assert history.downsample(10.0, 3.0) == [(3.0, 4.0, 6.0, 5.0)]
+        assert history.downsample(10.0, 10.0) == []
+
+
+class TestHistory:
+
+    def test_track(self):
+        clock = FakeClock()
+        history = History(capacity=8, clock=clock)
+        calculations = Calculations()
+        calculations.get(10).raw = 200
+
+        with patch("luxtronik.history.LOGGER") as logger:
+            histories = history.track(calculations, [10, "ID_WEB_Temperatur_TRL", "not_existing"])
+            assert logger.warning.call_count == 1
+        assert len(histories) == 2
+        assert len(history) == 2
+        assert history.nbytes == 2 * 8 * 16
+        # The current value is recorded immediately
+        assert history.get("ID_WEB_Temperatur_TVL").range() == [(0.0, 200)]
+        assert history.get(calculations.get(11)) is histories[1]
+        assert history.get(Calculations.definitions.get(11)) is histories[1]
+        assert history.get("not_existing") is None
+        assert history.get(calculations.get(12)) is None
+
+        # Tracking again does not register a second observer
+        history.track(calculations, [10])
+        assert len(calculations._change_callbacks) == 1
+
+        # Feed via the change observers
+        clock.now = 5.0
+        field = calculations.get(10)
+        calculations.notify_changes([(Calculations.definitions.get(10), field, 200)])
+        field.raw = 210
+        calculations.notify_changes([(Calculations.definitions.get(10), field, 200)])
+        assert history.get("ID_WEB_Temperatur_TVL").range() == [(0.0, 200), (5.0, 210)]
+
+        assert history.untrack(calculations)
+        assert not calculations.observed
+
+    def test_track_two_vectors(self):
+        clock = FakeClock()
+        history = History(capacity=8, clock=clock)
+        a = Calculations()
+        b = Calculations()
+        a.get(10).raw = 200
+        b.get(10).raw = 300
+        history.track(a, [10])
+        with pytest.raises(ValueError):
+            history.track(b, [10, 11])
+        # Nothing of the rejected vector is tracked
+        assert len(history) == 1
+        assert not b.observed
+
+        clock.now = 1.0
+        a.get(10).raw = 210
+        a.notify_changes([(Calculations.definitions.get(10), a.get(10), 200)])
+        assert history.get("ID_WEB_Temperatur_TVL").range() == [(0.0, 200), (1.0, 210)]
+
+        # Continue the history with the second vector
+        assert history.untrack(a)
+        clock.now = 2.0
+        tracked = history.track(b, [10])
+        assert len(history) == 1
+        assert history.get("ID_WEB_Temperatur_TVL") is tracked[0]
+        assert history.get(Calculations.definitions.get(10)) is tracked[0]
+        assert history.get(b.get(10)) is tracked[0]
+        assert tracked[0].range() == [(0.0, 200), (1.0, 210), (2.0, 300)]
+
+    def test_track_all(self):
+        history = History(capacity=2)
+        calculations = Calculations()
+        history.track(calculations)
+        assert len(history) == len(calculations)
+        assert len(list(history)) == len(calculations)
@@ -0,0 +1,269 @@
+"""Test suite for instrumentation module"""
+
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from luxtronik import LuxtronikInterface
+from luxtronik.cfi import LuxtronikSocketInterface
+from luxtronik.common import HostLock
+from luxtronik.instrumentation import (
+    NULL_SPAN,
+    ChromeTraceRecorder,
+    CompositeInstrumentation,
+    Histogram,
+    Instrumentation,
+    InterfaceStats,
+    Span,
+    create_span,
+    timed_lock,
+)
+from luxtronik.shi import create_modbus_tcp
+from luxtronik.simulator import LuxtronikSimulator
+
+
+@pytest.fixture(scope="module")
+def simulator():
+    with LuxtronikSimulator(port_config=0, port_shi=0) as sim:
+        yield sim
+
+
+class TestHistogram:
+
+    def test_record(self):
+        histogram = Histogram()
+        assert histogram.percentile(0.5) is None
+        assert histogram.mean is None
+        for value in [0.001, 0.002, 0.003, 0.1]:
+            histogram.record(value)
+        assert histogram.count == 4
+        assert histogram.min == 0.001
+        assert histogram.max == 0.1
+        assert histogram.mean == pytest.approx(0.0265)
+        # Upper bound of the bucket
+        assert 0.002 <= histogram.percentile(0.5) <= 0.004
+        assert histogram.percentile(1.0) == 0.1
+        assert histogram.to_dict()["count"] == 4
+
+    def test_overflow(self):
+        histogram = Histogram(bounds=(1.0,))
+        histogram.record(5.0)
+        assert histogram.buckets == [0, 1]
+        assert histogram.percentile(0.5) == 5.0
+
+
+class TestSpan:
+
+    def test_null_span(self):
+        assert create_span(None, "test") is NULL_SPAN
+        with create_span(None, "test") as span:
+            span.set("a", 1)
+            span.count("b", 2)
+
+    def test_span(self):
+        instrumentation = Instrumentation()
+        with patch.object(instrumentation, "span_finished") as finished:
+            with create_span(instrumentation, "test", "host", addr=1) as span:
+                span.count("bytes", 2)
+                span.count("bytes", 3)
+            finished.assert_called_once_with(span)
+        assert isinstance(span, Span)
+        assert span.attributes == {"addr": 1}
+        assert span.counts == {"bytes": 5}
+        assert span.duration >= 0
+        assert span.thread_id == threading.get_ident()
+        assert span.error is None
+        assert repr(span)
+
+        with pytest.raises(ValueError):
+            with create_span(instrumentation, "test") as span:
+                raise ValueError()
+        assert span.error == "ValueError"
+
+    def test_timed_lock(self):
+        lock = threading.RLock()
+        assert timed_lock(lock, None, "lock") is lock
+        stats = InterfaceStats()
+        with timed_lock(lock, stats, "lock", "host") as acquired:
+            assert acquired is lock
+        assert stats.get("lock").histogram.count == 1
+        # The lock is released again
+        assert lock.acquire(blocking=False)
+        lock.release()
+
+        host_lock = HostLock()
+        with timed_lock(host_lock, None, "lock", priority=1) as acquired:
+            assert acquired is host_lock
+        with timed_lock(host_lock, stats, "lock", priority=1):
+            pass
+        assert host_lock.acquisitions == 2
+        assert stats.get("lock").histogram.count == 2
+
+
+class TestInterfaceStats:
+
+    def test_stats(self):
+        stats = InterfaceStats(per_host=True)
+        for host in ["a", "a", "b"]:
+            with create_span(stats, "phase", host) as span:
+                span.count("registers", 2)
+        with pytest.raises(ValueError):
+            with create_span(stats, "phase", "b"):
+                raise ValueError()
+        assert len(stats) == 2
+        assert list(stats) == ["a/phase", "b/phase"]
+        assert stats.get("phase", "a").counts == {"registers": 4}
+        assert stats.get("phase", "b").errors == 1
+        assert stats.get("other") is None
+        summary = stats.to_dict()
+        assert summary["a/phase"]["count"] == 2
+        assert summary["b/phase"]["errors"] == 1
+        stats.reset()
+        assert len(stats) == 0
+
+
+@patch("luxtronik.cfi.interface.WAIT_TIME_AFTER_PARAMETER_WRITE", 0)
+@patch("luxtronik.shi.modbus.LUXTRONIK_WAIT_TIME_AFTER_HOLDING_WRITE", 0)
+class TestInstrumentedInterfaces:
+
+    def test_socket_interface(self, simulator):
+        stats = InterfaceStats()
+        interface = LuxtronikSocketInterface(simulator.host, simulator.port_config, stats)
+        data = interface.read()
+        for phase in ["cfi.lock", "cfi.connect", "cfi.read_parameters",
+                "cfi.read_calculations", "cfi.read_visibilities"]:
+            assert stats.get(phase).histogram.count == 1
+        assert stats.get("cfi.send").histogram.count == 3
+        assert stats.get("cfi.send").counts["bytes"] == 3 * 8
+        assert stats.get("cfi.receive").counts["bytes"] == 4 * (
+            2 + len(simulator.state.parameters) + 3 + len(simulator.state.calculations)
+            + 2) + len(simulator.state.visibilities)
+        assert stats.get("cfi.parse").counts["registers"] == len(simulator.state.parameters) \
+            + len(simulator.state.calculations) + len(simulator.state.visibilities)
+
+        data.parameters.set(1, 20.0)
+        interface.write(data.parameters)
+        assert stats.get("cfi.write_parameter").histogram.count == 1
+        assert stats.get("cfi.write_wait").histogram.count == 1
+
+        # Disable the instrumentation
+        interface.instrumentation = None
+        interface.read()
+        assert stats.get("cfi.connect").histogram.count == 2
+
+    def test_smart_home_interface(self, simulator):
+        stats = InterfaceStats()
+        shi = create_modbus_tcp(simulator.host, simulator.port_shi, instrumentation=stats)
+        assert shi.instrumentation is stats
+        # Version detection
+        assert stats.get("modbus.read_inputs").histogram.count >= 1
+        stats.reset()
+
+        inputs = shi.read_inputs()
+        assert stats.get("shi.prepare").histogram.count == 1
+        assert stats.get("shi.integrate").histogram.count == 1
+        telegrams = stats.get("shi.prepare").counts["telegrams"]
+        assert stats.get("modbus.read_inputs").histogram.count == telegrams
+        assert inputs.get("heating_status").raw is not None
+        assert stats.get("modbus.read_inputs").counts["registers"] > 0
+        assert stats.get("modbus.lock").histogram.count == 1
+        assert stats.get("modbus.connect").histogram.count == 1
+
+        assert shi.write_holding("heating_offset", 1.0)
+        assert stats.get("modbus.write_holdings").counts["registers"] == 1
+        assert stats.get("modbus.write_wait").histogram.count == 1
+
+    def test_failure(self, simulator):
+        stats = InterfaceStats()
+        shi = create_modbus_tcp(simulator.host, simulator.port_shi, instrumentation=stats)
+        with patch("luxtronik.shi.modbus.LOGGER"):
+            assert shi._interface.read_inputs(9000, 1) is None
+        assert stats.get("modbus.read_inputs").counts["failures"] == 1
+
+    def test_combined(self, simulator):
+        stats = InterfaceStats()
+        interface = LuxtronikInterface(simulator.host, simulator.port_config,
+            simulator.port_shi, stats)
+        interface.read_all()
+        assert stats.get("cfi.connect").histogram.count == 1
+        assert stats.get("shi.integrate").histogram.count == 1
+
+        interface.instrumentation = None
+        assert interface._interface.instrumentation is None
+        interface.read_all()
+        assert stats.get("cfi.connect").histogram.count == 1
+
+
+class TestChromeTrace:
+
+    def test_events(self):
+        trace = ChromeTraceRecorder()
+        with create_span(trace, "cfi.read_parameters", "a", command=3003):
+            with create_span(trace, "cfi.receive", "a") as span:
+                span.count("bytes", 8)
+
+        def worker():
+            with create_span(trace, "modbus.read_inputs", "b"):
+                pass
+        thread = threading.Thread(target=worker, name="poller")
+        thread.start()
+        thread.join()
+
+        events = trace.to_dict()["traceEvents"]
+        spans = [e for e in events if e["ph"] == "X"]
+        assert [e["name"] for e in spans] == ["cfi.receive", "cfi.read_parameters", "modbus.read_inputs"]
+        receive, read, modbus = spans
+        assert receive["args"] == {"bytes": 8}
+        assert read["args"] == {"command": 3003}
+        assert read["cat"] == "cfi"
+        # The nested span lies within the parent span
+        assert read["ts"] <= receive["ts"]
+        assert receive["ts"] + receive["dur"] <= read["ts"] + read["dur"]
+        # One process per host, one track per thread
+        assert read["pid"] == receive["pid"] != modbus["pid"]
+        assert read["tid"] != modbus["tid"]
+        metadata = {(e["name"], e["args"]["name"]) for e in events if e["ph"] == "M"}
+        assert ("process_name", "a") in metadata
+        assert ("process_name", "b") in metadata
+        assert ("thread_name", "poller") in metadata
+
+        trace.clear()
+        assert len(trace) == 0
+
+    def test_limit(self):
+        trace = ChromeTraceRecorder(max_events=3)
+        for _ in range(5):
+            with create_span(trace, "test", "a"):
+                pass
+        # The process and thread names are included in the limit
+        assert len(trace) == 3
+        assert trace.dropped == 4
+        assert trace.to_dict()["otherData"]["dropped_events"] == 4
+
+    def test_save(self, tmp_path):
+        trace = ChromeTraceRecorder()
+        with pytest.raises(RuntimeError):
+            with create_span(trace, "test"):
+                raise RuntimeError()
+        filename = tmp_path / "trace.json"
+        assert trace.save(filename)
+        events = json.loads(filename.read_text())["traceEvents"]
+        assert events[-1]["args"] == {"error": "RuntimeError"}
+        with patch("luxtronik.instrumentation.LOGGER") as logger:
+            assert not trace.save(tmp_path / "missing" / "trace.json")
+            assert logger.error.call_count == 1
+
+    def test_composite(self, simulator):
+        stats = InterfaceStats()
+        trace = ChromeTraceRecorder()
+        interface = LuxtronikInterface(simulator.host, simulator.port_config,
+            simulator.port_shi, CompositeInstrumentation(stats, trace))
+        interface.read_all()
+        names = [e["name"] for e in trace.to_dict()["traceEvents"] if e["ph"] == "X"]
+        assert sum(stats.get(name).histogram.count for name in stats) == len(names)
+        for name in ["luxtronik.lock", "cfi.lock", "cfi.connect", "cfi.read_parameters",
+                "cfi.read_calculations", "cfi.read_visibilities", "modbus.lock",
+                "modbus.read_inputs", "modbus.read_holdings", "shi.integrate"]:
+            assert name in names
@@ -0,0 +1,130 @@
+"""Test suite for recording module"""
+
+from unittest.mock import patch
+
+from luxtronik import Calculations
+from luxtronik.recording import (
+    EVENT_CFI_CONNECT,
+    EVENT_CFI_RECV,
+    EVENT_CFI_SEND,
+    EVENT_SHI_READ,
+    EVENT_SHI_WRITE,
+    RecordingInterface,
+    RecordingModbusTcpInterface,
+    RecordingSocketInterface,
+    ReplayInterface,
+    ReplayModbusTcpInterface,
+    ReplaySocketInterface,
+    TrafficRecorder,
+    TrafficReplay,
+    load_recording,
+)
+from tests.fake import fake_create_connection, FakeModbusClient
+
+
+@patch("socket.create_connection", fake_create_connection)
+class TestRecording:
+
+    def record_calculations(self, filename, reads=1):
+        with TrafficRecorder(filename) as recorder:
+            interface = RecordingSocketInterface("host", recorder)
+            for _ in range(reads):
+                calculations = interface.read_calculations()
+        return calculations
+
+    def test_cfi_round_trip(self, tmp_path):
+        filename = tmp_path / "traffic.jsonl"
+        recorded = self.record_calculations(filename, 2)
+        events = load_recording(filename)
+        # One send and one receive event per exchange
+        assert [e["kind"] for e in events] == [EVENT_CFI_CONNECT, EVENT_CFI_SEND, EVENT_CFI_RECV] * 2
+
+        replay = TrafficReplay(filename)
+        interface = ReplaySocketInterface(replay)
+        for _ in range(2):
+            assert not replay.finished
+            replayed = interface.read_calculations()
+            assert [f.raw for f in replayed.values()] == [f.raw for f in recorded.values()]
+        assert replay.finished
+
+        # The recording is exhausted
+        with patch("luxtronik.cfi.interface.LOGGER") as logger:
+            assert interface.read_calculations() is None
+            assert logger.error.call_count == 1
+
+    def test_cfi_unexpected_send(self, tmp_path):
+        filename = tmp_path / "traffic.jsonl"
+        self.record_calculations(filename)
+        interface = ReplaySocketInterface(TrafficReplay(filename))
+        with patch("luxtronik.recording.LOGGER") as logger, \
+                patch("luxtronik.cfi.interface.LOGGER"):
+            # Parameters have been requested instead of calculations
+            interface.read_parameters()
+            assert logger.warning.call_count == 1
+
+    def test_shi_round_trip(self, tmp_path):
+        filename = tmp_path / "traffic.jsonl"
+        with TrafficRecorder(filename) as recorder:
+            modbus = RecordingModbusTcpInterface("host", recorder)
+            modbus._client = FakeModbusClient("host")
+            assert modbus.read_holdings(10, 3) == [10, 11, 12]
+            assert modbus.read_inputs(20, 2) == [20, 21]
+            assert modbus.read_inputs(22, 2) == [22, 23]
+            with patch("luxtronik.shi.modbus.LUXTRONIK_WAIT_TIME_AFTER_HOLDING_WRITE", 0):
+                assert modbus.write_holdings(10, [1])
+        kinds = [e["kind"] for e in load_recording(filename)]
+        assert kinds == [EVENT_SHI_READ] * 3 + [EVENT_SHI_WRITE]
+
+        modbus = ReplayModbusTcpInterface(TrafficReplay(filename))
+        assert modbus.read_inputs(20, 2) == [20, 21]
+        assert modbus.read_holdings(10, 3) == [10, 11, 12]
+        # Assembled from the registers read so far
+        assert modbus.read_inputs(21, 1) == [21]
+        with patch("luxtronik.shi.modbus.LUXTRONIK_WAIT_TIME_AFTER_HOLDING_WRITE", 0):
+            assert modbus.write_holdings(10, [1])
+        with patch("luxtronik.recording.LOGGER") as logger:
+            # Not read yet
+            assert modbus.read_inputs(22, 1) is None
+            assert modbus.read_inputs(100, 1) is None
+            assert logger.error.call_count == 2
+        assert modbus.read_inputs(22, 2) == [22, 23]
+        assert modbus.read_inputs(22, 1) == [22]
+
+    def test_realtime(self):
+        events = [
+            {"t": 100.0, "kind": EVENT_SHI_READ, "registers": "inputs", "addr": 0, "count": 1, "data": [1]},
+            {"t": 102.0, "kind": EVENT_SHI_READ, "registers": "inputs", "addr": 0, "count": 1, "data": [2]},
+        ]
+        replay = TrafficReplay(events, realtime=True, speed=2.0)
+        with patch("luxtronik.recording.time.sleep") as sleep:
+            assert replay.shi_read("inputs", 0, 1) == [1]
+            assert replay.shi_read("inputs", 0, 1) == [2]
+            assert sleep.call_count == 1
+            assert 0.9 < sleep.call_args[0][0] <= 1.0
+
+    def test_load_recording(self, tmp_path):
+        filename = tmp_path / "traffic.jsonl"
+        filename.write_text('{"t": 1, "kind": "cfi_connect"}\n\nnot json\n')
+        with patch("luxtronik.recording.LOGGER") as logger:
+            events = load_recording(filename)
+            assert logger.warning.call_count == 1
+        assert events == [{"t": 1, "kind": EVENT_CFI_CONNECT}]
+
+    @patch("luxtronik.shi.modbus.ModbusClient", FakeModbusClient)
+    def test_combined(self, tmp_path):
+        filename = tmp_path / "traffic.jsonl"
+        with TrafficRecorder(filename) as recorder:
+            interface = RecordingInterface("host", recorder)
+            assert isinstance(interface._interface, RecordingModbusTcpInterface)
+            recorded = interface.read_calculations()
+            version = interface.version
+        # The version detection is recorded too
+        kinds = {e["kind"] for e in load_recording(filename)}
+        assert EVENT_SHI_READ in kinds
+
+        interface = ReplayInterface(TrafficReplay(filename))
+        assert isinstance(interface._interface, ReplayModbusTcpInterface)
+        assert interface.version == version
+        replayed = interface.read_calculations()
+        assert isinstance(replayed, Calculations)
+        assert [f.raw for f in replayed.values()] == [f.raw for f in recorded.values()]
@@ -0,0 +1,273 @@
+"""Test suite for scheduler module"""
+
+import queue
+import threading
+from unittest.mock import patch
+
+from luxtronik import LuxtronikAllData
+from luxtronik.scheduler import LuxtronikScheduler, PollingTask
+from luxtronik.shi import LuxtronikSmartHomeInterface
+from luxtronik.shi.constants import LUXTRONIK_LATEST_SHI_VERSION
+
+from tests.fake import FakeModbus
+
+
+class FakeSchedulerInterface:
+
+    def __init__(self):
+        self.calls = []
+        self.collected = []
+        self.fail_send = False
+        self.fail_fields = []
+        self.failed_fields = []
+        self.shi_raw = 2
+        self.lock = threading.RLock()
+        self.locked_sends = 0
+
+    def create_all_data(self):
+        return LuxtronikAllData()
+
+    def read_parameters(self, parameters):
+        self.calls.append("parameters")
+
+    def read_calculations(self, calculations):
+        self.calls.append("calculations")
+        for _, field in calculations.data.pairs:
+            field.raw = 1
+
+    def read_visibilities(self, visibilities):
+        self.calls.append("visibilities")
+
+    def collect_inputs(self, inputs):
+        self.collected.append(inputs)
+
+    def collect_holdings_for_read(self, holdings):
+        self.collected.append(holdings)
+
+    def send(self):
+        if self.fail_send:
+            raise ConnectionError("not reachable")
+        self.calls.append(("send", len(self.collected)))
+        if self.lock._is_owned():
+            self.locked_sends += 1
+        self.failed_fields = []
+        for vector in self.collected:
+            for definition, field in vector.data.pairs:
+                if definition.name in self.fail_fields:
+                    self.failed_fields.append(field)
+                else:
+                    field.raw = self.shi_raw
+        self.collected = []
+        return not self.failed_fields
+
+
+class TestLuxtronikScheduler:
+
+    def test_add(self):
+        scheduler = LuxtronikScheduler(FakeSchedulerInterface())
+        with patch("luxtronik.scheduler.LOGGER") as logger:
+            assert scheduler.add_vector("foo", 1) is None
+            assert scheduler.add_group("foo", "calculations", [10], 1) is None
+            assert scheduler.add_group("foo", "inputs", ["not_existing"], 1) is None
+            assert logger.error.call_count == 3
+
+        task = scheduler.add_vector("parameters", 3600)
+        assert type(task) is PollingTask
+        assert task.vector is scheduler.data.parameters
+        assert not task.is_shi
+        assert repr(task)
+
+        group = scheduler.add_group("power", "inputs", ["heating_status", "hot_water_status"], 0.5)
+        assert group.is_shi
+        assert len(group.vector) == 2
+        # The fields are shared with the data vector collection
+        assert group.vector.get("heating_status") is scheduler.data.inputs.get("heating_status")
+        # and so are the change observers
+        scheduler.data.inputs.on_any_change(print)
+        assert group.vector.observed
+
+        assert scheduler.tasks == [task, group]
+        assert scheduler.get_task("power") is group
+        assert scheduler.remove("power")
+        assert not scheduler.remove("power")
+
+    def test_tick(self):
+        interface = FakeSchedulerInterface()
+        ticks = []
+        scheduler = LuxtronikScheduler(interface, callback=lambda tasks, data: ticks.append(tasks))
+        scheduler.add_vector("parameters", 100)
+        scheduler.add_vector("calculations", 10)
+        scheduler.add_group("fast", "inputs", ["heating_status"], 1)
+        scheduler.add_group("slow", "holdings", ["heating_mode"], 10)
+
+        # Everything is due on the first tick, the smart home reads are coalesced
+        tasks = scheduler.tick(1000)
+        assert {task.name for task in tasks} == {"parameters", "calculations", "fast", "slow"}
+        assert interface.calls == ["parameters", "calculations", ("send", 2)]
+        assert scheduler.data.inputs.get("heating_status").raw == 2
+        assert scheduler.data.calculations.get(10).raw == 1
+        assert scheduler.next_due() == 1001
+
+        interface.calls = []
+        assert scheduler.tick(1000.5) == []
+        assert [task.name for task in scheduler.tick(1001)] == ["fast"]
+        assert interface.calls == [("send", 1)]
+
+        interface.calls = []
+        tasks = scheduler.tick(1010)
+        assert {task.name for task in tasks} == {"calculations", "fast", "slow"}
+        assert interface.calls == ["calculations", ("send", 2)]
+        assert len(ticks) == 3
+        # The smart home reads are sent while the host lock is held
+        assert interface.locked_sends == 3
+
+    def test_merge(self):
+        interface = FakeSchedulerInterface()
+        scheduler = LuxtronikScheduler(interface)
+        a = scheduler.add_group("a", "inputs", ["heating_status"], 1)
+        b = scheduler.add_group("b", "inputs", ["hot_water_status", "heating_status"], 1)
+        scheduler.add_group("c", "holdings", ["heating_mode"], 1)
+
+        # One merged vector per register type
+        scheduler.tick(0)
+        assert interface.calls == [("send", 2)]
+        assert scheduler.data.inputs.get("hot_water_status").raw == 2
+        vectors = scheduler._merge_shi("inputs", [a, b])
+        assert len(vectors) == 1
+        assert len(vectors[0]) == 2
+        # cached until the tasks change
+        assert scheduler._merge_shi("inputs", [a, b]) is vectors
+        scheduler.remove("c")
+        assert scheduler._merge_shi("inputs", [a, b]) is not vectors
+
+        # A task with a conflicting field object is collected on its own
+        other = LuxtronikAllData().inputs.get("heating_status")
+        scheduler.add_group("d", "inputs", [other], 1)
+        interface.calls = []
+        scheduler.tick(1)
+        assert interface.calls == [("send", 2)]
+        assert other.raw == 2
+
+    def test_merge_telegrams(self):
+        FakeModbus.telegram_list = []
+        interface = LuxtronikSmartHomeInterface(FakeModbus(), LUXTRONIK_LATEST_SHI_VERSION)
+        interface.lock = threading.RLock()
+        scheduler = LuxtronikScheduler(interface, LuxtronikAllData())
+        scheduler.add_group("a", "inputs", [0, 2], 1)
+        scheduler.add_group("b", "inputs", [3, 4], 1)
+
+        # The adjacent registers 2 to 4 of both tasks are read within one telegram
+        scheduler.tick(0)
+        assert [(t.addr, t.count) for t in FakeModbus.telegram_list] == [(10000, 1), (10002, 3)]
+        assert scheduler.data.inputs.get(3).raw == 3
+        assert scheduler.data.inputs.get(4).raw == 4
+
+    def test_adaptive(self):
+        interface = FakeSchedulerInterface()
+        scheduler = LuxtronikScheduler(interface)
+        fixed = scheduler.add_vector("parameters", 10)
+        # The fake interface always reads the same values
+        static = scheduler.add_group("static", "inputs", ["heating_status"], 4,
+            min_interval=1, max_interval=8)
+        assert static.adaptive
+        assert not fixed.adaptive
+
+        scheduler.tick(0)
+        assert static.interval == 4
+        assert static.change_rate is None
+        scheduler.tick(4)
+        assert static.interval == 8
+        assert static.change_rate == 0.0
+        assert static.next_due == 12
+        assert fixed.interval == 10
+
+        # Changed values shorten the interval down to the lower bound
+        for now in (12, 20, 24, 26, 27, 28):
+            interface.shi_raw = now
+            scheduler.tick(now)
+        assert static.interval == 1
+        assert 0.5 < static.change_rate < 1.0
+
+    def test_adaptive_bounds(self):
+        task = PollingTask("foo", "calculations", LuxtronikAllData().calculations, 100,
+            min_interval=1, max_interval=10, watch=[10])
+        assert task.interval == 10
+        assert task.observe() is None
+        assert task.observe() is False
+        task.vector.get(10).raw = 5
+        assert task.observe() is True
+        assert 1 < task.interval < 10
+
+        task = PollingTask("foo", "calculations", LuxtronikAllData().calculations, 5,
+            min_interval=0, max_interval=10)
+        task.observe()
+        task.observe()
+        assert task.interval == 10
+
+    def test_adaptive_settles(self):
+        calculations = LuxtronikAllData().calculations
+        with patch("luxtronik.scheduler.LOGGER") as logger:
+            task = PollingTask("foo", "calculations", calculations, 1,
+                min_interval=1, max_interval=16, watch=[10, 11, 12, 13, "not_existing"])
+            assert logger.warning.call_count == 1
+        counter = PollingTask("bar", "calculations", calculations, 1,
+            min_interval=1, max_interval=16, watch=[14])
+        intervals = []
+        for read in range(100):
+            # One of four watched fields changes on every read
+            calculations.get(10).raw = read
+            # Another one only on every fourth read
+            calculations.get(11).raw = read // 4
+            task.observe()
+            counter.observe()
+            intervals.append(task.interval)
+        # About 0.3 fields change per read: The interval settles between the bounds
+        assert 0.28 < task.change_rate < 0.34
+        assert all(1 < interval < 4 for interval in intervals[-20:])
+        # Unwatched changes do not shorten the interval
+        assert counter.change_rate == 0.0
+        assert counter.interval == 16
+
+    def test_errors(self):
+        interface = FakeSchedulerInterface()
+        interface.fail_send = True
+        scheduler = LuxtronikScheduler(interface, LuxtronikAllData())
+        scheduler.add_group("fast", "inputs", ["heating_status"], 1)
+        with patch("luxtronik.scheduler.LOGGER") as logger:
+            tasks = scheduler.tick(0)
+            assert logger.error.call_count == 1
+        # The task is re-scheduled anyway, but not adapted
+        assert tasks[0].next_due == 1
+        assert tasks[0].change_rate is None
+
+    def test_partial_errors(self):
+        interface = FakeSchedulerInterface()
+        scheduler = LuxtronikScheduler(interface)
+        good = scheduler.add_group("good", "inputs", ["heating_status"], 1,
+            min_interval=1, max_interval=8)
+        bad = scheduler.add_group("bad", "inputs", ["hot_water_status"], 1,
+            min_interval=1, max_interval=8)
+        interface.fail_fields = ["hot_water_status"]
+        for now in (0, 1, 9):
+            interface.shi_raw = now
+            scheduler.tick(now)
+        # Only the failed group is not adapted
+        assert good.last_success
+        assert good.change_rate == 1.0
+        assert not bad.last_success
+        assert bad.change_rate is None
+        assert bad.interval == 1
+
+    def test_start_stop(self):
+        q = queue.Queue()
+        scheduler = LuxtronikScheduler(FakeSchedulerInterface(),
+            callback=lambda tasks, data: q.put(tasks))
+        scheduler.add_vector("calculations", 0.01)
+        assert scheduler.start()
+        assert scheduler.running
+        with patch("luxtronik.scheduler.LOGGER"):
+            assert not scheduler.start()
+        q.get(timeout=2)
+        q.get(timeout=2)
+        scheduler.stop()
+        assert not scheduler.running
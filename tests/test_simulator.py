@@ -0,0 +1,117 @@
+"""Test suite for simulator module"""
+
+import random
+import socket
+import struct
+from unittest.mock import patch
+
+import pytest
+
+from luxtronik import LuxtronikInterface
+from luxtronik.cfi import LuxtronikSocketInterface
+from luxtronik.shi.constants import LUXTRONIK_LATEST_SHI_VERSION
+from luxtronik.shi.modbus import LuxtronikModbusTcpInterface
+from luxtronik.simulator import LuxtronikSimulator, SimulatorState
+from luxtronik.scripts.simulate import create_parser, create_simulator, parse_addrs
+
+
+@pytest.fixture
+def simulator():
+    with LuxtronikSimulator(port_config=0, port_shi=0) as sim:
+        yield sim
+
+
+class TestSimulatorState:
+
+    def test_init(self):
+        state = SimulatorState()
+        assert [state.inputs[addr] for addr in range(10400, 10403)] == list(LUXTRONIK_LATEST_SHI_VERSION[:3])
+        assert "".join(chr(c) for c in state.calculations[81:91] if c) == "V3.92.1"
+        assert state.read_registers("inputs", 10400, 3) == [3, 92, 1]
+
+    def test_existence(self):
+        state = SimulatorState()
+        assert state.read_registers("holdings", 10000, 1) is not None
+        state.remove_registers("holdings", [10000])
+        assert state.read_registers("holdings", 10000, 1) is None
+        assert not state.write_registers(10000, [1])
+        assert state.write_registers(10001, [1])
+        assert state.read_registers("holdings", 10001, 1) == [1]
+
+    def test_evolve(self):
+        state = SimulatorState()
+        calculations = list(state.calculations)
+        inputs = dict(state.inputs)
+        state.evolve(random.Random(0), 5)
+        assert calculations != state.calculations or inputs != state.inputs
+
+
+@patch("luxtronik.shi.modbus.LUXTRONIK_WAIT_TIME_AFTER_HOLDING_WRITE", 0)
+@patch("luxtronik.cfi.interface.WAIT_TIME_AFTER_PARAMETER_WRITE", 0)
+class TestSimulator:
+
+    def test_cfi(self, simulator):
+        interface = LuxtronikSocketInterface(simulator.host, simulator.port_config)
+        data = interface.read()
+        assert data.calculations.get_firmware_version() == "V3.92.1"
+        assert data.parameters.get(1).raw == simulator.state.parameters[1]
+        assert data.visibilities.get(1).raw == 1
+
+        data.parameters.set(1, 42)
+        interface.write(data.parameters)
+        assert simulator.state.parameters[1] == data.parameters.get(1).raw
+
+    def test_cfi_write_response(self, simulator):
+        with socket.create_connection((simulator.host, simulator.port_config)) as sock:
+            sock.sendall(struct.pack(">iii", 3002, 1, 123))
+            response = b""
+            while len(response) < 8:
+                response += sock.recv(8 - len(response))
+        assert struct.unpack(">ii", response) == (3002, 123)
+        assert simulator.state.parameters[1] == 123
+
+    def test_modbus(self, simulator):
+        modbus = LuxtronikModbusTcpInterface(simulator.host, simulator.port_shi)
+        assert modbus.read_inputs(10400, 3) == [3, 92, 1]
+        assert modbus.write_holdings(10001, [7, 8])
+        assert modbus.read_holdings(10001, 2) == [7, 8]
+
+        simulator.state.remove_registers("inputs", [10104])
+        with patch("luxtronik.shi.modbus.LOGGER"):
+            assert modbus.read_inputs(10102, 3) is None
+            assert modbus.read_inputs(10102, 2) is not None
+
+    def test_combined(self, simulator):
+        interface = LuxtronikInterface(simulator.host, simulator.port_config, simulator.port_shi)
+        assert interface.version[:3] == LUXTRONIK_LATEST_SHI_VERSION[:3]
+        data = interface.read()
+        assert data.inputs.get("heating_status").raw is not None
+        assert data.holdings.get("heating_mode").raw is not None
+
+    def test_latency(self):
+        with LuxtronikSimulator(port_config=0, port_shi=0, latency=0.01) as simulator:
+            with patch("luxtronik.simulator.time.sleep") as sleep:
+                LuxtronikModbusTcpInterface(simulator.host, simulator.port_shi).read_inputs(10400, 1)
+                sleep.assert_called_with(0.01)
+
+    def test_restart(self):
+        simulator = LuxtronikSimulator(port_config=0, port_shi=0, evolve_interval=0.01, seed=1)
+        assert simulator.start()
+        with patch("luxtronik.simulator.LOGGER"):
+            assert not simulator.start()
+        simulator.stop()
+        assert not simulator.running
+
+
+class TestSimulateScript:
+
+    def test_parse_addrs(self):
+        assert parse_addrs("") == []
+        assert parse_addrs("1,5-7") == [1, 5, 6, 7]
+
+    def test_create_simulator(self):
+        args = create_parser().parse_args(["--port-cfi", "0", "--port-shi", "0",
+            "--missing-inputs", "10000-10001", "--latency", "0.5"])
+        simulator = create_simulator(args)
+        assert simulator.latency == 0.5
+        assert simulator.state.read_registers("inputs", 10001, 1) is None
@@ -0,0 +1,172 @@
+"""Test suite for snapshot_log module"""
+
+from unittest.mock import patch
+
+import pytest
+
+from luxtronik import LuxtronikAllData
+from luxtronik.snapshot_log import (
+    LUXTRONIK_SNAPSHOT_LOG_MAGIC,
+    SnapshotLogReader,
+    SnapshotLogWriter,
+)
+
+
+def create_data(value):
+    data = LuxtronikAllData()
+    data.parameters.get(1).raw = value
+    data.calculations.get(10).raw = value + 1
+    data.inputs.get("heating_status").raw = value % 5
+    return data
+
+
+class TestSnapshotLog:
+
+    def test_write_read(self, tmp_path):
+        filename = tmp_path / "log.bin"
+        data = create_data(0)
+        with SnapshotLogWriter(filename) as writer:
+            for i in range(10):
+                data.parameters.get(1).raw = i
+                data.calculations.get(10).raw = i + 1
+                writer.append(data, 100.0 + i)
+
+        with SnapshotLogReader(filename, index_interval=3) as reader:
+            assert len(reader) == 10
+            assert reader.time_range == (100.0, 109.0)
+            records = list(reader)
+            assert [r.timestamp for r in records] == [100.0 + i for i in range(10)]
+            assert repr(records[0])
+            assert "calculations" in records[0].vector_names
+
+            raws = records[4].raws("calculations")
+            assert raws["ID_WEB_Temperatur_TVL"] == 5
+            assert raws["ID_WEB_Temperatur_TRL"] is None
+            assert records[4].raws("not_existing") is None
+
+            restored = records[4].materialize()
+            assert isinstance(restored, LuxtronikAllData)
+            assert restored.parameters.get(1).raw == 4
+            assert restored.calculations.get(10).raw == 5
+            assert restored.calculations.get(11).raw is None
+            assert restored.inputs.get("heating_status").raw == 0
+
+            assert [r.timestamp for r in reader.records(103.5, 106.0)] == [104.0, 105.0]
+            assert [r.timestamp for r in reader.records(end=101.0)] == [100.0]
+            assert [r.timestamp for r in reader.records(106.0)] == [106.0, 107.0, 108.0, 109.0]
+            assert list(reader.records(200.0)) == []
+
+    def test_multi_register_raws(self, tmp_path):
+        filename = tmp_path / "log.bin"
+        data = create_data(0)
+        firmware = [ord(c) for c in "V3.92.1"] + [0, 0, 0]
+        data.calculations.get("ID_WEB_SoftStand").raw = firmware
+        data.inputs.get("version").raw = [3, 92, 1]
+        with SnapshotLogWriter(filename) as writer:
+            writer.append(data, 1.0)
+            # Integer raw values and values that do not fit
+            data.inputs.get("version").raw = 7
+            data.calculations.get("ID_WEB_SoftStand").raw = list(range(11))
+            writer.append(data, 2.0)
+
+        with SnapshotLogReader(filename) as reader:
+            first, second = list(reader)
+            assert first.raws("calculations")["ID_WEB_SoftStand"] == firmware
+            assert first.raws("inputs")["version"] == [3, 92, 1]
+            # The fields behind a multi-register field are not shifted
+            assert first.raws("calculations")["ID_WEB_Temperatur_TVL"] == 1
+            restored = first.materialize()
+            assert restored.calculations.get("ID_WEB_SoftStand").value == "V3.92.1"
+            assert restored.inputs.get("version").value == "3.92.1"
+            assert restored.inputs.get("heating_status").raw == 0
+
+            assert second.raws("inputs")["version"] == 7
+            assert second.raws("calculations")["ID_WEB_SoftStand"] is None
+
+    def test_equal_timestamps(self, tmp_path):
+        filename = tmp_path / "log.bin"
+        data = create_data(0)
+        with SnapshotLogWriter(filename, ["calculations"]) as writer:
+            for timestamp in [1.0, 2.0, 2.0, 2.0, 2.0, 3.0]:
+                writer.append(data, timestamp)
+        with SnapshotLogReader(filename, index_interval=2) as reader:
+            assert len(list(reader.records(2.0, 3.0))) == 4
+
+    def test_layout_change(self, tmp_path):
+        filename = tmp_path / "log.bin"
+        data = create_data(1)
+        with SnapshotLogWriter(filename, ["calculations"]) as writer:
+            writer.append(data, 1.0)
+            size = filename.stat().st_size
+            writer.append(data, 2.0)
+            # Without any changes of the fields the layout is written only once
+            assert filename.stat().st_size - size < size
+            # Unknown fields are added to the data vector
+            unknown = data.calculations.definitions.create_unknown_definition(5000)
+            field = unknown.create_field()
+            field.raw = 42
+            data.calculations.data.extend_sorted([(unknown, field)])
+            writer.append(data, 3.0)
+
+        # Appending to an existing log
+        with SnapshotLogWriter(filename, ["calculations"]) as writer:
+            writer.append(data, 4.0)
+
+        with SnapshotLogReader(filename, index_interval=1) as reader:
+            records = list(reader)
+            assert len(records) == 4
+            assert records[0].materialize().calculations.get(5000) is None
+            for record in records[2:]:
+                restored = record.materialize()
+                assert restored.calculations.get(5000).raw == 42
+                assert restored.calculations.get(10).raw == 2
+            assert records[3].raws("parameters") is None
+
+    def test_incomplete(self, tmp_path):
+        filename = tmp_path / "log.bin"
+        data = create_data(1)
+        with SnapshotLogWriter(filename, ["calculations"]) as writer:
+            writer.append(data, 1.0)
+            writer.append(data, 2.0)
+        # Simulate a crash while writing the last record
+        content = filename.read_bytes()
+        filename.write_bytes(content[:-10])
+        with patch("luxtronik.snapshot_log.LOGGER") as logger:
+            with SnapshotLogReader(filename) as reader:
+                assert logger.warning.call_count == 1
+                assert len(reader) == 1
+
+    def test_corrupted(self, tmp_path):
+        filename = tmp_path / "log.bin"
+        data = create_data(1)
+        with SnapshotLogWriter(filename, ["calculations"]) as writer:
+            writer.append(data, 1.0)
+        content = bytearray(filename.read_bytes())
+        content[-1] ^= 0xFF
+        filename.write_bytes(bytes(content))
+        with SnapshotLogReader(filename) as reader:
+            record = next(iter(reader))
+            with patch("luxtronik.snapshot_log.LOGGER") as logger:
+                assert record.materialize() is None
+                assert record.raws("calculations") is None
+                assert logger.error.call_count == 2
+
+    def test_invalid_file(self, tmp_path):
+        filename = tmp_path / "other.bin"
+        filename.write_bytes(b"something else")
+        with pytest.raises(ValueError):
+            SnapshotLogWriter(filename)
+        with pytest.raises(ValueError):
+            SnapshotLogReader(filename)
+        empty = tmp_path / "empty.bin"
+        empty.write_bytes(b"")
+        with pytest.raises(ValueError):
+            SnapshotLogReader(empty)
+
+    def test_empty_log(self, tmp_path):
+        filename = tmp_path / "log.bin"
+        filename.write_bytes(LUXTRONIK_SNAPSHOT_LOG_MAGIC)
+        with SnapshotLogReader(filename) as reader:
+            assert len(reader) == 0
+            assert reader.time_range is None
+            assert list(reader) == []